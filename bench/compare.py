@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+比较两次基准测试的结果
+逐项比较中位数，变慢超过阈值（默认 10%）且绝对差值超过噪声下限（默认 0.05 ms）时视为回归，
+存在回归时以退出码 1 结束，可以直接用在持续集成中。
+
+    python bench/compare.py 旧结果.json 新结果.json [--threshold 0.1] [--min-ms 0.05]
+"""
+
+import argparse
+import json
+import sys
+
+
+def _benchmarks(report):
+    """返回 {(规模, 基准名称): 统计}"""
+    return {
+        (size, name): stats
+        for size, result in report["sizes"].items()
+        for name, stats in result["benchmarks"].items()
+    }
+
+
+def compare(old, new, threshold=0.1, min_ms=0.05):
+    """返回 [(规模, 基准名称, 旧中位数, 新中位数, 变化比例, 是否回归)]，只包含两边都有的基准"""
+    old_benchmarks = _benchmarks(old)
+    rows = []
+    for key, stats in _benchmarks(new).items():
+        previous = old_benchmarks.get(key)
+        if previous is None:
+            continue
+        before, after = previous["median_ms"], stats["median_ms"]
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > min_ms
+        rows.append((*key, before, after, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较两次基准测试的中位数")
+    parser.add_argument("old", help="基线结果")
+    parser.add_argument("new", help="新结果")
+    parser.add_argument("--threshold", type=float, default=0.1, help="视为回归的变慢比例")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="忽略小于该值（毫秒）的差值")
+    args = parser.parse_args()
+
+    with open(args.old, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"基线 {old.get('app_version')} ({old.get('timestamp')}) -> 新 {new.get('app_version')} ({new.get('timestamp')})")
+    rows = compare(old, new, args.threshold, args.min_ms)
+    print(f"{'规模':>8}  {'基准':<32}{'旧 ms':>12}{'新 ms':>12}{'变化':>9}")
+    for size, name, before, after, change, regressed in rows:
+        mark = "  回归" if regressed else ""
+        print(f"{size:>8}  {name:<32}{before:>12.3f}{after:>12.3f}{change:>+9.1%}{mark}")
+
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"\n{len(regressions)} 项变慢超过 {args.threshold:.0%}")
+        sys.exit(1)
+    print("\n没有超过阈值的回归")
+
+
+if __name__ == "__main__":
+    main()
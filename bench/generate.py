@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合成工具目录生成器
+按固定随机种子生成指定数量工具的 tools.json，内容可重复：名称、类型、版本、作者等字段与真实目录相同，
+usage 为带 Markdown 结构的长中文文本。给出存根目录时工具路径指向对应类型的存根程序，健康检查和启动都能真实进行。
+
+    python bench/generate.py 10000 /tmp/catalog-10k [--stub-dir DIR] [--usage-chars 600] [--seed 1]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from config import CATEGORY_DESCRIPTIONS, SUPPORTED_EXTENSIONS  # noqa: E402
+
+NAME_WORDS = (
+    "scan", "recon", "sniff", "hash", "crack", "dump", "proxy", "fuzz", "spray", "enum",
+    "shell", "pivot", "relay", "trace", "probe", "audit", "forge", "crypt", "hunt", "map",
+)
+DESCRIPTIONS = (
+    "网络扫描工具", "域名信息查询", "开源漏洞扫描器", "SQL注入检测工具", "渗透测试框架", "网络协议分析工具",
+    "Web应用安全测试", "密码哈希破解工具", "内存凭据提取工具", "无线网络审计工具", "日志取证分析工具",
+)
+AUTHORS = ("Gordon Lyon", "Benjamin Delpy", "Offensive Security", "Rapid7", "PortSwigger", "安全实验室")
+# 拼接 usage 文本的素材
+PHRASES = (
+    "用于端口扫描、服务识别和操作系统检测", "支持多线程并发和断点续扫", "扫描结果可以导出为 XML、JSON 和 HTML 报告",
+    "在授权范围内对目标进行信息收集", "通过字典和规则组合生成候选口令", "自动识别常见的 Web 中间件和框架版本",
+    "可以配合代理链隐藏真实来源地址", "内置常见漏洞的检测脚本并支持自定义插件", "对抓取的流量按协议进行解析和重组",
+    "运行前请确认已获得目标系统所有者的书面授权", "部分功能需要管理员权限才能使用", "默认超时时间为三十秒，可通过参数调整",
+)
+# 生成规则变化时递增，已生成的目录随之重新生成
+GENERATOR_VERSION = 1
+OPTIONS = ("-h", "-v", "-o <文件>", "-t <线程数>", "--timeout <秒>", "-p <端口范围>", "--proxy <地址>", "-u <目标URL>")
+
+
+def _usage(rng, target_chars):
+    """生成约 target_chars 个字符、带标题、列表和代码块的 usage 文本"""
+    parts = ["## 功能说明\n"]
+    length = 0
+    while length < target_chars * 0.6:
+        sentence = "，".join(rng.sample(PHRASES, 3)) + "。"
+        parts.append(sentence)
+        length += len(sentence)
+    parts.append("\n\n## 常用参数\n")
+    for option in rng.sample(OPTIONS, 4):
+        line = f"- `{option}`：{rng.choice(PHRASES)}\n"
+        parts.append(line)
+        length += len(line)
+    parts.append("\n## 示例\n```\n")
+    while length < target_chars:
+        line = f"tool {' '.join(rng.sample(OPTIONS, 2))}\n"
+        parts.append(line)
+        length += len(line)
+    parts.append("```\n")
+    return "".join(parts)
+
+
+def generate(count, stub_paths=None, usage_chars=600, seed=1):
+    """返回 {分类: [工具条目]}，共 count 个工具，平均分布在 CATEGORY_DESCRIPTIONS 的各个分类中"""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_DESCRIPTIONS)
+    types = list(SUPPORTED_EXTENSIONS)
+    catalog = {category: [] for category in categories}
+    for index in range(count):
+        tool_type = types[index % len(types)]
+        name = f"{rng.choice(NAME_WORDS)}{rng.choice(NAME_WORDS)}-{index:06d}"
+        if stub_paths and stub_paths.get(tool_type):
+            path = stub_paths[tool_type]
+        else:
+            path = f"tools/bench/{name}.{tool_type}"
+        entry = {
+            "name": name,
+            "description": rng.choice(DESCRIPTIONS),
+            "path": path,
+            "type": tool_type,
+            "version": f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 99)}",
+            "author": rng.choice(AUTHORS),
+            "website": f"https://example.com/{name}",
+            # usage 长度在目标值的一半到一倍半之间
+            "usage": _usage(rng, int(usage_chars * rng.uniform(0.5, 1.5))),
+        }
+        if tool_type == "exe" and index % 3 == 0:
+            entry["launch_method"] = "cmd"
+        if index % 5 == 0:
+            entry["parameters"] = "-u {url} -t 4"
+        catalog[categories[index % len(categories)]].append(entry)
+    return catalog
+
+
+def write_catalog(data_dir, count, stub_paths=None, usage_chars=600, seed=1):
+    """在 data_dir 下写入 tools.json，参数相同的目录已存在时直接复用，返回 tools.json 路径"""
+    os.makedirs(data_dir, exist_ok=True)
+    tools_file = os.path.join(data_dir, "tools.json")
+    meta_file = os.path.join(data_dir, "generator.json")
+    meta = {
+        "generator": GENERATOR_VERSION, "count": count, "usage_chars": usage_chars, "seed": seed,
+        "stubs": stub_paths or {},
+    }
+    try:
+        with open(meta_file, "r", encoding="utf-8") as f:
+            if json.load(f) == meta and os.path.exists(tools_file):
+                return tools_file
+    except (OSError, ValueError):
+        pass
+
+    catalog = generate(count, stub_paths, usage_chars, seed)
+    with open(tools_file, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=1)
+    with open(meta_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return tools_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成工具目录")
+    parser.add_argument("count", type=int, help="工具数量")
+    parser.add_argument("data_dir", help="输出目录（写入其中的 tools.json）")
+    parser.add_argument("--stub-dir", help="先在该目录生成存根程序，工具路径指向存根")
+    parser.add_argument("--usage-chars", type=int, default=600, help="usage 文本的平均字符数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    stub_paths = None
+    if args.stub_dir:
+        from stubs import create_stubs
+
+        stub_paths = create_stubs(args.stub_dir)
+    path = write_catalog(args.data_dir, args.count, stub_paths, args.usage_chars, args.seed)
+    print(f"{path}: {args.count} 个工具, {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+门户基准测试
+对每种目录规模生成合成目录和存根工具，在独立的子进程中（PORTAL_DATA_DIR 指向生成的目录）测量：
+
+- 目录加载：冷启动解析 JSON、冷启动加载编译快照、文件未变化时的 load_tools()
+- 画面渲染：display_categories() / display_tools() / display_tool_details() 首次渲染和缓存命中，
+  输出写入只计字节数的终端替身，同时记录写出的字节数
+- 工具启动：每种可运行的存根类型调用 launch_tool()，记录启动耗时、创建进程、首个输出和退出的耗时
+
+动画全部关闭（timing_profile 为 none）。结果写成 JSON，用 bench/compare.py 比较两个版本。
+
+    python bench/run.py [--sizes 1000 10000 100000] [--repeat 20] [--out 结果.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_WORK_DIR = os.path.join(BASE_DIR, ".cache", "bench")
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_SIZES = (1000, 10000, 100000)
+# 终端替身的尺寸，保证不同机器上排版结果一致
+COLUMNS, LINES = 120, 40
+
+
+def summarize(samples):
+    """耗时样本（秒）的统计，单位为毫秒"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "n": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": p95 * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+# ---------------------------------------------------------------- 子进程：在指定目录上测量
+
+
+class ByteSink:
+    """只统计写入字节数的终端替身"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return True
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+
+def _timed(func, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _bench_load(repeat, results):
+    from utils.catalog import SNAPSHOT_FILE, TOOLS_FILE, Catalog, compile_catalog
+    from utils.ui import load_tools
+
+    results["load_json_cold"] = summarize(_timed(lambda: Catalog(TOOLS_FILE).tools(), repeat))
+    compile_catalog(TOOLS_FILE, SNAPSHOT_FILE)
+    results["load_snapshot_cold"] = summarize(
+        _timed(lambda: Catalog(TOOLS_FILE, snapshot_path=SNAPSHOT_FILE).tools(), repeat)
+    )
+    load_tools()
+    results["load_tools_warm"] = summarize(_timed(load_tools, repeat))
+
+
+def _bench_render(repeat, results, sink):
+    from utils.catalog import catalog
+    from utils.health import health
+    from utils.render import screens
+    from utils.terminal import terminal
+    from utils.ui import display_categories, display_tool_details, display_tools
+
+    answers = []
+    terminal.ask = lambda *args, **kwargs: answers[0]
+
+    tools_data = catalog.tools()
+    all_tools = [tool for tools in tools_data.values() for tool in tools]
+    results["health_scan"] = summarize(_timed(lambda: health.scan(all_tools, force=True), repeat))
+
+    category = max(tools_data, key=lambda name: len(tools_data[name]))
+    tool = max(tools_data[category][:50], key=lambda item: len(item.usage or ""))
+    screens_to_bench = (
+        ("render_categories", display_categories, (), "exit"),
+        ("render_tools", display_tools, (category,), "exit"),
+        ("render_tool_details", display_tool_details, (tool,), "b"),
+    )
+    for name, display, args, answer in screens_to_bench:
+        answers[:] = [answer]
+        for variant, before in (("cold", screens.clear), ("warm", None)):
+            display(*args)  # 预热：导入 rich 的表格、Markdown 等模块
+            written = sink.bytes
+            stats = summarize(_timed(lambda: display(*args), repeat, before))
+            stats["bytes"] = (sink.bytes - written) // repeat
+            results[f"{name}_{variant}"] = stats
+
+
+def _bench_launch(repeat, results, stub_types):
+    from utils.catalog import catalog
+    from utils.jobs import jobs
+    from utils.launcher import launch_tool, placeholders
+    from utils.metrics import metrics
+
+    by_type = {}
+    for tools in catalog.tools().values():
+        for tool in tools:
+            if tool.type in stub_types and tool.type not in by_type and not placeholders(tool):
+                by_type[tool.type] = tool
+
+    for tool_type, tool in sorted(by_type.items()):
+        launch_tool(tool)  # 预热：解释器查找、日志目录
+        jobs.list()[-1].wait()
+        metrics.histograms.clear()
+        wall, first_output, exit_times = [], [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            launch_tool(tool)
+            wall.append(time.perf_counter() - started)
+            job = jobs.list()[-1]
+            job.wait()
+            if job.output is not None and job.output.first_output_at is not None:
+                first_output.append(job.output.first_output_at - job.started)
+            exit_times.append(job.duration)
+        results[f"launch_tool[{tool_type}]"] = summarize(wall)
+        spawn = metrics.histograms.get("launch_spawn")
+        if spawn is not None and spawn.count:
+            results[f"launch_spawn[{tool_type}]"] = {
+                "n": spawn.count,
+                "min_ms": spawn.minimum * 1000,
+                "median_ms": spawn.quantile(0.5) * 1000,
+                "p95_ms": spawn.quantile(0.95) * 1000,
+                "max_ms": spawn.maximum * 1000,
+                "mean_ms": spawn.total / spawn.count * 1000,
+            }
+        if first_output:
+            results[f"launch_first_output[{tool_type}]"] = summarize(first_output)
+        results[f"launch_exit[{tool_type}]"] = summarize(exit_times)
+
+
+def worker(args):
+    """在子进程中运行：环境变量已指向生成的目录"""
+    sys.path.insert(0, BASE_DIR)
+    from config import CONFIG
+
+    CONFIG["timing_profile"] = "none"
+    CONFIG["fullscreen"] = False
+    CONFIG["metrics_textfile"] = None
+    CONFIG["log_dir"] = os.path.join(args.work_dir, "logs")
+    CONFIG["history_file"] = os.path.join(args.work_dir, "history.jsonl")
+
+    from utils.terminal import console
+
+    stdout = sys.stdout
+    sink = ByteSink()
+    console.file = sink
+
+    results = {}
+    _bench_load(args.repeat, results)
+    _bench_render(args.repeat, results, sink)
+    if args.launch:
+        _bench_launch(args.repeat, results, set(args.launch))
+    stdout.write(json.dumps(results) + "\n")
+
+
+# ---------------------------------------------------------------- 主进程：生成目录并汇总结果
+
+
+def run_size(size, args, stub_paths, launch_types):
+    from generate import write_catalog
+
+    data_dir = os.path.join(args.work_dir, f"catalog-{size}")
+    started = time.monotonic()
+    tools_file = write_catalog(data_dir, size, stub_paths, args.usage_chars, args.seed)
+    generated = time.monotonic() - started
+
+    env = dict(os.environ)
+    env.update({
+        "PORTAL_DATA_DIR": data_dir,
+        "TTY_COMPATIBLE": "1",
+        "FORCE_COLOR": "1",
+        "TERM": "xterm-256color",
+        "COLUMNS": str(COLUMNS),
+        "LINES": str(LINES),
+        "PYTHONHASHSEED": "0",
+    })
+    env.pop("NO_COLOR", None)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(args.repeat),
+               "--work-dir", args.work_dir]
+    if launch_types:
+        command += ["--launch", *launch_types]
+    proc = subprocess.run(command, env=env, cwd=BASE_DIR, stdout=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"规模 {size} 的基准测试失败 (退出码 {proc.returncode})")
+    return {
+        "tools": size,
+        "catalog_bytes": os.path.getsize(tools_file),
+        "generate_seconds": round(generated, 3),
+        "benchmarks": json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def print_summary(report):
+    for size, result in report["sizes"].items():
+        print(f"\n== {size} 个工具 ({result['catalog_bytes'] / 1e6:.1f} MB) ==")
+        print(f"{'基准':<32}{'中位数 ms':>12}{'p95 ms':>12}{'字节':>10}")
+        for name, stats in result["benchmarks"].items():
+            written = stats.get("bytes")
+            print(f"{name:<32}{stats['median_ms']:>12.3f}{stats['p95_ms']:>12.3f}{'' if written is None else written:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="门户基准测试（离线运行，结果写成 JSON）")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="目录中的工具数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每项测量的重复次数")
+    parser.add_argument("--usage-chars", type=int, default=600, help="usage 文本的平均字符数")
+    parser.add_argument("--seed", type=int, default=1, help="生成目录的随机种子")
+    parser.add_argument("--no-launch", action="store_true", help="不测量工具启动")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="生成的目录、存根和日志所在目录")
+    parser.add_argument("--out", help="结果文件路径，默认写入 bench/results/")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--launch", nargs="*", default=[], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.work_dir = os.path.abspath(args.work_dir)
+
+    if args.worker:
+        worker(args)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, BASE_DIR)
+    from config import CONFIG
+    from stubs import create_stubs, runtimes
+
+    stub_paths = create_stubs(os.path.join(args.work_dir, "stubs"))
+    available = runtimes()
+    launch_types = [] if args.no_launch else [
+        tool_type for tool_type, path in stub_paths.items() if path and available[tool_type]
+    ]
+    skipped = sorted(tool_type for tool_type in stub_paths if tool_type not in launch_types)
+
+    report = {
+        "app_version": CONFIG.get("app_version"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": args.repeat,
+        "usage_chars": args.usage_chars,
+        "seed": args.seed,
+        "terminal": {"columns": COLUMNS, "lines": LINES},
+        "launch_types": launch_types,
+        "launch_skipped": skipped,
+        "sizes": {},
+    }
+    for size in args.sizes:
+        print(f"正在测量 {size} 个工具...", file=sys.stderr)
+        report["sizes"][str(size)] = run_size(size, args, stub_paths, launch_types)
+
+    out = args.out or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{report['app_version']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_summary(report)
+    if skipped:
+        print(f"\n未测量启动的类型（缺少解释器或编译工具）: {', '.join(skipped)}")
+    print(f"结果已写入 {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+各文件类型的存根程序
+每个存根只输出一行并以 0 退出，用来测量门户自身的启动开销而不是工具的运行时间。
+exe 和 bat 在类 Unix 系统上写成带 shebang 的可执行脚本；jar 只在有 javac 和 jar 时编译。
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from config import SUPPORTED_EXTENSIONS  # noqa: E402
+
+MESSAGE = "bench stub ok"
+
+SOURCES = {
+    "py": f'print("{MESSAGE}")\n',
+    "sh": f'echo "{MESSAGE}"\n',
+    "js": f'console.log("{MESSAGE}");\n',
+    "php": f'<?php echo "{MESSAGE}\\n";\n',
+    "vbs": f'WScript.Echo "{MESSAGE}"\r\n',
+}
+if os.name == "nt":
+    SOURCES["bat"] = f"@echo {MESSAGE}\r\n"
+else:
+    # 类 Unix 系统上 exe 和 bat 都没有原生格式，用可执行的 shell 脚本代替
+    SOURCES["exe"] = f'#!/bin/sh\necho "{MESSAGE}"\n'
+    SOURCES["bat"] = f'#!/bin/sh\necho "{MESSAGE}"\n'
+
+JAVA_SOURCE = f"""public class Stub {{
+    public static void main(String[] args) {{
+        System.out.println("{MESSAGE}");
+    }}
+}}
+"""
+
+
+def _build_jar(stub_dir):
+    """编译 stub.jar，没有 JDK 时返回 None"""
+    if not (shutil.which("javac") and shutil.which("jar")):
+        return None
+    build_dir = os.path.join(stub_dir, "java")
+    os.makedirs(build_dir, exist_ok=True)
+    with open(os.path.join(build_dir, "Stub.java"), "w", encoding="utf-8") as f:
+        f.write(JAVA_SOURCE)
+    jar_path = os.path.join(stub_dir, "stub.jar")
+    try:
+        subprocess.run(["javac", "Stub.java"], cwd=build_dir, check=True, capture_output=True)
+        subprocess.run(["jar", "cfe", jar_path, "Stub", "-C", build_dir, "Stub.class"], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return jar_path
+
+
+def create_stubs(stub_dir):
+    """在 stub_dir 中生成全部存根，返回 {类型: 绝对路径}，无法生成的类型为 None"""
+    stub_dir = os.path.abspath(stub_dir)
+    os.makedirs(stub_dir, exist_ok=True)
+    paths = {}
+    for tool_type in SUPPORTED_EXTENSIONS:
+        if tool_type == "jar":
+            paths[tool_type] = _build_jar(stub_dir)
+            continue
+        source = SOURCES.get(tool_type)
+        if source is None:
+            paths[tool_type] = None
+            continue
+        path = os.path.join(stub_dir, f"stub.{tool_type}")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(source)
+        os.chmod(path, 0o755)
+        paths[tool_type] = path
+    return paths
+
+
+def runtimes():
+    """返回 {类型: 解释器是否可用}，没有解释器的类型（exe、bat）总是可用"""
+    available = {}
+    for tool_type, launch_config in SUPPORTED_EXTENSIONS.items():
+        if isinstance(launch_config, list):
+            launch_config = launch_config[0]
+        command = launch_config["command"].split()
+        available[tool_type] = not command or shutil.which(command[0]) is not None
+    return available
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, ".cache", "bench", "stubs")
+    found = runtimes()
+    for stub_type, stub_path in create_stubs(target).items():
+        state = "可运行" if stub_path and found[stub_type] else "跳过"
+        print(f"{stub_type:4} {state:4} {stub_path or '-'}")
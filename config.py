@@ -3,10 +3,39 @@
 
 # 系统配置
 CONFIG = {
-    "password": "admin123",  # 系统密码，实际应用中应加密存储
+    "password_hash": "pbkdf2_sha256$600000$leQP5zlyjkF+HIUnQFHMmg$8SJm3PCeNnP5wWYrgh9aRCP6JI0kIng9+qzikSOMuY8",  # 系统密码的加盐 PBKDF2 哈希（默认密码 admin123），用 python run.py hash-password 生成
+    "session_ttl": 1800,  # 登录会话的有效期（秒），期间在同一终端重新进入门户无需再次输入密码，0 表示每次都验证
     "max_attempts": 3,  # 最大密码尝试次数
     "app_version": "2.1.0",  # 应用版本号
     "terminal_style": "kali",  # 终端样式 (kali, ubuntu, windows)
+    "timing_profile": "cinematic",  # 动画时序 (cinematic: 完整动画, fast: 快速, none: 无动画)
+    "first_output_wait": 0.5,  # 后台启动时最多等待工具首个输出的秒数
+    "catalog_db": None,  # 工具目录 SQLite 存储路径，None 表示使用内存数据库
+    "background_launch": True,  # 工具在后台作业中运行，菜单立即返回
+    "batch_concurrency": 4,  # 批量启动时最多同时运行的工具数
+    "fanout_concurrency": 8,  # 按目标列表运行时最多同时运行的进程数
+    "fanout_rate": 5,  # 按目标列表运行时每秒最多启动的进程数，0 表示不限制
+    "fanout_retries": 1,  # 按目标列表运行时每个目标失败后的最多重试次数
+    "fanout_retry_delay": 1.0,  # 第一次重试前等待的秒数，之后每次加倍
+    "fanout_max_targets": 65536,  # 一次按目标列表运行最多展开的目标数
+    "capture_output": True,  # 捕获工具输出到有界缓冲区和日志文件
+    "output_buffer_lines": 1000,  # 每个作业在内存中保留的输出行数
+    "log_dir": "logs",  # 工具完整输出的日志目录（相对于项目根目录）
+    "history_file": "data/history.jsonl",  # 启动历史（每次运行的耗时、CPU、峰值内存和退出状态）的追加写入文件（相对于项目根目录），None 表示不记录
+    "history_window": 20,  # 工具详情中资源占用平均值所取的最近运行次数
+    "history_compact_lines": 2000,  # 启动历史超过该行数（且超过有效记录的两倍）时压缩为每个工具的汇总，0 表示不压缩
+    "frecency_half_life_days": 7,  # “最近常用”排序中一次启动的权重减半所需的天数
+    "quick_launch_size": 9,  # 分类菜单中可以用一个字母直接启动的最近常用工具数
+    "fullscreen": True,  # 在终端的备用屏幕中运行，切换画面时只重绘有变化的行（不支持时自动退回清屏方式）
+    "page_size": None,  # 工具列表每页显示的工具数，None 表示按终端高度自动计算
+    "warm_pool": False,  # 预热运行时：py 工具交给预先启动的 Python 进程，jar 工具使用 JVM 类数据共享归档
+    "warm_pool_preload": ["argparse", "json", "re", "socket", "ssl", "subprocess", "threading", "urllib.request"],  # 预热进程预先导入的模块
+    "metrics_textfile": None,  # 各阶段耗时统计的 node-exporter textfile 路径（如 /var/lib/node_exporter/portal.prom），None 表示不写出
+    "api_host": "127.0.0.1",  # 启动接口监听的地址（只允许本机回环地址）
+    "api_port": 8765,  # 启动接口监听的端口
+    "api_socket": None,  # 启动接口的 Unix 套接字路径，设置后不再监听 TCP 端口
+    "api_workers": 16,  # 启动接口处理请求的线程数
+    "api_token_ttl": 3600,  # 启动接口令牌的有效期（秒），过期后需要重新 login
 }
 
 # 支持的文件类型和启动方式
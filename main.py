@@ -4,21 +4,22 @@
 import sys
 import time
 
-from rich.box import HEAVY
-from rich.console import Console
 from rich.panel import Panel
-from rich.table import Table
 
 from config import CONFIG
-from utils.auth import authenticate, clear_screen
-from utils.launcher import launch_tool
-from utils.terminal import KaliTerminal
+from utils.auth import authenticate, resume_session
+from utils.metrics import metrics
+from utils.screen import clear_screen, screen
+from utils.terminal import console, pause, terminal
+from utils.tool import Tool
 from utils.ui import display_categories, display_tools
 
 
 def display_welcome():
     """显示欢迎标题"""
-    console = Console()
+    from rich.box import HEAVY
+    from rich.table import Table
+
     clear_screen()
 
     # 添加系统信息表格
@@ -36,9 +37,8 @@ def display_welcome():
 
 def display_exit():
     """显示退出信息"""
-    console = Console()
-    terminal = KaliTerminal()
-
+    # 退出信息显示在普通屏幕上，程序结束后仍然可见
+    screen.leave()
     clear_screen()
 
     # 显示退出信息
@@ -53,9 +53,9 @@ def display_exit():
 
     👋 再见!
     """.format(
-        start_time=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 300)),  # 假设运行了5分钟
+        start_time=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(metrics.started_at)),
         end_time=time.strftime("%Y-%m-%d %H:%M:%S"),
-        runtime="00:05:00"  # 为简单起见使用固定值
+        runtime=time.strftime("%H:%M:%S", time.gmtime(metrics.session_seconds))
     )
 
     console.print(Panel(goodbye_message, border_style="green", title="会话结束", subtitle="安全退出"))
@@ -67,15 +67,19 @@ def display_exit():
 
 
 def main():
-    console = Console()
-    terminal = KaliTerminal()
+    metrics.start_session()
+    metrics.enable_export()
+    # 终端支持时进入全屏模式，切换画面只重绘有变化的行
+    screen.enter()
 
-    display_welcome()
+    # 登录会话有效时跳过欢迎画面和启动序列，直接进入分类菜单
+    if not resume_session():
+        display_welcome()
 
-    # 验证用户身份
-    if not authenticate():
-        console.print("[bold red]❌ 验证失败，程序退出![/bold red]")
-        sys.exit(1)
+        # 验证用户身份
+        if not authenticate():
+            console.print("[bold red]❌ 验证失败，程序退出![/bold red]")
+            sys.exit(1)
 
     while True:
         # 显示工具分类
@@ -88,9 +92,16 @@ def main():
             display_exit()
             break
 
-        # 显示分类下的工具
-        clear_screen()
-        tool = display_tools(category)
+        if isinstance(category, list):
+            # 在分类菜单中载入了工具集
+            tool = category
+        elif isinstance(category, Tool):
+            # 快速启动最近常用的工具
+            tool = category
+        else:
+            # 显示分类下的工具
+            clear_screen()
+            tool = display_tools(category)
 
         # 如果用户选择返回
         if tool == "back":
@@ -100,9 +111,15 @@ def main():
             display_exit()
             break
 
-        # 启动选中的工具
+        # 启动选中的工具（多选或工具集时批量启动）
         if tool:
-            launch_tool(tool)
+            # 启动器在第一次启动工具时才导入
+            from utils.launcher import launch_batch, launch_tool
+
+            if isinstance(tool, list):
+                launch_batch(tool)
+            else:
+                launch_tool(tool)
 
             # 工具执行完后暂停
             console.print()
@@ -118,8 +135,8 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         # 捕获Ctrl+C
-        console = Console()
+        screen.leave()
         console.print("\n[bold yellow]⚠️ 检测到用户中断[/bold yellow]")
         console.print("[bold green]安全退出程序...[/bold green]")
-        time.sleep(1)
+        pause(1)
         display_exit()
@@ -6,42 +6,33 @@
 此脚本用于检查环境依赖并启动主程序
 """
 
+import argparse
+import os
 import subprocess
 import sys
-import time
 
-from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.text import Text
 
-console = Console()
+from utils.terminal import console, pause, run_stages
 
 
-def check_dependencies():
-    """检查所需的Python包是否已安装"""
-    required_packages = ['rich']
-    missing_packages = []
-
-    console.print("[bold blue]🔍 检查依赖...[/bold blue]")
-
-    with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]检查Python包...[/bold blue]"),
-            console=console
-    ) as progress:
-        task = progress.add_task("检查中", total=len(required_packages))
-
-        for package in required_packages:
-            try:
-                __import__(package)
-                progress.update(task, advance=1)
-                time.sleep(0.3)  # 添加延迟以便观察
-            except ImportError:
-                missing_packages.append(package)
-                progress.update(task, advance=1)
-                time.sleep(0.3)  # 添加延迟以便观察
+def check_dependencies(force=False):
+    """检查所需的Python包和工具运行时，环境没有变化时直接使用上次的检查结果"""
+    from utils import environment
 
+    env = None if force else environment.load_cached()
+    if env is not None:
+        console.print("[bold green]✅ 运行环境未变化，跳过依赖检查[/bold green]")
+    else:
+        console.print("[bold blue]🔍 检查依赖...[/bold blue]")
+        packages, runtimes = run_stages("检查运行环境", [
+            ("检查Python包", environment.probe_packages),
+            ("查找工具运行时", environment.probe_runtimes),
+        ])
+        env = environment.save(packages, runtimes)
+
+    missing_packages = environment.missing_packages(env)
     if missing_packages:
         console.print("[bold yellow]⚠️ 检测到缺少以下Python包:[/bold yellow]")
         for package in missing_packages:
@@ -62,12 +53,129 @@ def check_dependencies():
                 border_style="red"
             ))
             return False
+        # site-packages 已变化，重新记录检查结果
+        env = environment.save(environment.probe_packages(), env["runtimes"])
+
+    environment.set_environment(env)
+    missing_runtimes = environment.missing_runtimes(env)
+    if missing_runtimes:
+        console.print("[bold yellow]⚠️ 未找到以下运行时，对应类型的工具将无法启动:[/bold yellow]")
+        for command, types in missing_runtimes.items():
+            console.print(f"  - {command} ({', '.join(types)})")
 
     console.print("[bold green]✅ 所有依赖已满足[/bold green]")
     return True
 
 
-def main():
+def compile_catalog_command(args):
+    """校验工具配置并生成二进制快照"""
+    from utils.catalog import CatalogError, SNAPSHOT_FILE, TOOLS_FILE, compile_catalog, write_shards
+
+    console.print(f"[bold blue]🔍 校验 {TOOLS_FILE}...[/bold blue]")
+    try:
+        tools_data = compile_catalog()
+    except CatalogError as e:
+        console.print(Panel(
+            "\n".join(f"• {problem}" for problem in e.problems),
+            title=f"❌ {e}",
+            border_style="red"
+        ))
+        return 1
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ 无法读取工具配置: {e}[/bold red]")
+        return 1
+
+    tool_count = sum(len(tools) for tools in tools_data.values())
+    console.print(f"[bold green]✅ 已生成快照 {SNAPSHOT_FILE} ({len(tools_data)} 个分类, {tool_count} 个工具)[/bold green]")
+
+    if args.shards:
+        manifest_path = write_shards(tools_data)
+        console.print(f"[bold green]✅ 已生成分片目录 {manifest_path}[/bold green]")
+    return 0
+
+
+def hash_password_command(args):
+    """生成密码哈希，填入 config.py 的 CONFIG["password_hash"]"""
+    import getpass
+
+    from utils import session
+
+    password = getpass.getpass("新密码: ")
+    if not password or password != getpass.getpass("再次输入新密码: "):
+        console.print("[bold red]❌ 两次输入的密码不一致或为空[/bold red]")
+        return 1
+    print(f'"password_hash": "{session.hash_password(password)}",')
+    console.print("[dim]把上面一行填入 config.py 的 CONFIG 中，修改后已有的登录会话全部失效[/dim]")
+    return 0
+
+
+def logout_command(args):
+    """删除登录会话，下次进入门户时重新验证密码"""
+    from utils import session
+
+    removed = session.end(all_terminals=args.all)
+    console.print(f"[bold green]✅ 已删除 {removed} 个登录会话[/bold green]")
+    return 0
+
+
+def serve_command(args):
+    """运行本地启动接口，按 Ctrl+C 停止"""
+    from config import CONFIG
+    from utils import environment
+    from utils.metrics import metrics
+    from utils.server import serve, stop_jobs
+
+    metrics.enable_export("serve")
+
+    environment.set_environment(environment.get_environment(force=args.recheck))
+    socket_path = args.socket or CONFIG.get("api_socket")
+
+    def ready(addresses):
+        for address in addresses:
+            where = address if socket_path else f"http://{address[0]}:{address[1]}"
+            console.print(f"[bold green]🚀 启动接口已就绪: {where} (POST /rpc)[/bold green]")
+        console.print("[dim]先调用 login 获取令牌，按 Ctrl+C 停止[/dim]")
+
+    try:
+        serve(args.host, args.port, socket_path, on_ready=ready)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ 无法启动接口: {e}[/bold red]")
+        return 1
+    except KeyboardInterrupt:
+        stopped = stop_jobs()
+        console.print(f"\n[bold yellow]⚠️ 启动接口已停止，终止了 {stopped} 个运行中的作业[/bold yellow]")
+    return 0
+
+
+def parse_args(argv=None):
+    """解析命令行参数，不带子命令时进入交互界面"""
+    from utils import cli
+
+    parser = argparse.ArgumentParser(description="终端安全工具集")
+    subparsers = parser.add_subparsers(dest="command")
+
+    compile_parser = subparsers.add_parser("compile", help="校验 data/tools.json 并生成二进制快照")
+    compile_parser.add_argument("--shards", action="store_true", help="同时生成 data/tools.d/ 分片目录")
+
+    cli.add_parsers(subparsers)
+
+    subparsers.add_parser("hash-password", help="生成 CONFIG[\"password_hash\"] 所需的加盐密码哈希")
+    logout_parser = subparsers.add_parser("logout", help="删除当前终端的登录会话")
+    logout_parser.add_argument("--all", action="store_true", help="删除当前用户在所有终端上的会话")
+
+    serve_parser = subparsers.add_parser("serve", help="运行本地启动接口（JSON-RPC over HTTP 或 Unix 套接字）")
+    serve_parser.add_argument("--host", help="监听地址，默认为 CONFIG[\"api_host\"]")
+    serve_parser.add_argument("--port", type=int, help="监听端口，默认为 CONFIG[\"api_port\"]")
+    serve_parser.add_argument("--socket", help="改为监听 Unix 套接字")
+
+    parser.add_argument("--recheck", action="store_true", help="忽略缓存，重新检查 Python 包和工具运行时")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="分析启动耗时：各模块的导入时间和到第一个输入提示的时间")
+
+    return parser.parse_args(argv)
+
+
+def main(recheck=False):
     """主函数，启动工具集"""
     console.print(Panel(
         Text("终端安全工具集", style="bold blue"),
@@ -75,9 +183,9 @@ def main():
         border_style="blue"
     ))
 
-    if check_dependencies():
+    if check_dependencies(force=recheck):
         console.print("[bold green]🚀 启动主程序...[/bold green]")
-        time.sleep(1)
+        pause(1)
         try:
             from main import main as start_main
             start_main()
@@ -88,9 +196,30 @@ def main():
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "compile":
+        sys.exit(compile_catalog_command(args))
+    if args.command == "serve":
+        sys.exit(serve_command(args))
+    if args.command == "hash-password":
+        sys.exit(hash_password_command(args))
+    if args.command == "logout":
+        sys.exit(logout_command(args))
+    if args.command is not None:
+        from utils import cli
+
+        sys.exit(cli.run(args))
+    if args.startup_profile:
+        from utils.profiler import show_profile
+
+        sys.exit(show_profile(console, os.path.abspath(__file__)))
+
     try:
-        main()
+        main(recheck=args.recheck)
     except KeyboardInterrupt:
+        from utils.screen import screen
+
+        screen.leave()
         console.print("\n[bold yellow]⚠️ 用户中断，尝试安全退出...[/bold yellow]")
         try:
             from main import display_exit
@@ -98,6 +227,9 @@ if __name__ == "__main__":
         except ImportError:
             console.print("[bold red]❌ 无法导入退出显示函数。直接退出程序。[/bold red]")
     except Exception as e:
+        from utils.screen import screen
+
+        screen.leave()
         console.print(Panel(
             f"❌ 发生错误: {str(e)}",
             title="程序错误",
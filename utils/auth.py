@@ -3,14 +3,41 @@
 
 import time
 
-from rich.console import Console
-from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn, TimeElapsedColumn
-
 from config import CONFIG
-from utils.terminal import KaliTerminal
+from utils import session
+from utils.catalog import catalog
+from utils.health import health
+from utils.jobs import prepare_log_dir
+from utils.screen import clear_screen
+from utils.terminal import console, run_stages, terminal
+
+
+def verify_password(password):
+    """检查系统访问密码（加盐哈希），交互界面、命令行和启动接口共用"""
+    return session.verify(str(password))
+
+
+def load_resources():
+    """加载菜单所需的资源，进度条按实际加载的资源推进"""
+    stages = [
+        ("加载工具目录", catalog.categories),
+        ("检查工具运行时", health.scan),
+        ("准备日志目录", prepare_log_dir),
+    ]
+    if CONFIG.get("warm_pool"):
+        from utils import warm
 
-console = Console()
-terminal = KaliTerminal()
+        stages.append(("预热运行时", warm.start))
+    run_stages("🔄 正在加载系统资源", stages)
+
+
+def resume_session():
+    """当前终端上有未过期的登录会话时直接加载资源并返回 True，不再验证密码和播放启动序列"""
+    if not session.resume():
+        return False
+    console.print("[bold green]✅ 登录会话有效，已跳过身份验证[/bold green]")
+    load_resources()
+    return True
 
 
 def authenticate():
@@ -50,25 +77,13 @@ def authenticate():
     while attempts < CONFIG["max_attempts"]:
         password = terminal.password_prompt("输入系统访问密码: ")
 
-        if password == CONFIG["password"]:
+        if verify_password(password):
             console.print("[bold green]✅ 验证成功！欢迎使用[/bold green]")
+            # 会话有效期内在同一终端重新进入时不再验证密码
+            session.start()
 
-            # 添加加载进度条
             console.print()
-            with Progress(
-                    SpinnerColumn("dots"),
-                    TextColumn("[bold blue]🔄 正在加载系统资源...[/bold blue]"),
-                    BarColumn(complete_style="green", finished_style="green"),
-                    TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                    TimeElapsedColumn(),
-                    console=console
-            ) as progress:
-                task = progress.add_task("[green]加载中...", total=100)
-
-                # 模拟加载过程
-                while not progress.finished:
-                    progress.update(task, advance=0.9)
-                    time.sleep(0.05)
+            load_resources()
 
             console.print("[bold green]🚀 系统准备就绪![/bold green]")
             return True
@@ -83,9 +98,3 @@ def authenticate():
                 time.sleep(1)  # 延迟一秒，增强安全感
 
     return False
-
-
-def clear_screen():
-    """清屏函数"""
-    import os
-    os.system('cls' if os.name == 'nt' else 'clear')
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import io
+import json
+import os
+import pickle
+import struct
+import threading
+import time
+
+from config import SUPPORTED_EXTENSIONS
+from utils.metrics import metrics
+from utils.tool import TextSpool, TextStore, Tool
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 工具目录所在的数据目录，环境变量 PORTAL_DATA_DIR 可以指向其他目录（例如基准测试生成的目录）
+DATA_DIR = os.environ.get("PORTAL_DATA_DIR") or os.path.join(BASE_DIR, "data")
+TOOLS_FILE = os.path.join(DATA_DIR, "tools.json")
+# 分片目录：每个分类一个 <分类>.json，外加一个记录分类顺序的 manifest.json
+SHARD_DIR = os.path.join(DATA_DIR, "tools.d")
+MANIFEST_NAME = "manifest.json"
+# 编译后的二进制快照，比 tools.json 新时直接加载，省去 JSON 解析和校验
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "tools.snapshot")
+SNAPSHOT_MAGIC = b"CSPCAT2\n"
+# 快照布局: 魔数 | 记录区长度 (8 字节) | pickle 记录区 | UTF-8 长文本区
+# 预先保存的工具集：{"工具集名称": ["工具名称", ...]}
+TOOLSETS_FILE = os.path.join(DATA_DIR, "toolsets.json")
+# 每个工具条目必须包含的字段
+REQUIRED_FIELDS = ("name", "type", "path")
+
+# 工具目录文件不存在且从未成功加载时使用的默认数据
+DEFAULT_TOOLS = {
+    "信息收集": [
+        {"name": "Nmap", "description": "网络扫描工具", "path": "tools/nmap.exe", "type": "exe"},
+        {"name": "Whois查询", "description": "域名信息查询", "path": "tools/whois.py", "type": "py"},
+    ],
+    "漏洞扫描": [
+        {"name": "OpenVAS", "description": "开源漏洞扫描器", "path": "tools/openvas.bat", "type": "bat"},
+        {"name": "SQLMap", "description": "SQL注入检测工具", "path": "tools/sqlmap.py", "type": "py"},
+    ],
+    "漏洞利用": [
+        {"name": "Metasploit", "description": "渗透测试框架", "path": "tools/msf.bat", "type": "bat"},
+        {"name": "ExploitPack", "description": "漏洞利用集合", "path": "tools/exploit.jar", "type": "jar"},
+    ],
+    "抓包工具": [
+        {"name": "Wireshark", "description": "网络协议分析工具", "path": "tools/wireshark.exe", "type": "exe"},
+        {"name": "Burp Suite", "description": "Web应用安全测试", "path": "tools/burp.vbs", "type": "vbs"},
+    ],
+}
+
+
+class CatalogError(ValueError):
+    """工具目录校验失败"""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__(f"工具目录存在 {len(problems)} 处错误")
+
+
+def _stat_stamp(path):
+    """返回用于判断文件是否变化的 (大小, 修改时间, inode)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def _read_catalog_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("工具目录顶层必须是以分类为键的对象")
+    return data
+
+
+def _build_tools(entries, spool, category, skipped=None):
+    """把分类中的条目转换为 Tool，未通过 entry_problems 校验的条目跳过，问题描述追加到 skipped"""
+    if not isinstance(entries, list):
+        raise ValueError("分类内容必须是工具列表")
+    tools = []
+    for index, entry in enumerate(entries, 1):
+        problems = entry_problems(entry, f"{category}[{index}]")
+        if problems:
+            if skipped is not None:
+                skipped.extend(problems)
+            continue
+        tools.append(Tool.from_dict(entry, spool))
+    return tools
+
+
+def build_catalog(tools_data, skipped=None):
+    """把 {分类: [条目字典]} 转换为 {分类: [Tool]}，长文本写入临时文件，无效的条目跳过并记录到 skipped"""
+    spool = TextSpool()
+    return {category: _build_tools(entries, spool, category, skipped) for category, entries in tools_data.items()}
+
+
+def _parse_catalog(path, skipped=None):
+    return build_catalog(_read_catalog_json(path), skipped)
+
+
+def _load_snapshot(path):
+    f = open(path, "rb")
+    try:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"不是有效的目录快照: {path}")
+        try:
+            (header_size,) = struct.unpack(">Q", f.read(8))
+            header = pickle.loads(f.read(header_size))
+        except (pickle.UnpicklingError, EOFError, struct.error) as e:
+            raise ValueError(f"目录快照已损坏: {e}")
+        if not isinstance(header, dict):
+            raise ValueError(f"不是有效的目录快照: {path}")
+    except BaseException:
+        f.close()
+        raise
+
+    # 长文本留在快照文件中，由记录按偏移读取；文件句柄随记录一起保留
+    text = TextStore(f, base=len(SNAPSHOT_MAGIC) + 8 + header_size)
+    return {
+        category: [
+            Tool.from_record(record, text, (desc_off, desc_len), (usage_off, usage_len))
+            for record, desc_off, desc_len, usage_off, usage_len in records
+        ]
+        for category, records in header.items()
+    }
+
+
+def _parse_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("categories") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("manifest.json 缺少 categories 列表")
+    shards = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or "name" not in entry:
+            raise ValueError(f"manifest.json 中的分类条目无效: {entry!r}")
+        shards[entry["name"]] = entry.get("file", entry["name"] + ".json")
+    return shards
+
+
+def _parse_toolsets(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(names, list) for names in data.values()):
+        raise ValueError("toolsets.json 必须是 {工具集名称: [工具名称, ...]}")
+    return data
+
+
+def _parse_shard(path, skipped=None, category=None):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"分片文件必须是工具列表: {path}")
+    category = category or os.path.splitext(os.path.basename(path))[0]
+    return _build_tools(data, TextSpool(), category, skipped)
+
+
+class CachedFile:
+    """单个 JSON 文件的解析缓存
+
+    根据文件的大小、修改时间和 inode 判断是否需要重新解析，解析失败时保留上一次有效的结果。
+    """
+
+    def __init__(self, path, parse, fallback=None):
+        self.path = path
+        self.parse = parse
+        self.fallback = fallback
+        self.data = None
+        self.last_error = None
+        self._stamp = None
+
+    def _file_stamp(self):
+        return _stat_stamp(self.path)
+
+    def _fallback(self):
+        return self.fallback() if callable(self.fallback) else self.fallback
+
+    def _load(self):
+        return self.parse(self.path)
+
+    def refresh(self):
+        """按需重新解析文件，返回数据是否发生变化"""
+        stamp = self._file_stamp()
+        if self.data is not None and stamp == self._stamp:
+            return False
+
+        if stamp is None:
+            self.last_error = FileNotFoundError(self.path)
+            if self.data is None:
+                self.data = self._fallback()
+                return True
+            return False
+
+        started = time.monotonic()
+        try:
+            data = self._load()
+        except (OSError, ValueError) as e:
+            # 记录这次失败的文件状态，避免在文件修复之前反复解析
+            self.last_error = e
+            self._stamp = stamp
+            if self.data is None:
+                self.data = self._fallback()
+                return True
+            return False
+
+        metrics.observe("catalog_load", time.monotonic() - started)
+        self.last_error = None
+        self.data = data
+        self._stamp = stamp
+        return True
+
+
+class ToolsFile(CachedFile):
+    """工具条目文件（tools.json 或分片）的解析缓存
+
+    与 compile 使用同一套字段校验，未经编译直接加载时跳过无效的条目，skipped 记录最近一次解析跳过的问题。
+    """
+
+    def __init__(self, path, parse, fallback=None):
+        super().__init__(path, parse, fallback=fallback)
+        self.skipped = []
+
+    def _load(self):
+        skipped = []
+        data = self.parse(self.path, skipped)
+        self.skipped = skipped
+        return data
+
+
+class CompiledCatalogFile(ToolsFile):
+    """单文件目录的解析缓存，编译快照不旧于 tools.json 时直接加载快照"""
+
+    def __init__(self, path, snapshot_path, fallback=None):
+        super().__init__(path, _parse_catalog, fallback=fallback)
+        self.snapshot_path = snapshot_path
+        self.from_snapshot = False
+
+    def _file_stamp(self):
+        source = _stat_stamp(self.path)
+        snapshot = _stat_stamp(self.snapshot_path)
+        if source is None and snapshot is None:
+            return None
+        return source, snapshot
+
+    def _load(self):
+        source, snapshot = self._file_stamp()
+        if snapshot is not None and (source is None or snapshot[1] >= source[1]):
+            try:
+                data = _load_snapshot(self.snapshot_path)
+            except (OSError, ValueError):
+                # 快照不可用时退回解析 JSON 源文件
+                if source is None:
+                    raise
+            else:
+                # 快照只由通过校验的目录生成，没有跳过的条目
+                self.from_snapshot = True
+                self.skipped = []
+                return data
+        self.from_snapshot = False
+        return super()._load()
+
+
+class Catalog:
+    """进程级工具目录缓存
+
+    优先使用 data/tools.d/ 分片目录：列出分类只需读取 manifest，打开某个分类时才解析对应分片；
+    没有分片目录时回退到单文件 tools.json。任一文件重新加载都会递增 version，
+    解析失败时继续提供上一次有效的快照。
+    """
+
+    def __init__(self, path, shard_dir=None, snapshot_path=None, fallback=None):
+        self.path = path
+        self.shard_dir = shard_dir
+        self.snapshot_path = snapshot_path
+        # 默认数据只在目录文件无法加载时才转换
+        self.fallback = (lambda: build_catalog(fallback)) if fallback else dict
+        self.version = 0
+        self._sharded = None
+        self._legacy = self._legacy_file()
+        self._manifest = None
+        self._shards = {}
+        self._by_name = None
+        self._by_name_version = None
+        # {分类: (工具列表, {小写名称: 工具})}，工具列表对象变化时重建
+        self._indexes = {}
+        self._lock = threading.RLock()
+
+    def _legacy_file(self):
+        if self.snapshot_path:
+            return CompiledCatalogFile(self.path, self.snapshot_path, fallback=self.fallback)
+        return ToolsFile(self.path, _parse_catalog, fallback=self.fallback)
+
+    @property
+    def sharded(self):
+        """当前是否使用分片目录"""
+        return bool(self.shard_dir) and os.path.exists(os.path.join(self.shard_dir, MANIFEST_NAME))
+
+    @property
+    def last_error(self):
+        """最近一次加载失败的原因，全部文件有效时为 None"""
+        if self._sharded:
+            files = [self._manifest] + list(self._shards.values())
+        else:
+            files = [self._legacy]
+        for cached in files:
+            if cached is not None and cached.last_error is not None:
+                return cached.last_error
+        return None
+
+    @property
+    def skipped(self):
+        """已加载的目录文件中因校验失败被跳过的条目（问题描述列表），分片模式下只包含已解析的分类"""
+        if self._sharded:
+            with self._lock:
+                files = list(self._shards.values())
+        else:
+            files = [self._legacy]
+        return [problem for cached in files for problem in cached.skipped]
+
+    def refresh(self):
+        """检查目录来源是否变化（分片模式下只检查 manifest），返回快照是否发生变化"""
+        with self._lock:
+            sharded = self.sharded
+            if sharded != self._sharded:
+                self._sharded = sharded
+                self._shards = {}
+                self._manifest = None
+                self._legacy = self._legacy_file()
+                if sharded:
+                    self._manifest = CachedFile(
+                        os.path.join(self.shard_dir, MANIFEST_NAME), _parse_manifest, fallback={}
+                    )
+
+            source = self._manifest if sharded else self._legacy
+            if not source.refresh():
+                return False
+
+            if sharded:
+                # 分类列表变化时丢弃不再引用的分片
+                self._shards = {name: shard for name, shard in self._shards.items() if name in source.data}
+            self.version += 1
+            return True
+
+    def categories(self):
+        """返回分类名称列表"""
+        self.refresh()
+        if self._sharded:
+            return list(self._manifest.data)
+        return list(self._legacy.data)
+
+    def category_tools(self, category):
+        """返回指定分类下的工具列表，分片模式下只解析该分类的分片"""
+        self.refresh()
+        if not self._sharded:
+            return self._legacy.data.get(category, [])
+
+        with self._lock:
+            file_name = self._manifest.data.get(category)
+            if file_name is None:
+                return []
+            shard = self._shards.get(category)
+            first_load = shard is None or shard.path != os.path.join(self.shard_dir, file_name)
+            if first_load:
+                shard = ToolsFile(
+                    os.path.join(self.shard_dir, file_name), functools.partial(_parse_shard, category=category),
+                    fallback=[]
+                )
+                self._shards[category] = shard
+            # 首次解析分片不改变目录内容，只有分片文件被修改后才递增版本号
+            if shard.refresh() and not first_load:
+                self.version += 1
+            return shard.data
+
+    def find(self, name):
+        """按名称（不区分大小写）查找工具，返回 (分类, 工具)，找不到时返回 None"""
+        tools_data = self.tools()
+        if self._by_name is None or self._by_name_version != self.version:
+            by_name = {}
+            for category, tools in tools_data.items():
+                for tool in tools:
+                    by_name.setdefault(tool.name.lower(), (category, tool))
+            self._by_name = by_name
+            self._by_name_version = self.version
+        return self._by_name.get(name.strip().lower())
+
+    def find_in(self, category, name):
+        """只在指定分类中按名称（不区分大小写）查找工具，分片模式下只解析该分类的分片，返回 (分类, 工具) 或 None"""
+        tools = self.category_tools(category)
+        with self._lock:
+            cached = self._indexes.get(category)
+            if cached is None or cached[0] is not tools:
+                index = {}
+                for tool in tools:
+                    index.setdefault(tool.name.lower(), tool)
+                cached = self._indexes[category] = (tools, index)
+        tool = cached[1].get(name.strip().lower())
+        return None if tool is None else (category, tool)
+
+    def loaded_category(self, name):
+        """返回已加载的分类中名为 name 的工具所在的分类，不解析新的分片，找不到时返回 None"""
+        self.refresh()
+        if not self._sharded:
+            found = self.find(name)
+            return None if found is None else found[0]
+        with self._lock:
+            categories = list(self._shards)
+        for category in categories:
+            if self.find_in(category, name) is not None:
+                return category
+        return None
+
+    def tools(self):
+        """返回完整的 {分类: 工具列表} 快照（调用方不应修改返回值）"""
+        self.refresh()
+        if not self._sharded:
+            return self._legacy.data
+        return {category: self.category_tools(category) for category in self.categories()}
+
+
+def resolve_toolset(name):
+    """返回工具集中的 (工具列表, 未找到的工具名称)，工具集不存在时返回 None"""
+    toolsets.refresh()
+    names = toolsets.data.get(name)
+    if names is None:
+        return None
+    tools, missing = [], []
+    for tool_name in names:
+        found = catalog.find(tool_name)
+        if found is None:
+            missing.append(tool_name)
+        else:
+            tools.append(found[1])
+    return tools, missing
+
+
+def write_shards(tools_data, shard_dir=SHARD_DIR):
+    """把 {分类: 工具列表} 拆分写入分片目录，manifest 最后写入"""
+    os.makedirs(shard_dir, exist_ok=True)
+    entries = []
+    for category, tools in tools_data.items():
+        file_name = category.replace(os.sep, "_") + ".json"
+        entries_data = [tool.to_dict() if isinstance(tool, Tool) else tool for tool in tools]
+        with open(os.path.join(shard_dir, file_name), "w", encoding="utf-8") as f:
+            json.dump(entries_data, f, ensure_ascii=False, indent=2)
+        entries.append({"name": category, "file": file_name, "count": len(tools)})
+
+    manifest_path = os.path.join(shard_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"categories": entries}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def entry_problems(tool, where):
+    """校验单个工具条目，返回问题描述列表（为空表示通过），where 为条目位置（如 "信息收集[3]"）"""
+    if not isinstance(tool, dict):
+        return [f"{where}: 工具条目必须是对象"]
+    problems = []
+    if tool.get("name"):
+        where = f"{where} ({tool['name']})"
+    for field in REQUIRED_FIELDS:
+        value = tool.get(field)
+        if not isinstance(value, str) or not value.strip():
+            problems.append(f"{where}: 缺少字段 {field}")
+    tool_type = tool.get("type")
+    if isinstance(tool_type, str) and tool_type and tool_type not in SUPPORTED_EXTENSIONS:
+        problems.append(f"{where}: 不支持的文件类型 {tool_type}")
+    if tool_type == "exe" and tool.get("launch_method", "direct") not in ("direct", "cmd"):
+        problems.append(f"{where}: launch_method 只能是 direct 或 cmd")
+    for field in ("parameters", "version", "description", "usage"):
+        if field in tool and not isinstance(tool[field], str):
+            problems.append(f"{where}: 字段 {field} 必须是字符串")
+    return problems
+
+
+def validate_tools(tools_data):
+    """校验 {分类: 工具列表}，返回问题描述列表（为空表示通过）"""
+    problems = []
+    if not isinstance(tools_data, dict):
+        return ["工具目录顶层必须是以分类为键的对象"]
+
+    for category, tools in tools_data.items():
+        if not isinstance(tools, list):
+            problems.append(f"{category}: 分类内容必须是工具列表")
+            continue
+        for index, tool in enumerate(tools, 1):
+            problems.extend(entry_problems(tool, f"{category}[{index}]"))
+    return problems
+
+
+class _NullSpool:
+    """编译快照时只需要记录字段，长文本单独写入快照"""
+
+    @staticmethod
+    def append(text):
+        return 0, 0
+
+
+_NULL_SPOOL = _NullSpool()
+
+
+def compile_catalog(source=TOOLS_FILE, snapshot_path=SNAPSHOT_FILE):
+    """校验 tools.json 并写入二进制快照，校验失败时抛出 CatalogError"""
+    tools_data = _read_catalog_json(source)
+    problems = validate_tools(tools_data)
+    if problems:
+        raise CatalogError(problems)
+
+    text = io.BytesIO()
+
+    def append(value):
+        data = (value or "").encode("utf-8")
+        offset = text.tell()
+        text.write(data)
+        return offset, len(data)
+
+    header = {}
+    for category, entries in tools_data.items():
+        records = []
+        for entry in entries:
+            tool = Tool.from_dict(entry, _NULL_SPOOL)
+            records.append((tool.to_record(), *append(entry.get("description")), *append(entry.get("usage"))))
+        header[category] = records
+    header_data = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack(">Q", len(header_data)))
+        f.write(header_data)
+        f.write(text.getvalue())
+    os.replace(tmp_path, snapshot_path)
+    return tools_data
+
+
+catalog = Catalog(TOOLS_FILE, shard_dir=SHARD_DIR, snapshot_path=SNAPSHOT_FILE, fallback=DEFAULT_TOOLS)
+toolsets = CachedFile(TOOLSETS_FILE, _parse_toolsets, fallback={})
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+非交互式命令行
+run.py list / show / launch / batch / fanout 的实现：不显示欢迎画面、模拟命令和菜单，结果以纯文本或 JSON 输出到
+stdout，错误信息输出到 stderr，退出码可供脚本判断。
+"""
+
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CONFIG
+
+# 退出码
+EXIT_OK = 0
+EXIT_FAILED = 1  # 工具失败或无法启动
+EXIT_USAGE = 2  # 参数错误、找不到工具、批量文件格式错误
+EXIT_NOPERM = 77  # 身份验证失败（sysexits.h 中的 EX_NOPERM）
+
+# 不交互输入密码时从该环境变量读取
+PASSWORD_ENV = "PORTAL_PASSWORD"
+
+
+class CLIError(Exception):
+    """命令行用法错误，携带退出码"""
+
+    def __init__(self, message, code=EXIT_USAGE):
+        super().__init__(message)
+        self.code = code
+
+
+def error(message):
+    print(f"错误: {message}", file=sys.stderr)
+
+
+def emit(data, as_json, text_lines):
+    """输出结果：as_json 时输出 JSON，否则逐行输出 text_lines() 返回的文本"""
+    if as_json:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for line in text_lines():
+            print(line)
+    sys.stdout.flush()
+
+
+def login():
+    """与交互界面相同的身份验证：当前终端有未过期的会话时直接通过，否则读取环境变量或在终端上提示输入密码"""
+    from utils import session
+
+    if session.resume():
+        return
+    password = os.environ.get(PASSWORD_ENV)
+    if password is not None:
+        if session.verify(password):
+            session.start()
+            return
+        raise CLIError(f"{PASSWORD_ENV} 中的密码错误", EXIT_NOPERM)
+    if not sys.stdin.isatty() and not sys.stderr.isatty():
+        raise CLIError(f"需要身份验证：请设置环境变量 {PASSWORD_ENV}", EXIT_NOPERM)
+
+    import getpass
+
+    for _ in range(CONFIG["max_attempts"]):
+        if session.verify(getpass.getpass("输入系统访问密码: ")):
+            session.start()
+            return
+        print("密码错误", file=sys.stderr)
+    raise CLIError("密码错误次数过多", EXIT_NOPERM)
+
+
+def find_tool(name):
+    from utils.catalog import catalog
+
+    found = catalog.find(name)
+    if found is None:
+        raise CLIError(f"未找到工具: {name}")
+    return found
+
+
+def parse_values(pairs):
+    """把 ["url=http://x", ...] 解析为占位符的值"""
+    values = {}
+    for pair in pairs or ():
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise CLIError(f"参数格式应为 名称=值: {pair}")
+        values[key] = value
+    return values
+
+
+def build_parameters(tool, values, args=None):
+    """返回工具的命令行参数：args 直接指定时使用 args，否则用 values 填充占位符"""
+    from utils.launcher import fill_parameters
+
+    if args is not None:
+        return args
+    try:
+        return fill_parameters(tool, values)
+    except KeyError as e:
+        raise CLIError(f"{tool.name} 缺少占位符 {e.args[0]} 的值（使用 --param {e.args[0]}=...）")
+
+
+def plan(tool, parameters):
+    from utils.launcher import launch_problem, plan_launch
+
+    problem = launch_problem(tool)
+    if problem:
+        raise CLIError(f"{tool.name}: {problem}", EXIT_FAILED)
+    # 单次运行的命令行进程不值得启动预热进程
+    return plan_launch(tool, parameters, detach=False)
+
+
+def exit_status(exit_code):
+    """与 shell 一致：被信号终止时为 128 + 信号值"""
+    if exit_code is None:
+        return EXIT_FAILED
+    return 128 - exit_code if exit_code < 0 else exit_code
+
+
+# 子命令
+
+
+def list_command(args):
+    from utils.catalog import catalog
+    from utils.launcher import tool_summary
+
+    if args.search:
+        from utils.store import search_tools
+
+        entries = search_tools(args.search, args.limit or 20)
+        if args.category:
+            entries = [(category, tool) for category, tool in entries if category == args.category]
+    elif args.category:
+        if args.category not in catalog.categories():
+            raise CLIError(f"未找到分类: {args.category}")
+        entries = [(args.category, tool) for tool in catalog.category_tools(args.category)]
+    else:
+        entries = [(category, tool) for category, tools in catalog.tools().items() for tool in tools]
+    if args.limit:
+        entries = entries[:args.limit]
+
+    tools = [tool_summary(category, tool) for category, tool in entries]
+    emit(tools, args.json, lambda: (
+        "\t".join((tool["name"], tool["category"], tool["type"], tool["version"] or "", tool["status"]))
+        for tool in tools
+    ))
+    return EXIT_OK
+
+
+def show_command(args):
+    from utils.launcher import tool_detail
+
+    detail = tool_detail(*find_tool(args.tool))
+    emit(detail, args.json, lambda: (
+        f"{key}: {', '.join(value) if isinstance(value, list) else value}"
+        for key, value in detail.items() if value not in (None, "", [])
+    ))
+    return EXIT_OK
+
+
+def _detached_spawn(tool, argv, shell, cwd, popen):
+    """在独立会话中启动工具，输出直接写入日志文件，命令行退出后工具继续运行"""
+    from utils.jobs import jobs, log_path
+
+    path = log_path(tool.name, os.getpid())
+    log = open(path, "ab") if path else subprocess.DEVNULL
+    try:
+        return jobs.spawn(tool.name, argv, cwd=cwd, shell=shell, detach=True, popen=popen,
+                          stdout=log, stderr=subprocess.STDOUT), path
+    finally:
+        if path:
+            log.close()
+
+
+def launch_command(args):
+    from utils.history import history
+    from utils.jobs import jobs
+
+    category, tool = find_tool(args.tool)
+    values = parse_values(args.param)
+    argv, shell, cwd, popen = plan(tool, build_parameters(tool, values, args.args))
+    # 直接给出完整参数时不记录占位符的值
+    values = values if args.args is None else None
+
+    if args.detach:
+        try:
+            job, path = _detached_spawn(tool, argv, shell, cwd, popen)
+        except OSError as e:
+            raise CLIError(f"启动 {tool.name} 失败: {e}", EXIT_FAILED)
+        history.record_launch(tool.name, values, category)
+        result = {"tool": tool.name, "pid": job.pid, "state": job.state, "log_path": path}
+        emit(result, args.json, lambda: [f"{tool.name} 已在后台启动 (PID {job.pid})" + (f"，输出记录在 {path}" if path else "")])
+        return EXIT_OK
+
+    # 输出 JSON 时工具的输出记录到日志文件，不与结果混在一起；否则工具直接使用当前终端
+    try:
+        job = jobs.spawn(tool.name, argv, cwd=cwd, shell=shell, detach=args.json, capture=args.json, popen=popen)
+    except OSError as e:
+        raise CLIError(f"启动 {tool.name} 失败: {e}", EXIT_FAILED)
+    history.record_launch(tool.name, values, category)
+    try:
+        job.wait()
+    except KeyboardInterrupt:
+        # 前台运行时 Ctrl+C 已同时发给工具；输出 JSON 时工具在独立进程组中，需要转发
+        if args.json:
+            job.interrupt()
+        job.wait()
+    result = {"tool": tool.name, **job.to_dict()}
+    if args.json:
+        emit(result, True, None)
+    elif job.exit_code != 0:
+        error(f"{tool.name} 退出码 {job.exit_code}")
+    return exit_status(job.exit_code)
+
+
+def parse_spec(line):
+    """解析批量文件中的一行：JSON 对象，或 "工具名称 名称=值 ..."，工具名称含空格时需要加引号"""
+    if line.startswith("{"):
+        spec = json.loads(line)
+    else:
+        name, *pairs = shlex.split(line)
+        spec = {"tool": name, "params": parse_values(pairs)}
+    if not isinstance(spec, dict) or not isinstance(spec.get("tool"), str):
+        raise ValueError("缺少 tool 字段")
+    if not isinstance(spec.get("params", {}), dict):
+        raise ValueError("params 必须是对象")
+    if spec.get("args") is not None and not isinstance(spec["args"], str):
+        raise ValueError("args 必须是字符串")
+    return spec
+
+
+def read_specs(source):
+    """读取批量启动说明：JSON 数组，或每行一个说明（空行和 # 开头的行被忽略）"""
+    if source in (None, "-"):
+        text = sys.stdin.read()
+    else:
+        try:
+            with open(source, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError as e:
+            raise CLIError(f"无法读取 {source}: {e}")
+
+    try:
+        if text.lstrip().startswith("["):
+            items = json.loads(text)
+            if not isinstance(items, list):
+                raise ValueError("顶层必须是数组")
+            return [parse_spec(json.dumps(item)) for item in items]
+        specs = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                try:
+                    specs.append(parse_spec(line))
+                except ValueError as e:
+                    raise ValueError(f"第 {number} 行: {e}")
+        return specs
+    except ValueError as e:
+        raise CLIError(f"批量文件格式错误: {e}")
+
+
+def batch_command(args):
+    """按说明批量启动工具，最多同时运行 concurrency 个，全部结束后输出每个工具的结果"""
+    from utils.history import history
+    from utils.jobs import jobs
+
+    specs = read_specs(args.file)
+    results = [None] * len(specs)
+    plans = []
+    for index, spec in enumerate(specs):
+        result = results[index] = {"tool": spec["tool"], "state": None, "exit_code": None, "error": None}
+        try:
+            category, tool = find_tool(spec["tool"])
+            spec["category"] = category
+            plans.append((index, tool, plan(tool, build_parameters(tool, spec.get("params", {}), spec.get("args")))))
+        except CLIError as e:
+            result["state"] = "无法启动"
+            result["error"] = str(e)
+
+    def run(index, tool, command):
+        argv, shell, cwd, popen = command
+        try:
+            job = jobs.spawn(tool.name, argv, cwd=cwd, shell=shell, capture=True, popen=popen)
+        except OSError as e:
+            results[index].update(state="无法启动", error=f"启动失败: {e}")
+            return
+        spec = specs[index]
+        history.record_launch(tool.name, spec.get("params", {}) if spec.get("args") is None else None, spec["category"])
+        job.wait()
+        results[index].update(job.to_dict(), tool=tool.name)
+
+    concurrency = args.concurrency or CONFIG.get("batch_concurrency", 4)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [executor.submit(run, *item) for item in plans]
+        try:
+            for future in futures:
+                future.result()
+        except KeyboardInterrupt:
+            # 尚未开始的工具不再启动，已启动的工具收到中断信号
+            for future in futures:
+                future.cancel()
+            for job in jobs.running():
+                job.interrupt()
+            for future in futures:
+                if not future.cancelled():
+                    future.result()
+            for result in results:
+                if result["state"] is None:
+                    result["state"] = "已取消"
+
+    emit(results, args.json, lambda: (
+        "\t".join((
+            result["tool"], result["state"] or "",
+            "" if result["exit_code"] is None else str(result["exit_code"]),
+            result["error"] or result.get("log_path") or "",
+        ))
+        for result in results
+    ))
+    return EXIT_OK if all(result["exit_code"] == 0 for result in results) else EXIT_FAILED
+
+
+def fanout_command(args):
+    """按目标列表运行工具，每个目标一行结果，全部成功时退出码为 0"""
+    import threading
+
+    from utils.fanout import SUCCEEDED, expand_targets, read_targets, run_fanout, source_value, write_results
+    from utils.history import history
+    from utils.launcher import launch_problem, target_placeholder
+
+    category, tool = find_tool(args.tool)
+    values = parse_values(args.param)
+    problem = launch_problem(tool)
+    if problem:
+        raise CLIError(f"{tool.name}: {problem}", EXIT_FAILED)
+    try:
+        invocations = expand_targets(tool, read_targets(args.targets), values, args.key)
+    except OSError as e:
+        raise CLIError(f"无法读取 {args.targets}: {e}")
+    except ValueError as e:
+        raise CLIError(str(e))
+    # 记录目标列表（标准输入除外），交互界面中下次启动该工具时默认沿用
+    if args.targets != "-":
+        values = {**values, args.key or target_placeholder(tool): source_value(args.targets)}
+    history.record_launch(tool.name, values, category)
+
+    def progress(result):
+        if not args.json:
+            print(f"{result['target']}\t{result['state']}\t"
+                  f"{'' if result['exit_code'] is None else result['exit_code']}\t"
+                  f"{result['error'] or result['log_path'] or ''}", flush=True)
+
+    cancelled = threading.Event()
+    results = run_fanout(tool, invocations, args.concurrency, args.rate, args.retries,
+                         on_result=progress, cancelled=cancelled)
+    path = write_results(tool, results)
+    if args.json:
+        emit({"tool": tool.name, "results_path": path, "results": results}, True, None)
+    else:
+        succeeded = sum(result["state"] == SUCCEEDED for result in results)
+        print(f"{tool.name}: {succeeded}/{len(results)} 个目标成功" + (f"，结果记录在 {path}" if path else ""),
+              file=sys.stderr)
+    return EXIT_OK if all(result["state"] == SUCCEEDED for result in results) else EXIT_FAILED
+
+
+COMMANDS = {
+    "list": list_command,
+    "show": show_command,
+    "launch": launch_command,
+    "batch": batch_command,
+    "fanout": fanout_command,
+}
+
+
+def add_parsers(subparsers):
+    """在 run.py 的参数解析器中登记子命令"""
+    list_parser = subparsers.add_parser("list", help="列出工具（名称、分类、类型、版本、状态）")
+    list_parser.add_argument("--category", help="只列出该分类")
+    list_parser.add_argument("--search", help="按关键词检索")
+    list_parser.add_argument("--limit", type=int, help="最多列出的工具数")
+
+    show_parser = subparsers.add_parser("show", help="显示工具的完整信息")
+    show_parser.add_argument("tool", help="工具名称（不区分大小写）")
+
+    launch_parser = subparsers.add_parser("launch", help="启动工具，退出码为工具的退出码")
+    launch_parser.add_argument("tool", help="工具名称（不区分大小写）")
+    launch_parser.add_argument("--param", "-p", action="append", metavar="名称=值", help="填充参数中的占位符，可重复")
+    launch_parser.add_argument("--args", help="直接指定工具的命令行参数，不使用配置中的参数")
+    launch_parser.add_argument("--detach", action="store_true", help="在后台启动后立即返回，输出记录到日志文件")
+
+    batch_parser = subparsers.add_parser("batch", help="按文件或标准输入中的说明批量启动工具")
+    batch_parser.add_argument("file", nargs="?", default="-", help="说明文件，省略或为 - 时读取标准输入")
+    batch_parser.add_argument("--concurrency", "-j", type=int, help="最多同时运行的工具数")
+
+    fanout_parser = subparsers.add_parser("fanout", help="按目标列表（文件、网段或标准输入）多次运行同一个工具")
+    fanout_parser.add_argument("tool", help="工具名称（不区分大小写）")
+    fanout_parser.add_argument("--targets", "-t", required=True, metavar="文件|网段|-",
+                               help="目标列表：每行一个目标的文件、网段（如 10.0.0.0/24）或 - 表示标准输入")
+    fanout_parser.add_argument("--key", "-k", help="目标填充的占位符，默认为 url 或第一个占位符")
+    fanout_parser.add_argument("--param", "-p", action="append", metavar="名称=值", help="所有目标共用的占位符的值，可重复")
+    fanout_parser.add_argument("--concurrency", "-j", type=int, help="最多同时运行的进程数")
+    fanout_parser.add_argument("--rate", type=float, help="每秒最多启动的进程数，0 表示不限制")
+    fanout_parser.add_argument("--retries", type=int, help="每个目标失败后的最多重试次数")
+
+    for sub in (list_parser, show_parser, launch_parser, batch_parser, fanout_parser):
+        sub.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+
+
+def run(args):
+    """执行子命令并返回退出码"""
+    try:
+        login()
+        return COMMANDS[args.command](args)
+    except CLIError as e:
+        error(str(e))
+        return e.code
+    except KeyboardInterrupt:
+        return 128 + signal.SIGINT
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import json
+import os
+import shutil
+import site
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SUPPORTED_EXTENSIONS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 环境检查结果缓存，解释器、PATH 和 site-packages 都没有变化时直接复用
+ENV_CACHE_FILE = os.path.join(BASE_DIR, "data", "environment.json")
+CACHE_FORMAT = 1
+
+# 运行门户所需的 Python 包
+REQUIRED_PACKAGES = ("rich",)
+# 查询运行时版本的参数，None 表示不查询（cscript 没有只打印版本的参数）
+VERSION_ARGS = {
+    "java": ["-version"],
+    "python": ["--version"],
+    "php": ["--version"],
+    "node": ["--version"],
+    "bash": ["--version"],
+    "cscript": None,
+}
+VERSION_TIMEOUT = 5
+
+
+def runtime_types():
+    """返回 {运行时命令: [依赖它的工具类型]}，由 SUPPORTED_EXTENSIONS 推导"""
+    runtimes = {}
+    for tool_type, configs in SUPPORTED_EXTENSIONS.items():
+        if isinstance(configs, dict):
+            configs = [configs]
+        for launch_config in configs:
+            parts = launch_config.get("command", "").split()
+            if parts and tool_type not in runtimes.setdefault(parts[0], []):
+                runtimes[parts[0]].append(tool_type)
+    return runtimes
+
+
+def _site_mtime():
+    """site-packages 目录的最新修改时间，安装或卸载包都会改变它"""
+    paths = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+    if site.ENABLE_USER_SITE:
+        paths.append(site.getusersitepackages())
+    stamps = []
+    for path in paths:
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            continue
+    return max(stamps, default=0)
+
+
+def cache_key():
+    """决定缓存是否有效的环境指纹"""
+    return {
+        "format": CACHE_FORMAT,
+        "executable": sys.executable,
+        "path": os.environ.get("PATH", ""),
+        "site_mtime": _site_mtime(),
+        "runtimes": sorted(runtime_types()),
+    }
+
+
+def probe_packages(packages=REQUIRED_PACKAGES):
+    """检查 Python 包是否可以导入（只查找模块规格，不真正导入）"""
+    return {package: importlib.util.find_spec(package) is not None for package in packages}
+
+
+def _runtime_version(path, args):
+    try:
+        result = subprocess.run(
+            [path, *args], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=VERSION_TIMEOUT
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    for line in result.stdout.decode("utf-8", errors="replace").splitlines():
+        if line.strip():
+            return line.strip()[:80]
+    return None
+
+
+def _probe_runtime(command, versions):
+    path = shutil.which(command)
+    version = None
+    if path and versions and VERSION_ARGS.get(command):
+        version = _runtime_version(path, VERSION_ARGS[command])
+    return {"path": path, "version": version, "types": runtime_types()[command]}
+
+
+def probe_runtimes(versions=True):
+    """并行查找全部运行时，返回 {命令: {"path", "version", "types"}}"""
+    commands = sorted(runtime_types())
+    with ThreadPoolExecutor(max_workers=len(commands) or 1) as pool:
+        results = pool.map(lambda command: _probe_runtime(command, versions), commands)
+        return dict(zip(commands, results))
+
+
+def load_cached(path=ENV_CACHE_FILE):
+    """返回仍然有效的缓存结果，环境有变化或缓存不可读时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != cache_key():
+        return None
+    return cached
+
+
+def save(packages, runtimes, path=ENV_CACHE_FILE):
+    """写入检查结果并返回，缓存目录不可写时只返回结果"""
+    environment = {"key": cache_key(), "probed_at": time.time(), "packages": packages, "runtimes": runtimes}
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(environment, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return environment
+
+
+_environment = None
+
+
+def get_environment(force=False):
+    """返回当前环境的检查结果，缓存有效时不做任何检查"""
+    global _environment
+    if force or _environment is None:
+        cached = None if force else load_cached()
+        _environment = cached or save(probe_packages(), probe_runtimes())
+    return _environment
+
+
+def set_environment(environment):
+    """登记由启动脚本完成的检查结果，供菜单复用"""
+    global _environment
+    _environment = environment
+
+
+def missing_packages(environment):
+    return [package for package, found in environment["packages"].items() if not found]
+
+
+def missing_runtimes(environment):
+    """返回 {缺失的运行时命令: [受影响的工具类型]}"""
+    return {
+        command: info["types"] for command, info in environment["runtimes"].items() if not info["path"]
+    }
+
+
+def missing_runtime(tool_type):
+    """返回该类型工具缺失的运行时命令，运行时可用或不需要运行时时返回 None"""
+    for command, types in missing_runtimes(get_environment()).items():
+        if tool_type in types:
+            return command
+    return None
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按目标列表批量运行同一个工具
+目标列表可以是文件（每行一个目标，# 开头为注释）、网段（如 10.0.0.0/24，展开为其中的主机地址）或标准输入（-）。
+每个目标填充一个占位符（默认 {url}），一行中也可以用 名称=值 同时给出多个占位符的值。展开后的每次运行通过
+线程池执行：最多同时运行 CONFIG["fanout_concurrency"] 个，每秒最多启动 CONFIG["fanout_rate"] 个，
+失败（退出码非 0 或无法启动）时最多重试 CONFIG["fanout_retries"] 次，每次重试前的等待时间加倍。
+"""
+
+import ipaddress
+import json
+import os
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CONFIG
+
+# 参数提示中以该前缀开头的值表示目标列表（单个 @ 原样传给工具，如 curl 的 @文件 或 @用户名）
+TARGETS_PREFIX = "@@"
+
+# 单个结果的状态
+SUCCEEDED = "成功"
+FAILED = "失败"
+CANCELLED = "已取消"
+
+
+def read_targets(source):
+    """读取目标列表：- 为标准输入，存在的文件按行读取，否则按网段展开；去掉空行、注释和重复的目标"""
+    limit = CONFIG.get("fanout_max_targets", 65536)
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    elif os.path.isfile(source):
+        with open(source, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    else:
+        try:
+            network = ipaddress.ip_network(source, strict=False)
+        except ValueError:
+            raise ValueError(f"目标列表既不是文件也不是网段: {source}")
+        if network.num_addresses > limit:
+            raise ValueError(f"网段 {network} 包含 {network.num_addresses} 个地址，超过上限 {limit}")
+        # /31、/32 等没有可分配主机地址的网段展开为其全部地址
+        hosts = list(network.hosts()) or list(network)
+        return [str(host) for host in hosts]
+
+    targets = list(dict.fromkeys(
+        line.strip() for line in lines if line.strip() and not line.strip().startswith("#")
+    ))
+    if len(targets) > limit:
+        raise ValueError(f"目标列表包含 {len(targets)} 个目标，超过上限 {limit}")
+    return targets
+
+
+def target_source(value):
+    """参数值以 TARGETS_PREFIX 开头时返回其后的目标列表（文件或网段），否则返回 None"""
+    if isinstance(value, str) and value.startswith(TARGETS_PREFIX) and len(value) > len(TARGETS_PREFIX):
+        return value[len(TARGETS_PREFIX):]
+    return None
+
+
+def source_value(source):
+    """记录到启动历史中的目标列表参数值，文件使用绝对路径，下次从任何目录启动都能找到"""
+    if source != "-" and os.path.isfile(source):
+        source = os.path.abspath(source)
+    return TARGETS_PREFIX + source
+
+
+def _target_values(line, names, key):
+    """一行目标对应的占位符的值：全部是 名称=值 且名称都是占位符时按多个值解析，否则整行作为 key 的值"""
+    try:
+        tokens = shlex.split(line)
+    except ValueError:
+        tokens = []
+    pairs = [token.partition("=") for token in tokens]
+    if pairs and all(sep and name in names for name, sep, _ in pairs):
+        return {name: value for name, _, value in pairs}
+    return {key: line}
+
+
+def expand_targets(tool, targets, values=None, key=None):
+    """把目标展开为 [(目标, 占位符的值)]；values 为所有目标共用的值，key 为目标填充的占位符（默认 url 或第一个占位符）"""
+    from utils.launcher import placeholders, target_placeholder
+
+    names = placeholders(tool)
+    if not names:
+        raise ValueError(f"{tool.name} 的参数中没有占位符，无法按目标展开")
+    key = key or target_placeholder(tool)
+    if key not in names:
+        raise ValueError(f"{tool.name} 的参数中没有占位符 {key}")
+    common = {name: value for name, value in (values or {}).items() if name != key}
+
+    invocations = []
+    for target in targets:
+        target_values = {**common, **_target_values(target, names, key)}
+        missing = [name for name in names if name not in target_values]
+        if missing:
+            raise ValueError(f"目标 {target} 缺少占位符 {', '.join(missing)} 的值")
+        invocations.append((target, target_values))
+    return invocations
+
+
+class RateLimiter:
+    """按固定间隔放行：每秒最多 rate 次，rate 为 0 或 None 时不限制"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, cancelled):
+        """等待下一个放行时刻，取消时返回 False"""
+        if not self.interval:
+            return not cancelled.is_set()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        return not cancelled.wait(max(0.0, slot - time.monotonic()))
+
+
+def run_fanout(tool, invocations, concurrency=None, rate=None, retries=None, retry_delay=None,
+               on_result=None, cancelled=None):
+    """按目标运行工具，返回与 invocations 顺序相同的结果列表
+
+    每个结果为 {"target", "state", "exit_code", "attempts", "duration", "log_path", "error"}；
+    on_result(结果) 在每个目标结束时调用（在工作线程中）。cancelled 被设置（或按下 Ctrl+C）后不再启动新的运行，
+    仍在运行的作业收到中断信号并记为已取消，但留在作业表中，可以用 jobs 查看、kill 终止。
+    运行中的作业出现在作业表中，结束后立即移除，只保留结果和日志路径，目标再多内存也不会随之增长。
+    """
+    from utils.jobs import jobs
+    from utils.launcher import BATCH_POLL_SECONDS, fill_parameters, plan_launch
+
+    concurrency = max(1, concurrency or CONFIG.get("fanout_concurrency", 8))
+    rate = CONFIG.get("fanout_rate", 0) if rate is None else rate
+    retries = max(0, CONFIG.get("fanout_retries", 1) if retries is None else retries)
+    retry_delay = CONFIG.get("fanout_retry_delay", 1.0) if retry_delay is None else retry_delay
+    cancelled = cancelled or threading.Event()
+    limiter = RateLimiter(rate)
+    capture = CONFIG.get("capture_output", True)
+    results = [None] * len(invocations)
+
+    def run(index, target, values):
+        result = {"target": target, "state": CANCELLED, "exit_code": None, "attempts": 0, "duration": 0.0,
+                  "log_path": None, "error": None}
+        for attempt in range(retries + 1):
+            # 重试前的等待时间逐次加倍
+            if attempt and cancelled.wait(retry_delay * 2 ** (attempt - 1)):
+                break
+            if not limiter.wait(cancelled):
+                break
+            result["attempts"] = attempt + 1
+            try:
+                argv, shell, cwd, popen = plan_launch(tool, fill_parameters(tool, values))
+                job = jobs.spawn(tool.name, argv, cwd=cwd, shell=shell, capture=capture, popen=popen)
+            except OSError as e:
+                result.update(state=FAILED, exit_code=None, error=f"启动失败: {e}")
+                continue
+            # 作业运行在独立会话中，收不到终端的 Ctrl+C：轮询等待，取消后立即返回
+            while not job.wait(BATCH_POLL_SECONDS) and not cancelled.is_set():
+                pass
+            if not job.finished.is_set():
+                job.interrupt()
+                result.update(
+                    state=CANCELLED, exit_code=None, error=f"已取消，作业 {job.id} 已收到中断信号",
+                    duration=round(job.duration, 3),
+                    log_path=job.output.log_path if job.output is not None else None,
+                )
+                break
+            jobs.discard(job)
+            result.update(
+                state=SUCCEEDED if job.exit_code == 0 else FAILED, exit_code=job.exit_code, error=None,
+                duration=round(job.duration, 3),
+                log_path=job.output.log_path if job.output is not None else None,
+            )
+            if job.exit_code == 0:
+                break
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run, index, target, values)
+                   for index, (target, values) in enumerate(invocations)]
+        try:
+            for future in futures:
+                future.result()
+        except KeyboardInterrupt:
+            cancelled.set()
+            for future in futures:
+                future.result()
+    return results
+
+
+def results_path(tool):
+    """按目标运行结果的 JSON Lines 文件路径，日志目录不可写时返回 None"""
+    from utils.jobs import log_path
+
+    path = log_path(tool.name, "fanout")
+    return None if path is None else os.path.splitext(path)[0] + ".jsonl"
+
+
+def write_results(tool, results):
+    """把每个目标的结果写入日志目录，返回文件路径，无法写入时返回 None"""
+    path = results_path(tool)
+    if path is None:
+        return None
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps({"tool": tool.name, **result}, ensure_ascii=False) + "\n")
+    except OSError:
+        return None
+    return path
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import codecs
+import heapq
+import itertools
+import os
+import re
+import select
+import sys
+
+from rich.console import Group
+from rich.live import Live
+from rich.text import Text
+
+from utils.catalog import catalog
+from utils.terminal import console
+
+# 列表中最多显示的候选项数
+MAX_VISIBLE = 10
+
+KEY_ENTER = "enter"
+KEY_TAB = "tab"
+KEY_BACKSPACE = "backspace"
+KEY_ESCAPE = "escape"
+KEY_UP = "up"
+KEY_DOWN = "down"
+# 单独的 Esc 与方向键等转义序列的区分：Esc 之后这段时间内没有后续字节即视为 Esc 键
+ESCAPE_WAIT = 0.05
+
+
+class FinderIndex:
+    """工具和分类名称的检索索引
+
+    字符倒排表用于快速缩小候选集，排序数组用于前缀查找和补全，全部名称拼接成一个字符串
+    用于子串查找。结果按“前缀命中 > 子串命中 > 模糊命中”分层填充，凑够显示数量即停止，
+    每次按键不需要对全部条目逐一打分。
+    """
+
+    def __init__(self, entries):
+        # entries: [(显示名称, 分类, 工具或 None)]，工具为 None 表示分类本身
+        self.entries = entries
+        self.keys = [label.lower().replace("\n", " ") for label, _, _ in entries]
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for char in set(key):
+                postings.setdefault(char, []).append(i)
+        self.postings = {char: frozenset(ids) for char, ids in postings.items()}
+        self.sorted_keys = sorted((key, i) for i, key in enumerate(self.keys))
+        self.blob = "\n".join(self.keys)
+        self.starts = []
+        offset = 0
+        for key in self.keys:
+            self.starts.append(offset)
+            offset += len(key) + 1
+        self._last_query = None
+        self._last_candidates = None
+
+    def _candidates(self, query):
+        """返回包含查询中全部字符的条目编号（匹配结果的超集）"""
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_candidates
+        else:
+            candidates = None
+        for char in set(query):
+            posting = self.postings.get(char)
+            if posting is None:
+                return frozenset()
+            candidates = posting if candidates is None else candidates & posting
+        return candidates
+
+    def _prefix_hits(self, prefix, limit):
+        start = bisect.bisect_left(self.sorted_keys, (prefix, -1))
+        hits = []
+        for key, i in itertools.islice(self.sorted_keys, start, None):
+            if not key.startswith(prefix) or len(hits) >= limit:
+                break
+            hits.append(i)
+        return hits
+
+    def match(self, query, limit=MAX_VISIBLE):
+        """返回按相关度排序的条目编号"""
+        query = query.lower()
+        if not query:
+            self._last_query = None
+            return list(range(min(limit, len(self.entries))))
+
+        candidates = self._candidates(query)
+        self._last_query = query
+        self._last_candidates = candidates
+        if not candidates:
+            return []
+
+        hits = self._prefix_hits(query, limit)
+        if len(hits) < limit:
+            # 子串命中：在拼接后的字符串中查找，按目录顺序取够即停
+            seen = set(hits)
+            for found in re.finditer(re.escape(query), self.blob):
+                i = bisect.bisect_right(self.starts, found.start()) - 1
+                if i not in seen:
+                    seen.add(i)
+                    hits.append(i)
+                    if len(hits) >= limit:
+                        break
+
+            if len(hits) < limit:
+                # 模糊命中：按顺序包含全部字符，匹配跨度越短越靠前
+                pattern = re.compile(".*?".join(map(re.escape, query)))
+                fuzzy = []
+                for i in candidates:
+                    if i in seen:
+                        continue
+                    found = pattern.search(self.keys[i])
+                    if found is not None:
+                        fuzzy.append((found.end() - found.start(), len(self.keys[i]), i))
+                hits.extend(i for _, _, i in heapq.nsmallest(limit - len(hits), fuzzy))
+        return hits
+
+    def complete(self, prefix, limit=50):
+        """返回以 prefix 开头的名称（不区分大小写）"""
+        return [self.entries[i][0] for i in self._prefix_hits(prefix.lower(), limit)]
+
+
+_index = None
+_index_version = None
+
+
+def get_index():
+    """返回当前目录版本对应的索引，目录变化时重新构建"""
+    global _index, _index_version
+    catalog.refresh()
+    if _index is None or _index_version != catalog.version:
+        entries = []
+        for category, tools in catalog.tools().items():
+            entries.append((category, category, None))
+            for tool in tools:
+                entries.append((tool.name, category, tool))
+        _index = FinderIndex(entries)
+        _index_version = catalog.version
+    return _index
+
+
+def common_prefix(names):
+    """返回名称列表的最长公共前缀"""
+    if not names:
+        return ""
+    return os.path.commonprefix(names)
+
+
+def _read_key_windows():
+    import msvcrt
+
+    char = msvcrt.getwch()
+    if char in ("\x00", "\xe0"):
+        code = msvcrt.getwch()
+        return {"H": KEY_UP, "P": KEY_DOWN}.get(code, "")
+    return char
+
+
+class _PosixKeys:
+    """从终端逐个读取按键
+
+    一次读取可能包含多个按键（粘贴、快速输入），中文等多字节字符也可能被拆在两次读取之间，
+    因此用增量解码器解码后逐个字符返回。
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.pending = ""
+
+    def _fill(self, timeout=None):
+        """读取更多输入，timeout 内没有输入时返回 False；输入结束时补一个 Esc，让查找退出"""
+        if timeout is not None and not select.select([self.fd], [], [], timeout)[0]:
+            return False
+        data = os.read(self.fd, 64)
+        self.pending += self.decoder.decode(data) if data else "\x1b"
+        return True
+
+    def _take(self):
+        char, self.pending = self.pending[0], self.pending[1:]
+        return char
+
+    def read(self):
+        while not self.pending:
+            self._fill()
+        char = self._take()
+        if char != "\x1b":
+            return char
+        if not self.pending and not self._fill(ESCAPE_WAIT):
+            return char
+        if not self.pending.startswith("["):
+            return char
+        # CSI 序列（如 ESC [ A、ESC [ 1 ; 5 A）读到结束字节为止，只识别上下方向键
+        self._take()
+        sequence = ""
+        while True:
+            if not self.pending and not self._fill(ESCAPE_WAIT):
+                return ""
+            sequence += self._take()
+            if "\x40" <= sequence[-1] <= "\x7e":
+                return {"A": KEY_UP, "B": KEY_DOWN}.get(sequence[-1], "")
+
+
+def _normalize_key(char):
+    if char in ("\r", "\n"):
+        return KEY_ENTER
+    if char == "\t":
+        return KEY_TAB
+    if char in ("\x7f", "\x08"):
+        return KEY_BACKSPACE
+    if char == "\x1b":
+        return KEY_ESCAPE
+    if char == "\x03":
+        raise KeyboardInterrupt
+    return char
+
+
+def _render(query, index, hits, selected):
+    lines = [Text.assemble(("🔎 ", "bold yellow"), (query, "bold white"), ("▏", "bold green"))]
+    for row, i in enumerate(hits):
+        label, category, tool = index.entries[i]
+        style = "reverse bold green" if row == selected else "green"
+        kind = f"[{category}]" if tool is not None else "[分类]"
+        lines.append(Text.assemble(("  " if row != selected else "➜ ", "bold green"), (label, style), (f"  {kind}", "dim")))
+    if not hits:
+        lines.append(Text("  没有匹配的工具或分类", style="dim red"))
+    lines.append(Text("↑/↓ 选择  Tab 补全  Enter 确认  Esc 取消", style="dim"))
+    return Group(*lines)
+
+
+def pick(query=""):
+    """交互式模糊查找，返回 (分类, 工具或 None)，取消时返回 None"""
+    index = get_index()
+
+    if os.name == "nt":
+        read_key = _read_key_windows
+        restore = None
+    else:
+        if not sys.stdin.isatty():
+            return None
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+
+        read_key = _PosixKeys(fd).read
+
+        def restore():
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+    selected = 0
+    hits = index.match(query)
+    try:
+        with Live(_render(query, index, hits, selected), console=console, auto_refresh=False, transient=True) as live:
+            while True:
+                key = _normalize_key(read_key())
+                if key == KEY_ESCAPE:
+                    return None
+                if key == KEY_ENTER:
+                    if not hits:
+                        continue
+                    _, category, tool = index.entries[hits[selected]]
+                    return category, tool
+                if key == KEY_UP:
+                    selected = max(0, selected - 1)
+                elif key == KEY_DOWN:
+                    selected = min(len(hits) - 1, selected + 1) if hits else 0
+                else:
+                    if key == KEY_BACKSPACE:
+                        query = query[:-1]
+                    elif key == KEY_TAB:
+                        completed = common_prefix([name.lower() for name in index.complete(query)])
+                        if len(completed) > len(query):
+                            query = completed
+                        elif hits:
+                            query = index.entries[hits[selected]][0].lower()
+                    elif key.isprintable():
+                        query += key
+                    hits = index.match(query)
+                    selected = 0
+                live.update(_render(query, index, hits, selected), refresh=True)
+    finally:
+        if restore is not None:
+            restore()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SUPPORTED_EXTENSIONS
+from utils.catalog import catalog
+from utils.environment import get_environment
+from utils.tool import get_launch_config, resolve_path
+
+# 工具状态
+OK = "正常"
+MISSING = "文件缺失"
+NO_RUNTIME = "缺少运行时"
+UNSUPPORTED = "不支持的类型"
+
+# 并发 stat 的线程数，网络文件系统上单次 stat 可能很慢
+SCAN_WORKERS = 16
+# 两次检查目录修改时间之间的最短间隔（秒）
+RECHECK_INTERVAL = 2.0
+
+ToolHealth = namedtuple("ToolHealth", ["status", "path", "interpreter", "runtime"])
+
+
+def _dir_stamp(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class HealthScanner:
+    """工具目录的健康检查
+
+    只检查实际用到的工具：工具列表扫描当前页，doctor 扫描全部工具，分片模式下不会因此解析其他分类。
+    同一目录中的路径并发 stat，每种工具类型的解释器只解析一次。结果按目录版本缓存，
+    已检查过的工具所在目录的修改时间变化（文件被添加、删除或改名）时全部作废，菜单和启动器只查表。
+    """
+
+    def __init__(self):
+        self._exists = {}
+        self._interpreters = None
+        self._dir_stamps = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # 每次检查结果作废后递增，供依赖检查结果的缓存判断是否失效
+        self.generation = 0
+
+    def _stale(self):
+        if self._version != catalog.version:
+            return True
+        if time.monotonic() - self._checked_at < RECHECK_INTERVAL:
+            return False
+        self._checked_at = time.monotonic()
+        return any(_dir_stamp(path) != stamp for path, stamp in self._dir_stamps.items())
+
+    def _reset(self, force):
+        """作废全部检查结果，重新解析每种工具类型的解释器"""
+        runtimes = get_environment(force=force)["runtimes"]
+        interpreters = {}
+        for tool_type, configs in SUPPORTED_EXTENSIONS.items():
+            launch_config = configs[0] if isinstance(configs, list) else configs
+            parts = launch_config.get("command", "").split()
+            interpreters[tool_type] = (parts[0], runtimes.get(parts[0], {}).get("path")) if parts else None
+        self._interpreters = interpreters
+        self._exists = {}
+        self._dir_stamps = {}
+        self._version = catalog.version
+        self._checked_at = time.monotonic()
+        self.generation += 1
+
+    def _validate(self, force=False):
+        """检查结果过期时作废，返回是否作废过（调用者持有锁）"""
+        if force or self._interpreters is None or self._stale():
+            self._reset(force)
+            return True
+        return False
+
+    def scan(self, tools=(), force=False):
+        """检查 tools 中尚未检查过的工具文件，检查结果过期时先全部作废；返回是否作废过"""
+        catalog.refresh()
+        with self._lock:
+            reset = self._validate(force)
+            paths = sorted({resolve_path(tool) for tool in tools} - self._exists.keys())
+            if not paths:
+                return reset
+            dirs = sorted({os.path.dirname(path) for path in paths} - self._dir_stamps.keys())
+            with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+                self._dir_stamps.update(zip(dirs, pool.map(_dir_stamp, dirs)))
+                self._exists.update(zip(paths, pool.map(os.path.isfile, paths)))
+            return reset
+
+    def check(self, tool):
+        """返回工具的健康状态 ToolHealth；不重新加载目录，过期判断受 RECHECK_INTERVAL 限制"""
+        path = resolve_path(tool)
+        launch_config = get_launch_config(tool)
+        if not launch_config:
+            return ToolHealth(UNSUPPORTED, path, None, None)
+
+        with self._lock:
+            self._validate()
+            interpreter = self._interpreters.get(tool.type)
+            exists = self._exists.get(path)
+        runtime, interpreter_path = interpreter if interpreter else (None, None)
+        if exists is None:
+            # 尚未检查过的工具单独检查一次
+            self.scan([tool])
+            exists = self._exists.get(path, False)
+        if not exists:
+            return ToolHealth(MISSING, path, interpreter_path, runtime)
+        if runtime and interpreter_path is None:
+            return ToolHealth(NO_RUNTIME, path, None, runtime)
+        return ToolHealth(OK, path, interpreter_path, runtime)
+
+    def problems(self):
+        """检查全部工具，返回 [(分类, 工具, ToolHealth)]，只包含状态不正常的工具"""
+        tools_data = catalog.tools()
+        self.scan([tool for tools in tools_data.values() for tool in tools])
+        results = []
+        for category, tools in tools_data.items():
+            for tool in tools:
+                health = self.check(tool)
+                if health.status != OK:
+                    results.append((category, tool, health))
+        return results
+
+
+health = HealthScanner()
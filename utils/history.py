@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动历史
+每次启动和每个作业结束时向 CONFIG["history_file"] 追加一行 JSON：启动时记录占位符的值，结束时记录运行时长、
+用户态和内核态 CPU 时间、峰值常驻内存、退出码或结束信号。多个门户进程（菜单、启动接口、命令行）可以同时追加。
+内存中为每个工具保留 frecency 分数、上次的参数和最近 CONFIG["history_window"] 次运行，之后只读取文件新增的部分；
+文件中的过期记录积累到一定数量时压缩为每个工具的汇总。
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from config import CONFIG
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 启动记录中有工具参数的值（目标、可能还有凭据），与登录会话文件一样只允许当前用户读写
+PRIVATE_MODE = 0o600
+
+# 最近若干次运行的统计；CPU 和内存在没有资源占用记录（如 Windows）时为 None
+ToolStats = namedtuple("ToolStats", [
+    "runs", "failures", "wall", "user_cpu", "sys_cpu", "max_rss_kb", "peak_rss_kb", "last_exit", "last_signal",
+    "rss_runs",
+])
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def format_rss(kb):
+    """把以 KB 为单位的内存大小格式化为便于阅读的文本"""
+    if kb is None:
+        return "未知"
+    if kb >= 1024 * 1024:
+        return f"{kb / 1024 / 1024:.1f} GB"
+    if kb >= 1024:
+        return f"{kb / 1024:.1f} MB"
+    return f"{kb} KB"
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "未知"
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    if seconds < 60:
+        return f"{seconds:.2f} s"
+    return f"{int(seconds // 60)} 分 {seconds % 60:.0f} 秒"
+
+
+def describe_run(job):
+    """一次运行的资源占用摘要，例如 "耗时 1.20 s · CPU 用户 0.80 s / 系统 0.10 s · 峰值内存 35.2 MB\""""
+    parts = [f"耗时 {format_seconds(job.duration)}"]
+    if job.usage is not None:
+        parts.append(f"CPU 用户 {format_seconds(job.usage.user_cpu)} / 系统 {format_seconds(job.usage.sys_cpu)}")
+        parts.append(f"峰值内存 {format_rss(job.usage.max_rss_kb)}")
+    return " · ".join(parts)
+
+
+def describe_stats(stats):
+    """工具详情中显示的最近运行统计（多行文本）
+
+    峰值内存只统计能确定的运行：子进程由门户（或预热进程）fork 而来，ru_maxrss 不超过门户自身的峰值时
+    无法与继承的内存区分，此时 Linux 上使用运行期间采样的 VmHWM（只包括直接启动的进程），否则记为未知。
+    """
+    if stats is None:
+        return "暂无启动记录"
+    lines = [f"最近 {stats.runs} 次平均耗时 {format_seconds(stats.wall)}"]
+    if stats.user_cpu is not None:
+        lines.append(f"CPU 用户 {format_seconds(stats.user_cpu)} / 系统 {format_seconds(stats.sys_cpu)}")
+    if stats.max_rss_kb is not None:
+        lines.append(f"峰值内存 平均 {format_rss(stats.max_rss_kb)} / 最高 {format_rss(stats.peak_rss_kb)}"
+                     f"（{stats.rss_runs} 次可确定）")
+    last = stats.last_signal or f"退出码 {stats.last_exit}"
+    lines.append(f"失败 {stats.failures} 次 · 上次结束: {last}")
+    return "\n".join(lines)
+
+
+def _restrict(fd):
+    """把早期版本以 0644 创建的历史文件收紧为仅当前用户可读写（Windows 上不处理）"""
+    if os.name == "nt":
+        return
+    try:
+        if os.fstat(fd).st_mode & 0o077:
+            os.fchmod(fd, PRIVATE_MODE)
+    except OSError:
+        pass
+
+
+def _lock_file(fd):
+    """独占锁住历史文件，关闭文件时自动释放（Windows 上不加锁）"""
+    if os.name == "nt":
+        return
+    import fcntl
+
+    fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _same_file(fd, st):
+    """打开的文件与 stat 结果是否是同一个文件"""
+    opened = os.fstat(fd)
+    return (opened.st_dev, opened.st_ino) == (st.st_dev, st.st_ino)
+
+
+def _replaced(fd, path):
+    """打开的文件是否已被压缩后的新文件替换"""
+    try:
+        return not _same_file(fd, os.stat(path))
+    except OSError:
+        return True
+
+
+class LaunchHistory:
+    """追加写入的启动历史及其内存中的状态
+
+    文件中有三种记录：每次启动一条 launch（工具名称、时间、占位符的值），每次结束一条 exit（资源占用），
+    压缩后每个工具一条 state（此前全部启动的汇总）。每个工具的 frecency 分数按半衰期指数衰减，
+    读到一条 launch 只需更新该工具的分数，排序不必重读整个文件。
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self._tools = {}
+        self._file = None
+        self._offset = 0
+        self._lines = 0
+        self._lock = threading.Lock()
+        # 读入新记录后递增，供依赖统计结果的缓存判断是否失效
+        self.version = 0
+
+    @property
+    def path(self):
+        """历史文件的绝对路径，CONFIG["history_file"] 为空时返回 None"""
+        path = CONFIG.get("history_file")
+        return os.path.join(BASE_DIR, path) if path else None
+
+    def _append(self, entry):
+        """追加一条记录，写入失败时忽略（不影响工具的启动和运行）"""
+        path = self.path
+        if path is None:
+            return False
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            written = False
+            while not written:
+                # O_APPEND 保证多个进程同时追加时每行完整；文件锁避免写入已被压缩替换的旧文件，被替换时重新打开
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, PRIVATE_MODE)
+                try:
+                    _restrict(fd)
+                    _lock_file(fd)
+                    if not _replaced(fd, path):
+                        os.write(fd, line)
+                        written = True
+                finally:
+                    os.close(fd)
+        except OSError:
+            return False
+        self._maybe_compact()
+        return True
+
+    def record_launch(self, name, values=None, category=None):
+        """记录一次启动，values 为工具参数中各占位符的值（直接给出完整参数时为 None）
+
+        category 为工具所在分类，省略时从已加载的目录中查找；“最近常用”按分类查找工具，不必加载全部分片。
+        """
+        if category is None:
+            from utils.catalog import catalog
+
+            category = catalog.loaded_category(name)
+        return self._append({
+            "event": "launch", "tool": name, "category": category, "at": round(time.time(), 3), "values": values,
+        })
+
+    def record(self, job):
+        """记录一个已结束作业的运行时长、资源占用和退出状态"""
+        from utils.jobs import signal_name
+
+        usage = job.usage
+        return self._append({
+            "event": "exit",
+            "tool": job.name,
+            "started_at": round(job.started_at, 3),
+            "ended_at": round(time.time(), 3),
+            "wall": round(job.duration, 6),
+            "exit_code": job.exit_code,
+            "signal": signal_name(job.exit_code),
+            "killed": job.killed,
+            "user_cpu": None if usage is None else round(usage.user_cpu, 6),
+            "sys_cpu": None if usage is None else round(usage.sys_cpu, 6),
+            "max_rss_kb": None if usage is None else usage.max_rss_kb,
+        })
+
+    def _reset(self):
+        self._runs = {}
+        self._tools = {}
+        self._offset = 0
+        self._lines = 0
+        self.version += 1
+
+    @staticmethod
+    def _half_life():
+        return max(1.0, CONFIG.get("frecency_half_life_days", 7) * 86400)
+
+    def _hit(self, state, at):
+        """把一次启动计入分数：分数先衰减到这次启动的时间再加 1（来自其他进程的较早启动按其时间折算）"""
+        half_life = self._half_life()
+        if at >= state["at"]:
+            state["score"] = state["score"] * 0.5 ** ((at - state["at"]) / half_life) + 1
+            state["at"] = at
+        else:
+            state["score"] += 0.5 ** ((state["at"] - at) / half_life)
+
+    def _apply(self, entry):
+        name = entry["tool"]
+        event = entry.get("event", "exit")
+        if event == "exit":
+            window = max(1, CONFIG.get("history_window", 20))
+            runs = self._runs.get(name)
+            if runs is None or runs.maxlen != window:
+                runs = self._runs[name] = deque(runs or (), maxlen=window)
+            runs.append(entry)
+        elif event == "launch":
+            at = float(entry["at"])
+            state = self._tools.get(name)
+            if state is None:
+                state = self._tools[name] = {"score": 0.0, "at": at, "launches": 0, "values": None, "category": None}
+            self._hit(state, at)
+            state["launches"] += 1
+            if entry.get("values") is not None:
+                state["values"] = entry["values"]
+            if entry.get("category") is not None:
+                state["category"] = entry["category"]
+        elif event == "state":
+            self._tools[name] = {
+                "score": float(entry["score"]), "at": float(entry["at"]),
+                "launches": int(entry.get("launches", 0)), "values": entry.get("values"),
+                "category": entry.get("category"),
+            }
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _catch_up(self, path):
+        """读取文件中上次读取之后新增的完整行；文件被替换或截断时从头读取（调用方持有 _lock）
+
+        已读取的文件保持打开，与路径当前指向的文件比较时不会因 inode 被复用而误判。
+        """
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None:
+            if self._file is not None:
+                self._close()
+                self._reset()
+            return
+        if self._file is not None and (not _same_file(self._file.fileno(), st) or st.st_size < self._offset):
+            self._close()
+            self._reset()
+        if self._file is None:
+            try:
+                self._file = open(path, "rb")
+            except OSError:
+                return
+        if st.st_size == self._offset:
+            return
+
+        try:
+            self._file.seek(self._offset)
+            data = self._file.read()
+        except OSError:
+            return
+        # 最后一行可能还没写完，留到下次读取
+        complete = data.rfind(b"\n") + 1
+        self._offset += complete
+        for raw in data[:complete].splitlines():
+            self._lines += 1
+            try:
+                entry = json.loads(raw)
+                if isinstance(entry, dict) and isinstance(entry.get("tool"), str):
+                    self._apply(entry)
+            except (ValueError, TypeError, KeyError):
+                continue
+        if complete:
+            self.version += 1
+
+    def refresh(self):
+        """读取其他线程和进程新追加的记录"""
+        with self._lock:
+            self._catch_up(self.path)
+
+    def _live_lines(self):
+        return len(self._tools) + sum(len(runs) for runs in self._runs.values())
+
+    def _maybe_compact(self):
+        """文件行数超过 CONFIG["history_compact_lines"] 且超过有效记录的两倍时压缩"""
+        threshold = CONFIG.get("history_compact_lines", 2000)
+        if not threshold:
+            return
+        self.refresh()
+        if self._lines > max(threshold, 2 * self._live_lines()):
+            self.compact()
+
+    def compact(self):
+        """把历史文件改写为每个工具一条 state 和最近的 exit 记录，写入临时文件后改名，返回是否改写"""
+        path = self.path
+        if path is None:
+            return False
+        with self._lock:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                fd = os.open(path, os.O_RDWR)
+            except OSError:
+                return False
+            try:
+                # 持有文件锁期间其他进程无法追加，读到末尾后改写不会丢失记录
+                _lock_file(fd)
+                if _replaced(fd, path):
+                    return False
+                self._catch_up(path)
+                entries = [{"event": "state", "tool": name, **state} for name, state in self._tools.items()]
+                for runs in self._runs.values():
+                    entries.extend(runs)
+                data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+                with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, PRIVATE_MODE), "wb") as f:
+                    f.write(data)
+                # Windows 上打开的文件不能被替换
+                self._close()
+                os.replace(tmp_path, path)
+                self._file = open(path, "rb")
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                self._close()
+                self._reset()
+                return False
+            finally:
+                os.close(fd)
+            self._offset = len(data)
+            self._lines = len(entries)
+        return True
+
+    def ranked(self, limit=None):
+        """按 frecency 分数从高到低返回工具名称"""
+        self.refresh()
+        half_life = self._half_life()
+        with self._lock:
+            # 分数都衰减到同一时刻再比较；取对数后与当前时间无关，也不会下溢
+            scored = [
+                (math.log2(state["score"]) + state["at"] / half_life, name)
+                for name, state in self._tools.items() if state["score"] > 0
+            ]
+        scored.sort(reverse=True)
+        return [name for _, name in scored[:limit]]
+
+    def category(self, name):
+        """工具最近一次启动时所在的分类，没有记录时返回 None（不重新读取文件，通常紧跟在 ranked 之后调用）"""
+        with self._lock:
+            state = self._tools.get(name)
+            return None if state is None else state.get("category")
+
+    def remember_category(self, name, category):
+        """为没有记录分类的旧启动记录补上查找结果（只保存在内存中），"" 表示目录中已没有该工具"""
+        with self._lock:
+            state = self._tools.get(name)
+            if state is not None and state.get("category") is None:
+                state["category"] = category
+
+    def last_values(self, name):
+        """工具上一次启动时各占位符的值，没有记录时返回 {}"""
+        self.refresh()
+        with self._lock:
+            state = self._tools.get(name)
+            return dict(state["values"] or {}) if state is not None else {}
+
+    def stats(self, name):
+        """工具最近若干次运行的 ToolStats，没有记录时返回 None"""
+        self.refresh()
+        with self._lock:
+            runs = list(self._runs.get(name, ()))
+        if not runs:
+            return None
+        last = runs[-1]
+        peaks = [run.get("max_rss_kb") for run in runs if run.get("max_rss_kb") is not None]
+        return ToolStats(
+            runs=len(runs),
+            failures=sum(1 for run in runs if run.get("exit_code") not in (0, None)),
+            wall=_mean(run.get("wall") for run in runs),
+            user_cpu=_mean(run.get("user_cpu") for run in runs),
+            sys_cpu=_mean(run.get("sys_cpu") for run in runs),
+            max_rss_kb=_mean(peaks),
+            peak_rss_kb=max(peaks) if peaks else None,
+            last_exit=last.get("exit_code"),
+            last_signal=last.get("signal"),
+            rss_runs=len(peaks),
+        )
+
+
+history = LaunchHistory()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+import re
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from config import CONFIG
+from utils.metrics import metrics
+from utils.output import OutputBuffer, pump
+
+# 作业状态
+RUNNING = "运行中"
+DONE = "已完成"
+FAILED = "失败"
+KILLED = "已终止"
+
+# kill 时先发送终止信号，超过该时间仍未退出则强制结束
+KILL_GRACE_SECONDS = 3
+# 进程退出后等待输出读取线程收尾的最长时间（孙进程可能仍持有管道）
+PUMP_JOIN_SECONDS = 5
+# 运行期间采样工具峰值内存（/proc/<pid>/status 中的 VmHWM）的间隔
+RSS_SAMPLE_SECONDS = 0.2
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 捕获输出时要求工具按行刷新输出：管道上的 stdio 默认全缓冲，输出窗格和日志要等缓冲区写满或进程退出才看到内容
+LINE_BUFFERED_ENV = {"PYTHONUNBUFFERED": "1"}
+
+# 子进程的资源占用：用户态和内核态 CPU 时间（秒）、峰值常驻内存（KB，无法确定时为 None），包括它等待过的子孙进程
+ResourceUsage = namedtuple("ResourceUsage", ["user_cpu", "sys_cpu", "max_rss_kb"])
+
+
+def resource_usage(user_cpu, sys_cpu, max_rss):
+    """由 wait4 返回的数值构造 ResourceUsage（macOS 的 ru_maxrss 以字节为单位，其他系统为 KB）"""
+    if max_rss is not None and sys.platform == "darwin":
+        max_rss //= 1024
+    return ResourceUsage(user_cpu, sys_cpu, None if max_rss is None else int(max_rss))
+
+
+def own_peak_rss_kb():
+    """当前进程自身的峰值常驻内存（KB），无法取得时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _sampled_rss_kb(pid):
+    """Linux 上读取进程自 exec 以来的峰值常驻内存（VmHWM，KB），无法读取时返回 None"""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _watch_rss(pid):
+    """在进程运行期间定期采样 VmHWM，进程退出（尚未回收）时返回采样到的最大值，不支持时返回 None
+
+    用 pidfd 等待退出，采样不会推迟回收；只采样直接启动的进程，不包括它的子孙进程。
+    """
+    if not sys.platform.startswith("linux") or not hasattr(os, "pidfd_open"):
+        return None
+    try:
+        fd = os.pidfd_open(pid)
+    except OSError:
+        return None
+    peak = None
+    try:
+        while True:
+            sample = _sampled_rss_kb(pid)
+            if sample is not None:
+                peak = sample if peak is None else max(peak, sample)
+            if select.select([fd], [], [], RSS_SAMPLE_SECONDS)[0]:
+                return peak
+    finally:
+        os.close(fd)
+
+
+def wait_with_usage(proc, inherited_rss_kb=None):
+    """等待进程退出，返回 (退出码, ResourceUsage)，无法取得资源占用时为 None
+
+    subprocess.Popen 在类 Unix 系统上用 os.wait4 回收，预热进程启动的工具由监护进程回报；
+    进程已被 Popen.poll() 抢先回收（例如 kill 时）或在 Windows 上只返回退出码。
+    子进程由门户 fork 而来，Linux 的 ru_maxrss 包含 exec 之前继承的门户内存：不超过 inherited_rss_kb
+    （fork 时门户自身的峰值）时无法区分，改用运行期间采样到的 VmHWM，没有采样时为 None。
+    """
+    if isinstance(proc, subprocess.Popen) and hasattr(os, "wait4"):
+        sampled = _watch_rss(proc.pid)
+        try:
+            _, status, rusage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            return proc.wait(), None
+        # 与 Popen.returncode 一致：被信号结束时为负的信号编号（os.waitstatus_to_exitcode 需要 Python 3.9）
+        proc.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        usage = resource_usage(rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss)
+        if inherited_rss_kb is not None and usage.max_rss_kb <= inherited_rss_kb:
+            usage = usage._replace(max_rss_kb=sampled)
+        return proc.returncode, usage
+    exit_code = proc.wait()
+    reported = getattr(proc, "rusage", None)
+    return exit_code, None if reported is None else resource_usage(*reported)
+
+
+def signal_name(exit_code):
+    """被信号结束的进程（退出码为负）返回信号名称，否则返回 None"""
+    if exit_code is None or exit_code >= 0:
+        return None
+    try:
+        return signal.Signals(-exit_code).name
+    except ValueError:
+        return f"SIG{-exit_code}"
+
+
+def prepare_log_dir():
+    """创建并返回工具输出日志目录，目录不可写时返回 None"""
+    log_dir = os.path.join(BASE_DIR, CONFIG.get("log_dir", "logs"))
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+    except OSError:
+        return None
+    return log_dir
+
+
+def log_path(name, tag):
+    """完整输出的日志文件路径，日志目录不可写时返回 None（不记录日志）"""
+    log_dir = prepare_log_dir()
+    if log_dir is None:
+        return None
+    safe_name = re.sub(r'[\\/:*?"<>|\s]+', "_", name)
+    return os.path.join(log_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{tag}-{safe_name}.log")
+
+
+class Job:
+    """一次后台启动的工具进程"""
+
+    def __init__(self, job_id, name, argv, proc, cwd=None, detached=True):
+        self.id = job_id
+        self.name = name
+        self.argv = argv
+        self.proc = proc
+        self.cwd = cwd
+        self.pid = proc.pid
+        self.started_at = time.time()
+        self.started = time.monotonic()
+        self.ended = None
+        self.exit_code = None
+        self.usage = None
+        # 启动时门户自身的峰值内存，用于判断 ru_maxrss 是否只是继承自门户
+        self.inherited_rss_kb = None
+        self.state = RUNNING
+        self.killed = False
+        self.detached = detached
+        self.output = None
+        self.pumps = []
+        self.finished = threading.Event()
+
+    @property
+    def duration(self):
+        """运行时长（秒），仍在运行时计算到当前时刻"""
+        end = self.ended if self.ended is not None else time.monotonic()
+        return end - self.started
+
+    def to_dict(self):
+        """作业状态的 JSON 表示，供启动接口和命令行输出"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "pid": self.pid,
+            "state": self.state,
+            "exit_code": self.exit_code,
+            "signal": signal_name(self.exit_code),
+            "started_at": self.started_at,
+            "duration": round(self.duration, 3),
+            "output_lines": 0 if self.output is None else self.output.total_lines,
+            "log_path": None if self.output is None else self.output.log_path,
+            "usage": None if self.usage is None else self.usage._asdict(),
+        }
+
+    def _finish(self, exit_code):
+        self.ended = time.monotonic()
+        self.exit_code = exit_code
+        if self.killed:
+            self.state = KILLED
+        elif exit_code == 0:
+            self.state = DONE
+        else:
+            self.state = FAILED
+
+    def wait(self, timeout=None):
+        """等待作业结束，返回是否已结束"""
+        return self.finished.wait(timeout)
+
+    def interrupt(self):
+        """向作业发送中断信号（相当于在前台按下 Ctrl+C）"""
+        if self.finished.is_set():
+            return
+        if os.name == "nt":
+            self._send(self.proc.send_signal, signal.CTRL_BREAK_EVENT)
+        elif not self._signal_group(signal.SIGINT):
+            self._send(self.proc.send_signal, signal.SIGINT)
+
+    @staticmethod
+    def _send(send, *args):
+        """调用 proc.send_signal/terminate/kill 向作业本身发送信号，作业已经退出时忽略"""
+        try:
+            send(*args)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _signal_group(self, sig):
+        """向独立进程组中的作业及其子孙进程发送信号，返回是否已发送；前台作业与门户同组，只能发给作业本身
+
+        作业可能在检查状态之后、发送信号之前退出：进程组已不存在（ProcessLookupError）或组号已被
+        其他用户的进程重用（PermissionError）都视为作业已经退出。
+        """
+        if os.name == "nt" or not self.detached:
+            return False
+        try:
+            os.killpg(self.proc.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+        return True
+
+    def kill(self):
+        """终止作业（独立进程组中的作业连同其子孙进程），超时后强制结束"""
+        if self.finished.is_set():
+            return
+        self.killed = True
+        if not self._signal_group(signal.SIGTERM):
+            self._send(self.proc.terminate)
+        if not self.wait(KILL_GRACE_SECONDS):
+            if not self._signal_group(signal.SIGKILL):
+                self._send(self.proc.kill)
+            self.wait()
+
+
+def _line_buffered(argv, shell):
+    """有 stdbuf（coreutils）时让使用 C stdio 的工具按行输出；shell 命令行原样返回"""
+    import shutil
+
+    stdbuf = None if shell or isinstance(argv, str) else shutil.which("stdbuf")
+    return argv if stdbuf is None else [stdbuf, "-oL", "-eL", *argv]
+
+
+class JobManager:
+    """后台作业表，每个作业由一个等待线程回收，不会留下僵尸进程"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def spawn(self, name, argv, cwd=None, shell=False, detach=True, capture=False, popen=None, **popen_kwargs):
+        """启动进程并登记为作业，立即返回
+
+        detach 为 True 时作业不读取终端输入，并运行在独立的进程组中，门户中的 Ctrl+C 不会波及它；
+        为 False 时作业继承终端，适合需要交互的前台运行。capture 为 True 时由后台线程读取
+        stdout/stderr，写入有界缓冲区 job.output 并完整记录到日志文件。popen 可以替换
+        subprocess.Popen（例如交给预热进程启动）。
+        """
+        if detach:
+            popen_kwargs.setdefault("stdin", subprocess.DEVNULL)
+            if os.name == "nt":
+                popen_kwargs.setdefault("creationflags", subprocess.CREATE_NEW_PROCESS_GROUP)
+            else:
+                popen_kwargs.setdefault("start_new_session", True)
+
+        command = argv
+        if capture:
+            popen_kwargs["stdout"] = subprocess.PIPE
+            popen_kwargs["stderr"] = subprocess.PIPE
+            popen_kwargs["env"] = {**(popen_kwargs.get("env") or os.environ), **LINE_BUFFERED_ENV}
+            if popen is None:
+                command = _line_buffered(argv, shell)
+
+        job_id = next(self._ids)
+        with metrics.timer("launch_spawn"):
+            proc = (popen or subprocess.Popen)(command, cwd=cwd, shell=shell, **popen_kwargs)
+        job = Job(job_id, name, argv, proc, cwd=cwd, detached=detach)
+        if popen is None:
+            job.inherited_rss_kb = own_peak_rss_kb()
+        if capture:
+            job.output = OutputBuffer(CONFIG.get("output_buffer_lines", 1000), self._log_path(job))
+            for stream in ("stdout", "stderr"):
+                reader = threading.Thread(
+                    target=pump, args=(getattr(proc, stream), stream, job.output),
+                    name=f"job-{job.id}-{stream}", daemon=True
+                )
+                reader.start()
+                job.pumps.append(reader)
+        with self._lock:
+            self._jobs[job.id] = job
+
+        waiter = threading.Thread(target=self._reap, args=(job,), name=f"job-{job.id}", daemon=True)
+        waiter.start()
+        return job
+
+    @staticmethod
+    def _log_path(job):
+        return log_path(job.name, job.id)
+
+    @staticmethod
+    def _reap(job):
+        from utils.history import history
+
+        exit_code, job.usage = wait_with_usage(job.proc, job.inherited_rss_kb)
+        for reader in job.pumps:
+            reader.join(PUMP_JOIN_SECONDS)
+        if job.output is not None:
+            job.output.close()
+        job._finish(exit_code)
+        # 先写入启动历史再唤醒等待者，前台运行结束后详情页即可看到这一次的记录
+        history.record(job)
+        job.finished.set()
+        if job.output is not None and job.output.first_output_at is not None:
+            metrics.observe("launch_first_output", job.output.first_output_at - job.started)
+        metrics.observe("launch_exit", job.duration)
+        metrics.export()
+
+    def discard(self, job):
+        """从作业表中移除已结束的作业（连同其输出缓冲区），完整输出仍保留在日志文件中"""
+        if not job.finished.is_set():
+            return False
+        with self._lock:
+            return self._jobs.pop(job.id, None) is not None
+
+    def get(self, job_id):
+        """按编号查找作业，不存在时返回 None"""
+        try:
+            return self._jobs.get(int(job_id))
+        except (TypeError, ValueError):
+            return None
+
+    def list(self):
+        """按编号顺序返回全部作业"""
+        with self._lock:
+            return [self._jobs[job_id] for job_id in sorted(self._jobs)]
+
+    def running(self):
+        """返回仍在运行的作业"""
+        return [job for job in self.list() if job.state == RUNNING]
+
+
+jobs = JobManager()
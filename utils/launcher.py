@@ -2,45 +2,166 @@
 # -*- coding: utf-8 -*-
 import os
 import random
+import re
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.text import Text
 
-from config import SUPPORTED_EXTENSIONS
-from utils.terminal import KaliTerminal
+from config import CONFIG
+from utils.fanout import TARGETS_PREFIX, target_source
+from utils.history import describe_run, history
+from utils.jobs import jobs
+from utils.metrics import metrics
+from utils.output import show_live_output
+from utils.screen import screen
+from utils.terminal import console, pause, run_stages, terminal
+from utils.tool import get_launch_config, resolve_path
 
-console = Console()
-terminal = KaliTerminal()
 
+# 工具参数中的占位符，如 {url}
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+# 批量启动被取消时，等待作业的线程最迟在这段时间后返回
+BATCH_POLL_SECONDS = 0.1
 
-def launch_tool(tool):
-    # 获取项目根目录
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    # 设置工作目录为项目根目录
-    os.chdir(project_root)
-
-    # 获取工具的相对路径
-    path = tool["path"]
-    # 将相对路径转换为绝对路径
-    abs_path = os.path.abspath(path)
-
-    tool_type = tool["type"]
-    tool_name = tool["name"]
-
-    if tool_type == "exe":
-        # 假设在工具配置中添加一个 "launch_method" 字段来指定启动方式
-        launch_method = tool.get("launch_method", "direct")
-        if launch_method == "direct":
-            launch_config = SUPPORTED_EXTENSIONS["exe"][0]
-        else:
-            launch_config = SUPPORTED_EXTENSIONS["exe"][1]
+
+def build_command(tool, parameters):
+    """返回 (argv, shell, cwd)，工作目录为工具所在目录，通过子进程参数传递"""
+    launch_config = get_launch_config(tool)
+    abs_path = resolve_path(tool)
+    shell = False
+    if launch_config["method"] == "direct":
+        # 直接执行文件（如exe）
+        argv = [abs_path, *parameters.split()]
     else:
-        launch_config = SUPPORTED_EXTENSIONS.get(tool_type, {})
+        # 通过命令执行文件（如py, bat, jar, vbs）
+        cmd_parts = launch_config["command"].split()
+        if cmd_parts:
+            argv = [*cmd_parts, abs_path, *parameters.split()]
+        else:
+            argv = [abs_path, *parameters.split()]
+            shell = True
+    return argv, shell, os.path.dirname(abs_path)
+
+
+def find_interpreter(tool):
+    """查找工具类型所需的解释器（如 java、python），找不到时抛出 FileNotFoundError
+
+    使用健康检查中按类型解析好的结果，不在每次启动时查找 PATH。
+    """
+    from utils.health import NO_RUNTIME, health
+
+    tool_health = health.check(tool)
+    if tool_health.status == NO_RUNTIME:
+        raise FileNotFoundError(f"未找到 {tool.type} 工具所需的解释器: {tool_health.runtime}")
+    return tool_health.interpreter
+
+
+def placeholders(tool):
+    """返回工具参数中的占位符名称（按出现顺序，不重复）"""
+    return list(dict.fromkeys(PLACEHOLDER.findall(tool.parameters or "")))
+
+
+def target_placeholder(tool):
+    """按目标列表运行时目标填充的占位符：有 {url} 时为 url，否则为第一个占位符，没有占位符时返回 None"""
+    names = placeholders(tool)
+    return "url" if "url" in names else names[0] if names else None
+
+
+def fill_parameters(tool, values):
+    """用 values 中的值替换工具参数中的占位符，缺少某个占位符的值时抛出 KeyError"""
+    return PLACEHOLDER.sub(lambda match: str(values[match.group(1)]), tool.parameters or "")
+
+
+def ask_values(tool):
+    """交互式地询问工具参数中各占位符的值，上一次启动时的值作为默认值（直接回车沿用）"""
+    last = history.last_values(tool.name)
+    primary = target_placeholder(tool)
+    values = {}
+    for name in placeholders(tool):
+        prompt = f"请输入 {tool.name} 的目标URL" if name == "url" else f"请输入 {tool.name} 的参数 {name}"
+        if name == primary:
+            prompt += f"（{TARGETS_PREFIX}文件 或 {TARGETS_PREFIX}网段 按目标列表批量运行）"
+        default = last.get(name)
+        if default:
+            values[name] = terminal.ask(f"{prompt} [{default}]: ", default=default)
+        else:
+            values[name] = terminal.ask(f"{prompt}: ")
+    return values
+
+
+def launch_problem(tool):
+    """返回工具当前无法启动的原因，可以启动时返回 None"""
+    from utils.health import MISSING, NO_RUNTIME, UNSUPPORTED, health
+
+    tool_health = health.check(tool)
+    if tool_health.status == UNSUPPORTED:
+        return "不支持的文件类型"
+    if tool_health.status == MISSING:
+        return "路径不存在"
+    if tool_health.status == NO_RUNTIME:
+        return f"未找到 {tool_health.runtime}"
+    return None
+
+
+def _prepare_warm(tool, argv, interpreter, detach):
+    """warm.prepare 的入口：未启用预热池（默认）时原样返回 (argv, None)，不导入预热模块"""
+    if not CONFIG.get("warm_pool"):
+        return argv, None
+    from utils import warm
+
+    return warm.prepare(tool, argv, interpreter, detach)
+
+
+def plan_launch(tool, parameters, detach=True):
+    """返回启动工具所需的 (argv, shell, cwd, popen)，不询问任何输入
+
+    工作目录只作为子进程参数传递，多个线程可以同时为不同的工具调用。
+    """
+    from utils.health import health
+
+    argv, shell, cwd = build_command(tool, parameters)
+    argv, popen = _prepare_warm(tool, argv, health.check(tool).interpreter, detach)
+    return argv, shell, cwd, popen
+
+
+def tool_summary(category, tool):
+    """工具的概要信息（JSON 表示），包含健康检查状态"""
+    from utils.health import health
+
+    return {
+        "name": tool.name,
+        "category": category,
+        "type": tool.type,
+        "version": tool.version,
+        "status": health.check(tool).status,
+    }
+
+
+def tool_detail(category, tool):
+    """工具的完整信息（JSON 表示）：配置中的全部字段、参数占位符和解析后的路径"""
+    from utils.health import health
+
+    tool_health = health.check(tool)
+    detail = tool_summary(category, tool)
+    detail.update(tool.to_dict())
+    detail.update({
+        "placeholders": placeholders(tool),
+        "resolved_path": tool_health.path,
+        "interpreter": tool_health.interpreter,
+    })
+    return detail
+
 
+def launch_tool(tool):
+    abs_path = resolve_path(tool)
+    tool_type = tool.type
+    tool_name = tool.name
+
+    launch_config = get_launch_config(tool)
     type_icon = launch_config.get("icon", "📄")
 
     if not launch_config:
@@ -53,15 +174,14 @@ def launch_tool(tool):
     # 显示模拟的启动命令序列
     terminal.simulate_command("chmod +x " + abs_path, f"[ ✓ ] 设置执行权限")
 
-    # 处理参数
-    parameters = tool.get("parameters", "")
-    if "{url}" in parameters:
-        url = terminal.ask("请输入目标URL: ")
-        parameters = parameters.replace("{url}", url)
-
-    # 设置当前工作目录为VBS脚本所在的目录
-    vbs_dir = os.path.dirname(abs_path)
-    os.chdir(vbs_dir)
+    # 处理参数，以 @@ 开头的值表示按目标列表批量运行
+    values = ask_values(tool)
+    sources = {name: target_source(value) for name, value in values.items()}
+    sources = {name: source for name, source in sources.items() if source is not None}
+    if sources:
+        return launch_fanout(tool, values, sources)
+    parameters = fill_parameters(tool, values)
+    argv, shell, cwd = build_command(tool, parameters)
 
     if launch_config["method"] == "direct":
         cmd = f"{abs_path} {parameters}"
@@ -70,8 +190,10 @@ def launch_tool(tool):
         cmd = f"{launch_config['command']} {abs_path} {parameters}"
         terminal.simulate_command(cmd, "正在启动...")
 
-    # 检查文件是否存在
-    if not os.path.exists(abs_path):
+    # 检查文件是否存在（使用健康检查的缓存结果）
+    from utils.health import MISSING, health
+
+    if health.check(tool).status == MISSING:
         # 对于演示目的，可以模拟工具路径不存在的情况
         console.print(Panel(
             Text.assemble(
@@ -83,28 +205,12 @@ def launch_tool(tool):
             border_style="yellow"
         ))
 
-        # 显示启动进度条
-        with Progress(
-                SpinnerColumn("dots"),
-                TextColumn(f"[bold green]🚀 正在启动 {tool_name}...[/bold green]"),
-                BarColumn(complete_style="green", finished_style="green"),
-                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                TimeElapsedColumn(),
-                console=console
-        ) as progress:
-            task = progress.add_task(f"启动 {tool_name}", total=100)
-
-            # 模拟启动过程
-            for _ in range(100):
-                time.sleep(0.03)
-                progress.update(task, advance=1)
-
         # 模拟工具执行
         console.print(f"[bold green]✅ {tool_name} 已启动[/bold green]")
 
         # 为了演示效果，显示一些随机的"执行输出"
         outputs = [
-            f"{tool_name} v{tool.get('version', '1.0')} 正在运行中...",
+            f"{tool_name} v{tool.version or '1.0'} 正在运行中...",
             f"正在扫描目标...",
             f"发现 {random.randint(3, 15)} 个开放端口",
             f"分析结果中...",
@@ -112,48 +218,79 @@ def launch_tool(tool):
         ]
 
         for output in outputs:
-            time.sleep(random.uniform(0.8, 1.5))
+            pause(random.uniform(0.8, 1.5))
             console.print(f"[dim]{output}[/dim]")
 
-        time.sleep(0.5)
+        pause(0.5)
         console.print(f"[bold green]✅ {tool_name} 执行完成[/bold green]")
         return True
 
     # 实际启动工具
+    capture = CONFIG.get("capture_output", True)
+    background = CONFIG.get("background_launch", True)
     try:
-        # 显示启动进度条
-        with Progress(
-                SpinnerColumn("dots"),
-                TextColumn(f"[bold green]🚀 正在启动 {tool_name}...[/bold green]"),
-                BarColumn(complete_style="green", finished_style="green"),
-                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                TimeElapsedColumn(),
-                console=console
-        ) as progress:
-            task = progress.add_task(f"启动 {tool_name}", total=100)
-
-            # 模拟启动过程
-            for _ in range(100):
-                time.sleep(0.02)
-                progress.update(task, advance=1)
+        job = None
+        interpreter = None
 
-        console.print(f"[bold green]✅ {tool_name} 已启动，正在执行...[/bold green]")
+        def locate():
+            nonlocal interpreter
+            with metrics.timer("launch_preflight"):
+                interpreter = find_interpreter(tool)
+
+        def spawn():
+            nonlocal job
+            warm_argv, popen = _prepare_warm(tool, argv, interpreter, background)
+            job = jobs.spawn(tool_name, warm_argv, cwd=cwd, shell=shell, detach=background, capture=capture,
+                             popen=popen)
+            history.record_launch(tool_name, values)
+
+        def wait_first_output():
+            # 工具产生输出、退出或超过等待时间即结束这一阶段
+            deadline = time.monotonic() + CONFIG.get("first_output_wait", 0.5)
+            while job.output.first_output_at is None and time.monotonic() < deadline:
+                if job.wait(0.01):
+                    break
+
+        if not background and not capture:
+            # 工具直接使用终端，输出留在普通屏幕上
+            screen.suspend()
 
-        if launch_config["method"] == "direct":
-            # 直接执行文件（如exe）
-            subprocess.run([abs_path, *parameters.split()], check=True)
+        stages = [
+            ("查找解释器", locate),
+            ("启动进程", spawn),
+        ]
+        if background and capture:
+            stages.append(("等待首个输出", wait_first_output))
+        run_stages(f"🚀 启动 {tool_name}", stages)
+
+        if background:
+            # 后台运行，菜单立即返回
+            console.print(f"[bold green]✅ {tool_name} 已在后台启动 (作业 [{job.id}], PID {job.pid})[/bold green]")
+            if capture:
+                if job.output.first_output_at is not None:
+                    console.print(f"[dim]首个输出用时 {(job.output.first_output_at - job.started) * 1000:.0f} ms[/dim]")
+                console.print(f"[dim]输入 tail {job.id} 查看实时输出，完整输出记录在 {job.output.log_path or '内存缓冲区'}[/dim]")
+            console.print("[dim]输入 jobs 查看作业，fg/wait/kill <编号> 管理作业[/dim]")
+            return True
+
+        # 前台运行，继承终端输入并等待结束
+        console.print(f"[bold green]✅ {tool_name} 已启动，正在执行...[/bold green]")
+        if capture:
+            show_live_output(job, on_interrupt=job.interrupt)
         else:
-            # 通过命令执行文件（如py, bat, jar, vbs）
-            cmd_parts = launch_config["command"].split()
-            if cmd_parts:
-                subprocess.run([*cmd_parts, abs_path, *parameters.split()], check=True)
-            else:
-                subprocess.run([abs_path, *parameters.split()], check=True, shell=True)
+            try:
+                job.wait()
+            except KeyboardInterrupt:
+                # Ctrl+C 同时发给了前台工具，等待它退出
+                job.wait()
+        console.print(f"[dim]{describe_run(job)}[/dim]")
+        if job.exit_code != 0:
+            raise subprocess.CalledProcessError(job.exit_code, argv)
 
         console.print(f"[bold green]✅ {tool_name} 执行完成[/bold green]")
         return True
 
-    except subprocess.SubprocessError as e:
+    except (OSError, subprocess.SubprocessError) as e:
         console.print(Panel(
             Text.assemble(
                 Text("❌ 错误: ", style="bold red"),
@@ -164,3 +301,183 @@ def launch_tool(tool):
             border_style="red"
         ))
         return False
+
+
+def launch_batch(tools, concurrency=None):
+    """同时启动多个工具，最多 concurrency 个并行运行，全部结束后显示汇总表"""
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+    from rich.table import Table
+
+    concurrency = concurrency or CONFIG.get("batch_concurrency", 4)
+
+    # 先依次询问参数，启动后不再需要交互
+    plans = []
+    for tool in tools:
+        error = launch_problem(tool)
+        if error:
+            plans.append((tool, None, error))
+        else:
+            values = ask_values(tool)
+            plans.append((tool, (values, plan_launch(tool, fill_parameters(tool, values))), None))
+
+    cancelled = threading.Event()
+    results = [None] * len(plans)
+
+    def run(index, tool, command):
+        if cancelled.is_set():
+            results[index] = (tool, None, "已取消", 0.0)
+            return
+        values, (argv, shell, cwd, popen) = command
+        try:
+            job = jobs.spawn(tool.name, argv, cwd=cwd, shell=shell, capture=CONFIG.get("capture_output", True),
+                             popen=popen)
+        except OSError as e:
+            results[index] = (tool, None, f"启动失败: {e}", 0.0)
+            return
+        history.record_launch(tool.name, values)
+        # 取消后不再等待已启动的作业，让批量启动立即返回，作业留在作业表中继续运行
+        while not job.wait(BATCH_POLL_SECONDS) and not cancelled.is_set():
+            pass
+        results[index] = (tool, job, job.state, job.duration)
+
+    terminal.print_banner(f"🚀 批量启动 {len(tools)} 个工具", f"最多同时运行 {concurrency} 个", "green")
+    with Progress(
+            SpinnerColumn("dots"),
+            TextColumn("[bold green]🚀 批量执行中...[/bold green]"),
+            BarColumn(complete_style="green", finished_style="green"),
+            TextColumn("{task.completed}/{task.total}"),
+            TimeElapsedColumn(),
+            console=console
+    ) as progress:
+        task = progress.add_task("批量启动", total=len(plans))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            for index, (tool, command, error) in enumerate(plans):
+                if error:
+                    results[index] = (tool, None, error, 0.0)
+                    progress.advance(task)
+                    continue
+                future = executor.submit(run, index, tool, command)
+                future.add_done_callback(lambda _: progress.advance(task))
+                futures.append(future)
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                # 尚未开始的工具不再启动，已启动的作业继续在后台运行，不等待它们结束
+                cancelled.set()
+                console.print("[bold yellow]⚠️ 已取消尚未启动的工具，已启动的作业仍在后台运行，输入 jobs 查看[/bold yellow]")
+                for future in futures:
+                    future.result()
+
+    table = Table(title="批量执行结果", border_style="green", padding=(0, 1))
+    table.add_column("工具名称", style="green")
+    table.add_column("作业", style="cyan", justify="center")
+    table.add_column("状态", style="yellow")
+    table.add_column("退出码", justify="center")
+    table.add_column("耗时", justify="right")
+    table.add_column("日志", style="dim")
+    for tool, job, state, duration in results:
+        table.add_row(
+            tool.name,
+            "" if job is None else str(job.id),
+            state,
+            "" if job is None or job.exit_code is None else str(job.exit_code),
+            f"{duration:.2f}s",
+            job.output.log_path or "" if job is not None and job.output is not None else ""
+        )
+    console.print(table)
+    return all(job is not None and job.exit_code == 0 for _, job, _, _ in results)
+
+
+def launch_fanout(tool, values, sources):
+    """按目标列表运行工具：sources 为 {占位符: 目标列表（文件或网段）}，每个目标填充该占位符运行一次"""
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+    from rich.table import Table
+
+    from utils.fanout import FAILED, SUCCEEDED, expand_targets, read_targets, run_fanout, source_value, write_results
+
+    def fail(message):
+        console.print(f"[bold red]❌ {message}[/bold red]")
+        return False
+
+    if len(sources) > 1:
+        return fail("一次只能有一个参数使用目标列表")
+    (key, source), = sources.items()
+    problem = launch_problem(tool)
+    if problem:
+        return fail(f"{tool.name}: {problem}")
+    try:
+        invocations = expand_targets(tool, read_targets(source), values, key)
+    except (OSError, ValueError) as e:
+        return fail(str(e))
+    if not invocations:
+        return fail(f"目标列表 {source} 中没有目标")
+    # 记录这次的输入（目标列表文件使用绝对路径），下次启动时默认沿用同一个目标列表
+    history.record_launch(tool.name, {**values, key: source_value(source)})
+
+    concurrency = CONFIG.get("fanout_concurrency", 8)
+    rate = CONFIG.get("fanout_rate", 0)
+    terminal.print_banner(
+        f"🎯 {tool.name} × {len(invocations)} 个目标",
+        f"最多同时运行 {concurrency} 个" + (f"，每秒最多启动 {rate} 个" if rate else "")
+        + f"，失败重试 {CONFIG.get('fanout_retries', 1)} 次",
+        "green",
+    )
+    cancelled = threading.Event()
+    with Progress(
+            SpinnerColumn("dots"),
+            TextColumn("[bold green]🎯 按目标执行中...[/bold green]"),
+            BarColumn(complete_style="green", finished_style="green"),
+            TextColumn("{task.completed}/{task.total}"),
+            TextColumn("[red]{task.fields[failed]} 失败[/red]"),
+            TimeElapsedColumn(),
+            console=console
+    ) as progress:
+        task = progress.add_task("按目标执行", total=len(invocations), failed=0)
+        failed = 0
+
+        def on_result(result):
+            nonlocal failed
+            failed += result["state"] == FAILED
+            progress.update(task, advance=1, failed=failed)
+
+        try:
+            results = run_fanout(tool, invocations, concurrency, rate, on_result=on_result, cancelled=cancelled)
+        except KeyboardInterrupt:
+            results = None
+    if results is None or cancelled.is_set():
+        console.print("[bold yellow]⚠️ 已取消尚未启动的目标，运行中的作业已收到中断信号，输入 jobs 查看[/bold yellow]")
+    if results is None:
+        return False
+
+    counts = {state: sum(result["state"] == state for result in results) for state in (SUCCEEDED, FAILED)}
+    retried = sum(result["attempts"] > 1 for result in results)
+    console.print(
+        f"[bold green]✅ 成功 {counts[SUCCEEDED]}[/bold green]  [bold red]❌ 失败 {counts[FAILED]}[/bold red]  "
+        f"[yellow]已取消 {len(results) - counts[SUCCEEDED] - counts[FAILED]}[/yellow]  [dim]重试过 {retried} 个目标[/dim]"
+    )
+    failures = [result for result in results if result["state"] != SUCCEEDED]
+    if failures:
+        shown = 20
+        table = Table(title="未成功的目标", border_style="red", padding=(0, 1))
+        table.add_column("目标", style="cyan")
+        table.add_column("状态", style="yellow")
+        table.add_column("退出码", justify="center")
+        table.add_column("尝试", justify="center")
+        table.add_column("日志 / 错误", style="dim")
+        for result in failures[:shown]:
+            table.add_row(
+                result["target"],
+                result["state"],
+                "" if result["exit_code"] is None else str(result["exit_code"]),
+                str(result["attempts"]),
+                result["error"] or result["log_path"] or "",
+            )
+        console.print(table)
+        if len(failures) > shown:
+            console.print(f"[dim]另有 {len(failures) - shown} 个目标未列出[/dim]")
+    path = write_results(tool, results)
+    if path:
+        console.print(f"[dim]每个目标的结果记录在 {path}[/dim]")
+    return not failures
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+各阶段耗时统计
+每个阶段一个固定分桶的直方图，记录一次耗时只需一次二分查找和计数，内存占用与记录次数无关。
+stats 命令按分桶估算 p50/p95/p99；设置 CONFIG["metrics_textfile"] 后以 node-exporter textfile
+collector 的格式写出，供 Prometheus 采集和作图。
+"""
+
+import atexit
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from config import CONFIG
+
+# 分桶上限（秒）：每个数量级 6 个桶，覆盖从 0.1 毫秒的缓存命中到小时级的工具运行，分位数估算误差约在 ±20% 以内
+BUCKETS = tuple(round(mantissa * 10 ** exponent, 6) for exponent in range(-4, 4) for mantissa in (1, 1.5, 2, 3, 5, 7))
+# 两次自动写出 textfile 之间的最短间隔（秒），退出时总会写出一次
+EXPORT_INTERVAL = 10.0
+
+# 阶段名称及说明（stats 命令按此顺序显示，未登记的阶段排在后面）
+PHASES = {
+    "catalog_load": "解析工具目录文件",
+    "render_categories": "分类菜单排版输出",
+    "render_tools": "工具列表排版输出",
+    "launch_preflight": "启动前检查（健康状态、解释器）",
+    "launch_spawn": "创建工具进程",
+    "launch_first_output": "启动到首个输出",
+    "launch_exit": "启动到退出",
+}
+
+
+class Histogram:
+    """固定分桶的耗时直方图"""
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def quantile(self, q):
+        """估算分位数：在所在分桶内线性插值，结果不超出观测到的最小值和最大值"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKETS[index - 1] if index > 0 else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.maximum
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.minimum), self.maximum)
+            seen += bucket_count
+        return self.maximum
+
+
+class Metrics:
+    """进程内的阶段耗时统计"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.started_at = time.time()
+        self.started = time.monotonic()
+        self._exported_at = 0.0
+        # 写出 textfile 的进程名称，None 表示本进程不写出（命令行子命令、基准测试）
+        self.process = None
+        self._lock = threading.Lock()
+
+    def start_session(self):
+        """开始计算会话时长（进入门户时调用）"""
+        self.started_at = time.time()
+        self.started = time.monotonic()
+
+    def enable_export(self, process="portal"):
+        """让本进程写出 textfile 并在退出时写出最终结果，只由交互门户和启动接口调用
+
+        交互门户写入 CONFIG["metrics_textfile"]，其他进程写入同目录下带进程名后缀的文件（如 portal-serve.prom），
+        并以 process 标签区分，短暂运行的命令行进程不会覆盖门户的统计。
+        """
+        if self.process is None:
+            atexit.register(lambda: self.export(force=True))
+        self.process = process
+
+    def textfile_path(self):
+        """本进程写出的 textfile 路径，未设置 CONFIG["metrics_textfile"] 或本进程不写出时返回 None"""
+        path = CONFIG.get("metrics_textfile")
+        if not path or self.process is None:
+            return None
+        if self.process == "portal":
+            return path
+        stem, ext = os.path.splitext(path)
+        return f"{stem}-{self.process}{ext}"
+
+    @property
+    def session_seconds(self):
+        return time.monotonic() - self.started
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase):
+        """记录 with 块的耗时，块内抛出异常时不记录"""
+        started = time.monotonic()
+        yield
+        self.observe(phase, time.monotonic() - started)
+
+    def snapshot(self):
+        """返回 [(阶段, 次数, 平均, p50, p95, p99, 最大)]，按 PHASES 中的顺序"""
+        order = list(PHASES)
+        with self._lock:
+            phases = sorted(self.histograms, key=lambda name: (order.index(name) if name in order else len(order), name))
+            return [
+                (phase, h.count, h.total / h.count, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99), h.maximum)
+                for phase, h in ((phase, self.histograms[phase]) for phase in phases)
+            ]
+
+    def prometheus(self):
+        """node-exporter textfile 格式的文本"""
+        labels = f'process="{self.process or "portal"}"'
+        lines = [
+            "# HELP portal_phase_seconds Time spent in each portal phase.",
+            "# TYPE portal_phase_seconds histogram",
+        ]
+        with self._lock:
+            for phase in sorted(self.histograms):
+                h = self.histograms[phase]
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, h.counts):
+                    cumulative += bucket_count
+                    lines.append(f'portal_phase_seconds_bucket{{{labels},phase="{phase}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'portal_phase_seconds_bucket{{{labels},phase="{phase}",le="+Inf"}} {h.count}')
+                lines.append(f'portal_phase_seconds_sum{{{labels},phase="{phase}"}} {h.total:.6f}')
+                lines.append(f'portal_phase_seconds_count{{{labels},phase="{phase}"}} {h.count}')
+        lines += [
+            "# HELP portal_session_seconds Duration of the current portal session.",
+            "# TYPE portal_session_seconds gauge",
+            f"portal_session_seconds{{{labels}}} {self.session_seconds:.3f}",
+            "# HELP portal_session_start_time_seconds Unix time the current portal session started.",
+            "# TYPE portal_session_start_time_seconds gauge",
+            f"portal_session_start_time_seconds{{{labels}}} {self.started_at:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export(self, force=False):
+        """写出 textfile_path()（未启用时不写），写入临时文件后改名，采集时不会读到半个文件"""
+        path = self.textfile_path()
+        if not path:
+            return None
+        now = time.monotonic()
+        if not force and now - self._exported_at < EXPORT_INTERVAL:
+            return None
+        self._exported_at = now
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+        return path
+
+
+metrics = Metrics()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+import time
+
+from utils.terminal import console
+
+# 单行最多保留的字节数，超长的行会被截断
+MAX_LINE_BYTES = 4096
+# 每次从管道读取的字节数
+READ_CHUNK = 65536
+# 实时输出面板的刷新频率（每秒），与工具输出速度无关
+LIVE_REFRESH_PER_SECOND = 8
+
+
+class OutputBuffer:
+    """子进程输出的有界环形缓冲区
+
+    只保留最近 max_lines 行用于显示，完整输出原样写入日志文件，无论工具输出多少内存占用都不变。
+    """
+
+    def __init__(self, max_lines=1000, log_path=None):
+        self.lines = collections.deque(maxlen=max_lines)
+        self.log_path = log_path
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.first_output_at = None
+        self._partial = {}
+        self._lock = threading.Lock()
+        self._log = None
+        if log_path:
+            try:
+                self._log = open(log_path, "ab")
+            except OSError:
+                self.log_path = None
+
+    def feed(self, stream, data):
+        """写入一段输出（stream 为 "stdout" 或 "stderr"）"""
+        if not data:
+            return
+        with self._lock:
+            if self.first_output_at is None:
+                self.first_output_at = time.monotonic()
+            self.total_bytes += len(data)
+            if self._log is not None:
+                self._log.write(data)
+
+            pending = self._partial.get(stream, b"") + data
+            *complete, pending = pending.split(b"\n")
+            if len(pending) > MAX_LINE_BYTES:
+                complete.append(pending)
+                pending = b""
+            self._partial[stream] = pending
+            for line in complete:
+                self._append(stream, line)
+
+    def _append(self, stream, line):
+        # 进度条类输出用 \r 覆盖当前行，只保留最后一段
+        line = line.rstrip(b"\r").rsplit(b"\r", 1)[-1][:MAX_LINE_BYTES]
+        self.lines.append((stream, line.decode("utf-8", errors="replace")))
+        self.total_lines += 1
+
+    def close(self):
+        """写入尚未换行的剩余输出并关闭日志文件"""
+        with self._lock:
+            for stream, pending in self._partial.items():
+                if pending:
+                    self._append(stream, pending)
+            self._partial = {}
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def tail(self, count):
+        """返回最近 count 行 [(stream, line)]"""
+        with self._lock:
+            if count >= len(self.lines):
+                return list(self.lines)
+            return list(self.lines)[-count:]
+
+    def since(self, cursor):
+        """返回从游标 cursor 开始的新行及新的游标，已被淘汰的行会被跳过"""
+        with self._lock:
+            available = len(self.lines)
+            first = self.total_lines - available
+            start = max(cursor, first)
+            lines = list(self.lines)[start - first:]
+            return lines, self.total_lines
+
+
+def pump(pipe, stream, buffer):
+    """持续读取管道直到 EOF，在后台线程中运行"""
+    read = getattr(pipe, "read1", pipe.read)
+    try:
+        while True:
+            data = read(READ_CHUNK)
+            if not data:
+                break
+            buffer.feed(stream, data)
+    except (OSError, ValueError):
+        pass
+    finally:
+        pipe.close()
+
+
+def render_tail(job, height=None):
+    """生成作业输出尾部的面板"""
+    from rich.panel import Panel
+    from rich.text import Text
+
+    height = height or max(5, console.height - 6)
+    text = Text(no_wrap=True, overflow="ellipsis")
+    for stream, line in job.output.tail(height):
+        text.append(line + "\n", style="red" if stream == "stderr" else None)
+    subtitle = f"{job.state} · {job.output.total_lines} 行"
+    if job.output.log_path:
+        subtitle += f" · 日志: {job.output.log_path}"
+    return Panel(text, title=f"[{job.id}] {job.name}", subtitle=subtitle, border_style="cyan", height=height + 2)
+
+
+def show_live_output(job, on_interrupt=None):
+    """在实时面板中显示作业输出，作业结束后返回
+
+    按固定频率刷新而不是每行刷新，输出很多的工具也不会拖慢界面。按 Ctrl+C 时调用 on_interrupt，
+    未提供时停止查看并返回 False（作业继续运行）。
+    """
+    from rich.live import Live
+
+    with Live(render_tail(job), console=console, refresh_per_second=LIVE_REFRESH_PER_SECOND,
+              get_renderable=lambda: render_tail(job)):
+        while True:
+            try:
+                if job.wait(1 / LIVE_REFRESH_PER_SECOND):
+                    return True
+            except KeyboardInterrupt:
+                if on_interrupt is None:
+                    return False
+                on_interrupt()
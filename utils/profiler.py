@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import time
+
+# 子进程中设置该环境变量时，第一次等待输入前报告时间并退出
+PROFILE_ENV = "PORTAL_STARTUP_PROFILE"
+FIRST_PROMPT_MARKER = "portal-first-prompt:"
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def profiling():
+    """当前进程是否是启动分析的子进程"""
+    return os.environ.get(PROFILE_ENV) == "1"
+
+
+def report_first_prompt():
+    """在第一次等待用户输入时调用：写出时间戳并立即退出子进程"""
+    sys.stdout.flush()
+    sys.stderr.write(f"{FIRST_PROMPT_MARKER} {time.time():.6f}\n")
+    sys.stderr.flush()
+    os._exit(0)
+
+
+def parse_importtime(lines):
+    """解析 -X importtime 的输出，返回 [(模块, 自身微秒, 累计微秒, 嵌套深度)]"""
+    modules = []
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            depth = (len(indent) - 1) // 2
+            modules.append((name, int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def run_profile(script, args=(), timeout=60):
+    """在子进程中以 -X importtime 运行脚本，返回 (模块导入耗时, 到首个提示符的秒数或 None, 错误输出)"""
+    import subprocess
+
+    env = dict(os.environ, **{PROFILE_ENV: "1"})
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", script, *args],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        env=env, timeout=timeout
+    )
+    lines = proc.stderr.decode("utf-8", errors="replace").splitlines()
+
+    first_prompt = None
+    errors = []
+    for line in lines:
+        if line.startswith(FIRST_PROMPT_MARKER):
+            first_prompt = float(line[len(FIRST_PROMPT_MARKER):]) - started
+        elif not line.startswith("import time:"):
+            errors.append(line)
+    return parse_importtime(lines), first_prompt, errors
+
+
+def show_profile(console, script, args=(), top=15):
+    """运行启动分析并打印耗时最多的模块"""
+    from rich.table import Table
+
+    console.print("[bold blue]⏱️  正在分析启动耗时...[/bold blue]")
+    modules, first_prompt, errors = run_profile(script, args)
+    if not modules:
+        console.print("[bold red]❌ 没有获得导入耗时数据[/bold red]")
+        for line in errors[-10:]:
+            console.print(line, style="dim", markup=False, highlight=False)
+        return 1
+
+    total_us = sum(self_us for _, self_us, _, _ in modules)
+
+    by_self = Table(title=f"自身耗时最多的 {top} 个模块", border_style="blue")
+    by_self.add_column("模块", style="cyan")
+    by_self.add_column("自身 (ms)", style="yellow", justify="right")
+    by_self.add_column("累计 (ms)", style="green", justify="right")
+    for name, self_us, cumulative_us, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:top]:
+        by_self.add_row(name, f"{self_us / 1000:.1f}", f"{cumulative_us / 1000:.1f}")
+    console.print(by_self)
+
+    roots = Table(title="顶层导入（含依赖）", border_style="blue")
+    roots.add_column("模块", style="cyan")
+    roots.add_column("累计 (ms)", style="green", justify="right")
+    for name, _, cumulative_us, _ in sorted(
+            (m for m in modules if m[3] == 0), key=lambda m: m[2], reverse=True)[:top]:
+        roots.add_row(name, f"{cumulative_us / 1000:.1f}")
+    console.print(roots)
+
+    console.print(f"📦 模块导入合计: [bold yellow]{total_us / 1000:.1f} ms[/bold yellow]（{len(modules)} 个模块）")
+    if first_prompt is None:
+        console.print("[bold yellow]⚠️ 程序在出现第一个输入提示前已退出[/bold yellow]")
+        for line in errors[-10:]:
+            console.print(line, style="dim", markup=False, highlight=False)
+    else:
+        from utils.terminal import timing_profile
+
+        console.print(f"⌨️  到第一个输入提示: [bold yellow]{first_prompt * 1000:.1f} ms[/bold yellow]"
+                      f"（时序模式 {timing_profile()}，包含界面动画）")
+    return 0
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+
+from utils.catalog import catalog
+from utils.terminal import console
+
+# 最多缓存的画面数（每个分类的工具表、每个工具的详情各占一项）
+MAX_SCREENS = 64
+
+
+class RenderCache:
+    """已渲染画面的缓存
+
+    表格、面板和 Markdown 只在第一次显示时渲染成带终端控制码的文本，之后重复显示同一画面只需
+    一次终端写入。目录版本、终端宽度或颜色模式变化时整个缓存失效。
+    """
+
+    def __init__(self, max_screens=MAX_SCREENS):
+        self.max_screens = max_screens
+        self._screens = collections.OrderedDict()
+        self._context = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _current_context():
+        return catalog.version, console.width, console.color_system
+
+    def render(self, key, build):
+        """返回画面 key 的渲染结果，未缓存时调用 build() 获取 renderable 列表并渲染"""
+        context = self._current_context()
+        with self._lock:
+            if context != self._context:
+                self._screens.clear()
+                self._context = context
+            text = self._screens.get(key)
+            if text is not None:
+                self._screens.move_to_end(key)
+                self.hits += 1
+                return text
+
+        with console.capture() as capture:
+            for renderable in build():
+                console.print(renderable)
+        text = capture.get()
+
+        with self._lock:
+            self.misses += 1
+            if self._context == context:
+                self._screens[key] = text
+                while len(self._screens) > self.max_screens:
+                    self._screens.popitem(last=False)
+        return text
+
+    def show(self, key, build):
+        """显示画面 key"""
+        if console.legacy_windows:
+            # 旧版 Windows 控制台通过 API 设置颜色，无法回放控制码
+            for renderable in build():
+                console.print(renderable)
+            return
+        console.file.write(self.render(key, build))
+        console.file.flush()
+
+    def clear(self):
+        with self._lock:
+            self._screens.clear()
+            self._context = None
+
+
+screens = RenderCache()
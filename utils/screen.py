@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import atexit
+import os
+import re
+
+from config import CONFIG
+from utils.terminal import console
+
+ENTER_ALT_SCREEN = "\x1b[?1049h"
+LEAVE_ALT_SCREEN = "\x1b[?1049l"
+CURSOR_HOME = "\x1b[H"
+ERASE_SCREEN = "\x1b[2J"
+ERASE_LINE_END = "\x1b[K"
+ERASE_BELOW = "\x1b[J"
+RESET_STYLE = "\x1b[0m"
+
+# 除颜色样式 (SGR) 和超链接外的控制序列：移动光标、擦除等，说明有 Live/进度条在直接控制屏幕
+CURSOR_CONTROL = re.compile(r"\x1b\[[0-9;?]*[A-LSTf-ln-z]|\r(?!\n)")
+ANSI_SEQUENCE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)")
+
+
+def _visible_width(text):
+    from rich.cells import cell_len
+
+    return cell_len(ANSI_SEQUENCE.sub("", text))
+
+
+def _unchanged_prefix(old, new):
+    """两行开头相同且以样式复位结尾的部分的长度，从这里开始的终端样式状态是确定的"""
+    common = len(os.path.commonprefix([old, new]))
+    end = new.rfind(RESET_STYLE, 0, common)
+    return 0 if end < 0 else end + len(RESET_STYLE)
+
+
+class FrameWriter:
+    """逐行比较前后两屏内容的输出流
+
+    每次切换画面时只把光标移回左上角，新画面的每一行与上一屏同一位置的行比较，相同的行直接跳过，
+    不同的行覆盖写入并擦除行尾。遇到无法跟踪的输出（Live、进度条、超出一屏）时退回整屏重绘。
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.previous = []
+        self.current = []
+        self.partial = ""
+        self.emitted = 0
+        self.skipped = 0
+        self.width = console.width
+        # 为 True 时本屏不再逐行比较，下次切换画面时整屏清除
+        self.passthrough = True
+
+    def isatty(self):
+        return self.stream.isatty()
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, "encoding", "utf-8")
+
+    def _flush_skipped(self):
+        if self.skipped:
+            # 光标下移到第 n 行的行首（上一屏不超过一屏高度，不会触发滚动）
+            self.stream.write(f"\x1b[{self.skipped}E")
+            self.skipped = 0
+
+    def _start_passthrough(self):
+        self._flush_skipped()
+        if self.partial[self.emitted:]:
+            self.stream.write(self.partial[self.emitted:])
+        self.partial = ""
+        self.emitted = 0
+        self.passthrough = True
+
+    def _line(self, line, emitted):
+        row = len(self.current)
+        if row >= console.height - 1 or _visible_width(line) > self.width:
+            # 内容超出一屏或发生折行，无法再按行对齐
+            self.stream.write(line[emitted:] + ERASE_LINE_END + "\n")
+            self.current.append(None)
+            self.passthrough = True
+            return
+        self.current.append(line)
+        old = self.previous[row] if emitted == 0 and row < len(self.previous) else None
+        if old == line:
+            self.skipped += 1
+            return
+        self._flush_skipped()
+        prefix = _unchanged_prefix(old, line) if old else 0
+        if prefix:
+            # 只重写从第一处不同开始的部分
+            self.stream.write(f"\x1b[{_visible_width(line[:prefix]) + 1}G" + line[prefix:] + ERASE_LINE_END + "\n")
+        else:
+            self.stream.write(line[emitted:] + ERASE_LINE_END + "\n")
+
+    def write(self, text):
+        if self.passthrough:
+            self.stream.write(text)
+            return len(text)
+        if CURSOR_CONTROL.search(text):
+            self._start_passthrough()
+            self.stream.write(text)
+            return len(text)
+
+        *lines, self.partial = (self.partial + text).split("\n")
+        for i, line in enumerate(lines):
+            self._line(line, self.emitted)
+            self.emitted = 0
+            if self.passthrough:
+                # 剩余内容原样输出
+                self.stream.write("\n".join(lines[i + 1:] + [self.partial]))
+                self.partial = ""
+                break
+        return len(text)
+
+    def flush(self):
+        if not self.passthrough and len(self.partial) > self.emitted:
+            # 未换行的内容（提示符、逐字打字效果）需要立即显示
+            self._flush_skipped()
+            self.stream.write(self.partial[self.emitted:])
+            self.emitted = len(self.partial)
+        self.stream.flush()
+
+    def new_frame(self):
+        """切换到新画面：能逐行比较时只移回左上角，否则整屏清除"""
+        if not self.current and not self.partial and not self.passthrough:
+            # 上次切换后没有任何输出，屏幕上仍是更早的画面
+            self.stream.write(CURSOR_HOME)
+            self.stream.flush()
+            return
+        if self.passthrough or console.width != self.width:
+            self.stream.write(CURSOR_HOME + ERASE_SCREEN)
+            self.previous = []
+        else:
+            self.stream.write(CURSOR_HOME)
+            self.previous = self.current
+        self.current = []
+        self.partial = ""
+        self.emitted = 0
+        self.skipped = 0
+        self.width = console.width
+        self.passthrough = False
+        self.stream.flush()
+
+    def before_input(self):
+        """等待输入前：显示提示符并擦除其后的旧内容"""
+        self.flush()
+        if not self.passthrough:
+            self.stream.write(ERASE_BELOW)
+            self.previous = self.previous[:len(self.current) + 1]
+        self.stream.flush()
+
+    def after_input(self, echoed):
+        """用户按下回车后终端已换行；输入行的内容不再可知，下一屏重新绘制该行"""
+        if self.passthrough:
+            return
+        rows = max(1, -(-_visible_width(self.partial + echoed) // max(1, self.width)))
+        self.current.extend([None] * rows)
+        self.partial = ""
+        self.emitted = 0
+        if len(self.current) >= console.height - 1:
+            self.passthrough = True
+
+
+class FullScreen:
+    """基于终端备用屏幕的全屏模式，切换画面时不启动子进程，只重绘有变化的行"""
+
+    def __init__(self):
+        self.writer = None
+        self.suspended = False
+        self._registered = False
+
+    @property
+    def active(self):
+        return self.writer is not None
+
+    @staticmethod
+    def supported():
+        return (
+            bool(CONFIG.get("fullscreen", True))
+            and console.is_terminal
+            and not console.legacy_windows
+            and os.environ.get("TERM") != "dumb"
+        )
+
+    def enter(self):
+        """进入备用屏幕，不支持时保持普通的打印加清屏方式"""
+        if self.active or not self.supported():
+            return False
+        stream = console.file
+        stream.write(ENTER_ALT_SCREEN + CURSOR_HOME + ERASE_SCREEN)
+        stream.flush()
+        self.writer = FrameWriter(stream)
+        console.file = self.writer
+        if not self._registered:
+            atexit.register(self.leave)
+            self._registered = True
+        return True
+
+    def leave(self):
+        """回到普通屏幕，备用屏幕中的内容随之消失"""
+        if not self.active:
+            return
+        stream = self.writer.stream
+        self.writer.flush()
+        console.file = stream
+        self.writer = None
+        stream.write(LEAVE_ALT_SCREEN)
+        stream.flush()
+
+    def suspend(self):
+        """暂时回到普通屏幕（例如前台运行直接使用终端的工具），下次切换画面时恢复全屏"""
+        if self.active:
+            self.leave()
+            self.suspended = True
+
+    def clear(self):
+        if self.suspended:
+            self.suspended = False
+            self.enter()
+        if self.active:
+            self.writer.new_frame()
+        elif console.legacy_windows:
+            os.system("cls")
+        elif console.is_terminal:
+            console.clear()
+
+    def before_input(self):
+        if self.active:
+            self.writer.before_input()
+
+    def after_input(self, echoed):
+        if self.active:
+            self.writer.after_input(echoed)
+
+
+screen = FullScreen()
+
+
+def clear_screen():
+    """切换到新画面：全屏模式下只重绘有变化的行，否则用控制序列清屏"""
+    screen.clear()
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地启动接口
+以 JSON-RPC 2.0 over HTTP 的形式提供工具目录查询、启动、作业状态、输出和取消，监听本机地址或 Unix 套接字。
+调用方先用系统访问密码调用 login 换取令牌，之后的请求在 Authorization: Bearer <令牌> 头中携带令牌。
+作业输出可以通过 GET /jobs/<编号>/output?cursor=<游标> 以 NDJSON 流的形式持续读取，直到作业结束。
+"""
+
+import asyncio
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from config import CONFIG
+from utils.auth import verify_password
+from utils.catalog import catalog
+from utils.history import history
+from utils.jobs import jobs
+from utils.launcher import fill_parameters, launch_problem, plan_launch, tool_detail, tool_summary
+
+MAX_HEADER_BYTES = 16384
+MAX_BODY_BYTES = 1 << 20
+# 输出流检查新输出的间隔（秒）
+STREAM_POLL_SECONDS = 0.1
+# jobs.wait 单次调用最长等待的秒数
+MAX_WAIT_SECONDS = 60
+# 登录失败次数达到 max_attempts 后，该来源在这段时间内不能再登录（秒）
+LOCKOUT_SECONDS = 60
+# Linux 上 SO_PEERCRED 返回的 struct ucred（pid、uid、gid）
+UCRED = struct.Struct("3i")
+
+# JSON-RPC 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNAUTHORIZED = -32001
+NOT_FOUND = -32004
+LAUNCH_FAILED = -32010
+
+HTTP_REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+}
+
+_REQUIRED = object()
+
+
+class RPCError(Exception):
+    """返回给调用方的 JSON-RPC 错误"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def is_local_host(host):
+    """是否为本机回环地址"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _param(params, name, kind, default=_REQUIRED):
+    value = params.get(name, default)
+    if value is _REQUIRED:
+        raise RPCError(INVALID_PARAMS, f"缺少参数 {name}")
+    if value is default:
+        return value
+    if not isinstance(value, kind) or (isinstance(value, bool) and kind is not bool):
+        raise RPCError(INVALID_PARAMS, f"参数 {name} 的类型不正确")
+    return value
+
+
+class LaunchAPI:
+    """接口方法的实现，与传输方式无关
+
+    同步方法在线程池中执行，不会阻塞事件循环；启动工具时工作目录只作为子进程参数传递，
+    多个调用方可以同时启动工具。
+    """
+
+    def __init__(self):
+        # 令牌 -> 过期时刻（monotonic）
+        self.tokens = {}
+        # 登录来源 -> (失败次数, 锁定到的时刻, 最近一次尝试的时刻)，时刻均为 monotonic
+        self._failures = {}
+        self._lock = threading.Lock()
+        self.methods = {
+            "catalog.categories": self.categories,
+            "tools.list": self.list_tools,
+            "tools.search": self.search_tools,
+            "tools.show": self.show_tool,
+            "tools.launch": self.launch,
+            "jobs.list": self.list_jobs,
+            "jobs.status": self.job_status,
+            "jobs.output": self.job_output,
+            "jobs.wait": self.wait_job,
+            "jobs.cancel": self.cancel_job,
+        }
+
+    # 身份验证
+
+    def login(self, params, peer):
+        """用系统访问密码换取令牌（有效期为 CONFIG["api_token_ttl"] 秒），失败次数过多时暂时锁定该来源
+
+        验证密码之前先在锁内检查锁定状态并占用一次尝试次数：批量请求中的多个 login 并发执行时，
+        超出 max_attempts 的尝试在计算哈希之前就被拒绝。验证成功后才清除该来源的失败计数。
+        """
+        password = _param(params, "password", str)
+        with self._lock:
+            now = time.monotonic()
+            # 清理锁定已解除、且最近一次尝试已超过锁定时间的来源，每个连接一个来源也不会一直占用内存
+            for stale in [key for key, (_, locked_until, seen) in self._failures.items()
+                          if max(locked_until, seen + LOCKOUT_SECONDS) <= now]:
+                del self._failures[stale]
+            count, locked_until, _ = self._failures.get(peer, (0, 0.0, now))
+            if locked_until > now:
+                raise RPCError(UNAUTHORIZED, "密码错误次数过多，请稍后再试")
+            count += 1
+            if count >= CONFIG["max_attempts"]:
+                self._failures[peer] = (0, now + LOCKOUT_SECONDS, now)
+            else:
+                self._failures[peer] = (count, 0.0, now)
+        if not verify_password(password):
+            raise RPCError(UNAUTHORIZED, "密码错误")
+        with self._lock:
+            self._failures.pop(peer, None)
+            now = time.monotonic()
+            # 登录时顺便清理过期的令牌，不再使用的令牌不会一直留在内存中
+            for expired in [token for token, expires in self.tokens.items() if expires <= now]:
+                del self.tokens[expired]
+            ttl = CONFIG.get("api_token_ttl", 3600)
+            token = secrets.token_urlsafe(32)
+            self.tokens[token] = now + ttl
+        return {"token": token, "expires_in": ttl}
+
+    def logout(self, token):
+        with self._lock:
+            self.tokens.pop(token, None)
+        return True
+
+    def authorized(self, token):
+        # 令牌字典的查找基于哈希，不会逐字节比较
+        with self._lock:
+            expires = self.tokens.get(token) if token is not None else None
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self.tokens[token]
+                return False
+            return True
+
+    # 工具目录
+
+    @staticmethod
+    def _find_tool(params):
+        found = catalog.find(_param(params, "name", str))
+        if found is None:
+            raise RPCError(NOT_FOUND, f"未找到工具: {params['name']}")
+        return found
+
+    def categories(self, params):
+        return [{"name": name, "count": len(catalog.category_tools(name))} for name in catalog.categories()]
+
+    def list_tools(self, params):
+        category = _param(params, "category", str, None)
+        offset = _param(params, "offset", int, 0)
+        limit = _param(params, "limit", int, None)
+        if category is None:
+            entries = [(name, tool) for name, tools in catalog.tools().items() for tool in tools]
+        elif category in catalog.categories():
+            entries = [(category, tool) for tool in catalog.category_tools(category)]
+        else:
+            raise RPCError(NOT_FOUND, f"未找到分类: {category}")
+        page = entries[offset:] if limit is None else entries[offset:offset + limit]
+        return {"total": len(entries), "tools": [tool_summary(name, tool) for name, tool in page]}
+
+    def search_tools(self, params):
+        from utils.store import search_tools
+
+        query = _param(params, "query", str)
+        limit = _param(params, "limit", int, 20)
+        return [tool_summary(category, tool) for category, tool in search_tools(query, limit)]
+
+    def show_tool(self, params):
+        return tool_detail(*self._find_tool(params))
+
+    # 启动与作业
+
+    def launch(self, params):
+        """启动工具并立即返回作业；parameters 直接指定命令行参数，否则用 values 填充工具参数中的占位符"""
+        category, tool = self._find_tool(params)
+        parameters = _param(params, "parameters", str, None)
+        values = None
+        if parameters is None:
+            values = _param(params, "values", dict, {})
+            try:
+                parameters = fill_parameters(tool, values)
+            except KeyError as e:
+                raise RPCError(INVALID_PARAMS, f"缺少占位符 {e.args[0]} 的值")
+        error = launch_problem(tool)
+        if error:
+            raise RPCError(LAUNCH_FAILED, f"{tool.name}: {error}")
+        argv, shell, cwd, popen = plan_launch(tool, parameters)
+        try:
+            job = jobs.spawn(tool.name, argv, cwd=cwd, shell=shell, detach=True, capture=True, popen=popen)
+        except OSError as e:
+            raise RPCError(LAUNCH_FAILED, f"启动 {tool.name} 失败: {e}")
+        history.record_launch(tool.name, values, category)
+        return job.to_dict()
+
+    @staticmethod
+    def _find_job(params):
+        job = jobs.get(_param(params, "id", int))
+        if job is None:
+            raise RPCError(NOT_FOUND, f"未找到作业: {params['id']}")
+        return job
+
+    def list_jobs(self, params):
+        return [job.to_dict() for job in jobs.list()]
+
+    def job_status(self, params):
+        return self._find_job(params).to_dict()
+
+    def job_output(self, params):
+        """返回游标之后的新输出和新游标，游标从 0 开始"""
+        job = self._find_job(params)
+        cursor = _param(params, "cursor", int, 0)
+        finished = job.finished.is_set()
+        if job.output is None:
+            return {"lines": [], "cursor": cursor, "finished": finished}
+        lines, cursor = job.output.since(cursor)
+        return {
+            "lines": [{"stream": stream, "line": line} for stream, line in lines],
+            "cursor": cursor,
+            "finished": finished,
+        }
+
+    async def wait_job(self, params):
+        """等待作业结束或超时，返回作业状态"""
+        job = self._find_job(params)
+        timeout = min(_param(params, "timeout", (int, float), MAX_WAIT_SECONDS), MAX_WAIT_SECONDS)
+        deadline = time.monotonic() + timeout
+        while not job.finished.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+        return job.to_dict()
+
+    def cancel_job(self, params):
+        """取消作业：默认发送中断信号，force 为 true 时终止进程（超时后强制结束）"""
+        job = self._find_job(params)
+        if _param(params, "force", bool, False):
+            job.kill()
+        else:
+            job.interrupt()
+        return job.to_dict()
+
+    # 调度
+
+    async def call(self, request, token, peer):
+        """执行一个 JSON-RPC 请求，通知（没有 id）返回 None"""
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "无效的请求")
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", {})
+        loop = asyncio.get_running_loop()
+        try:
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params 必须是对象")
+            if method == "login":
+                result = await loop.run_in_executor(None, self.login, params, peer)
+            elif not self.authorized(token):
+                raise RPCError(UNAUTHORIZED, "未登录或令牌无效")
+            elif method == "logout":
+                result = self.logout(token)
+            elif method not in self.methods:
+                raise RPCError(METHOD_NOT_FOUND, f"未知的方法: {method}")
+            elif asyncio.iscoroutinefunction(self.methods[method]):
+                result = await self.methods[method](params)
+            else:
+                result = await loop.run_in_executor(None, self.methods[method], params)
+        except RPCError as e:
+            response = _error_response(request_id, e.code, e.message)
+        except Exception as e:
+            response = _error_response(request_id, INTERNAL_ERROR, str(e))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return response if "id" in request else None
+
+
+def _error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _json_bytes(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class LaunchServer:
+    """JSON-RPC over HTTP/1.1 的传输层，每个连接一个协程，支持长连接"""
+
+    def __init__(self, api=None):
+        self.api = api or LaunchAPI()
+        self.server = None
+
+    @staticmethod
+    def _peer(writer):
+        """登录失败计数的来源：TCP 连接为对端地址和端口，Unix 套接字为对端进程（SO_PEERCRED 中的 uid 和 pid）
+
+        接口只监听本机回环地址，所有 TCP 调用方的地址都是 127.0.0.1；Unix 套接字的对端地址都是空的。
+        只按地址计数时，一个输错密码的调用方会锁定所有调用方，因此按连接或进程分别计数。
+        """
+        peer = writer.get_extra_info("peername")
+        if isinstance(peer, tuple):
+            return f"{peer[0]}:{peer[1]}"
+        sock = writer.get_extra_info("socket")
+        if sock is not None and hasattr(socket, "SO_PEERCRED"):
+            try:
+                pid, uid, _ = UCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, UCRED.size))
+                return f"unix:{uid}:{pid}"
+            except (OSError, struct.error):
+                pass
+        return "unix"
+
+    @staticmethod
+    async def _read_request(reader):
+        """读取一个 HTTP 请求，连接关闭时返回 None"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPError(400, "请求不完整")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "请求头过长")
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "无效的请求行")
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "无效的 Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "请求体过大")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _send(writer, status, body=b"", content_type="application/json", keep_alive=True):
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}"]
+        if status != 204:
+            head.append(f"Content-Type: {content_type}; charset=utf-8")
+            head.append(f"Content-Length: {len(body)}")
+        head.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    @staticmethod
+    def _token(headers):
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        return token.strip() if scheme.lower() == "bearer" else None
+
+    async def _handle_rpc(self, writer, headers, body, peer, keep_alive):
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            self._send(writer, 200, _json_bytes(_error_response(None, PARSE_ERROR, "无法解析 JSON")), keep_alive=keep_alive)
+            return
+        token = self._token(headers)
+        if isinstance(payload, list) and payload:
+            # 批量请求中的各个调用并发执行
+            responses = await asyncio.gather(*(self.api.call(item, token, peer) for item in payload))
+            result = [response for response in responses if response is not None] or None
+        elif isinstance(payload, list):
+            result = _error_response(None, INVALID_REQUEST, "批量请求不能为空")
+        else:
+            result = await self.api.call(payload, token, peer)
+        if result is None:
+            self._send(writer, 204, keep_alive=keep_alive)
+        else:
+            self._send(writer, 200, _json_bytes(result), keep_alive=keep_alive)
+
+    async def _stream_output(self, writer, job, cursor):
+        """以分块传输持续发送作业输出，每行一个 JSON 对象，作业结束时发送最终状态"""
+
+        def chunk(records):
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\n"
+            b"Transfer-Encoding: chunked\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        while True:
+            # 先判断是否结束再读取：作业结束前剩余的输出已经写入缓冲区
+            finished = job.finished.is_set()
+            if job.output is not None:
+                lines, cursor = job.output.since(cursor)
+                if lines:
+                    # 每行附带读取到该行之后的游标，断开后可以从任意一行继续
+                    first = cursor - len(lines)
+                    chunk({"stream": stream, "line": line, "cursor": first + i + 1}
+                          for i, (stream, line) in enumerate(lines))
+                    await writer.drain()
+            if finished:
+                break
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+        chunk([{"state": job.state, "exit_code": job.exit_code, "cursor": cursor}])
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _handle_stream(self, writer, target, headers):
+        parts = urlsplit(target)
+        segments = parts.path.strip("/").split("/")
+        job = jobs.get(segments[1]) if len(segments) == 3 else None
+        if not self.api.authorized(self._token(headers)):
+            self._send(writer, 401, _json_bytes({"error": "未登录或令牌无效"}), keep_alive=False)
+            return
+        if job is None:
+            self._send(writer, 404, _json_bytes({"error": "未找到作业"}), keep_alive=False)
+            return
+        try:
+            cursor = int(parse_qs(parts.query).get("cursor", ["0"])[0])
+        except ValueError:
+            cursor = 0
+        await self._stream_output(writer, job, cursor)
+
+    async def handle(self, reader, writer):
+        peer = self._peer(writer)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    self._send(writer, e.status, _json_bytes({"error": e.message}), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                path = urlsplit(target).path
+                if path == "/rpc":
+                    if method != "POST":
+                        self._send(writer, 405, _json_bytes({"error": "请使用 POST"}), keep_alive=keep_alive)
+                    else:
+                        await self._handle_rpc(writer, headers, body, peer, keep_alive)
+                elif method == "GET" and path.startswith("/jobs/") and path.endswith("/output"):
+                    await self._handle_stream(writer, target, headers)
+                    break
+                else:
+                    self._send(writer, 404, _json_bytes({"error": "未知的路径"}), keep_alive=keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=None, port=None, socket_path=None):
+        """开始监听，指定 socket_path 时使用 Unix 套接字（仅当前用户可访问）"""
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            old_umask = os.umask(0o177)
+            try:
+                self.server = await asyncio.start_unix_server(self.handle, path=socket_path, limit=MAX_HEADER_BYTES)
+            finally:
+                os.umask(old_umask)
+        else:
+            host = host or CONFIG.get("api_host", "127.0.0.1")
+            if not is_local_host(host):
+                raise ValueError(f"启动接口只能监听本机地址: {host}")
+            port = CONFIG.get("api_port", 8765) if port is None else port
+            self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        return self.server
+
+    def addresses(self):
+        return [sock.getsockname() for sock in self.server.sockets]
+
+
+def stop_jobs():
+    """终止仍在运行的作业：服务退出后没有进程再读取它们的输出"""
+    running = jobs.running()
+    if running:
+        with ThreadPoolExecutor(max_workers=len(running)) as pool:
+            list(pool.map(lambda job: job.kill(), running))
+    return len(running)
+
+
+def serve(host=None, port=None, socket_path=None, on_ready=None):
+    """运行启动接口直到被中断，on_ready(地址列表) 在开始监听后调用"""
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=CONFIG.get("api_workers", 16), thread_name_prefix="api")
+        )
+        server = LaunchServer()
+        await server.start(host, port, socket_path)
+        if on_ready is not None:
+            on_ready(server.addresses())
+        async with server.server:
+            await server.server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    finally:
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
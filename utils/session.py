@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码哈希与登录会话
+系统密码以加盐的 PBKDF2-SHA256 哈希保存在 CONFIG["password_hash"] 中。验证成功后在 .cache/ 下保存一个
+仅当前用户可读写的会话令牌，绑定用户、终端和主机，有效期为 CONFIG["session_ttl"] 秒；
+令牌有效时重新进入门户不再验证密码，也不再播放启动序列。
+"""
+
+import base64
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import sys
+import time
+
+from config import CONFIG
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SESSION_DIR = os.path.join(BASE_DIR, ".cache")
+
+HASH_ALGORITHM = "pbkdf2_sha256"
+HASH_ITERATIONS = 600000
+SALT_BYTES = 16
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password, iterations=HASH_ITERATIONS):
+    """返回 "pbkdf2_sha256$迭代次数$盐$哈希" 格式的密码哈希"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_ALGORITHM}${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def check_password_hash(password, encoded):
+    """检查密码是否与哈希一致，哈希格式无效时返回 False"""
+    try:
+        algorithm, iterations, salt, expected = encoded.split("$")
+        if algorithm != HASH_ALGORITHM:
+            return False
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), _b64decode(salt), int(iterations))
+        return hmac.compare_digest(digest, _b64decode(expected))
+    except (ValueError, TypeError):
+        return False
+
+
+def credential():
+    """当前配置的密码凭据：优先使用哈希，兼容旧配置中的明文 "password\""""
+    return CONFIG.get("password_hash") or CONFIG.get("password") or ""
+
+
+def verify(password):
+    """检查系统访问密码"""
+    if CONFIG.get("password_hash"):
+        return check_password_hash(password, CONFIG["password_hash"])
+    if CONFIG.get("password") is None:
+        return False
+    return hmac.compare_digest(password.encode("utf-8"), str(CONFIG["password"]).encode("utf-8"))
+
+
+def _tty():
+    """标准输入或输出所在的终端，都不是终端时返回 None"""
+    for stream in (sys.stdin, sys.stdout):
+        try:
+            return os.ttyname(stream.fileno())
+        except (AttributeError, OSError, ValueError):
+            continue
+    return None
+
+
+def _identity():
+    """会话绑定的 (用户, 终端, 主机)，没有终端时终端为 None"""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        # 没有用户名环境变量且不在 passwd 中（如容器内的任意 UID）
+        user = ""
+    if hasattr(os, "getuid"):
+        user = f"{user}:{os.getuid()}"
+    return user, _tty(), socket.gethostname()
+
+
+def _session_prefix(user):
+    return "session-" + "".join(char if char.isalnum() else "_" for char in user) + "-"
+
+
+def _session_path(user, tty, host):
+    """每个用户在每个终端上各有一个会话文件"""
+    where = hashlib.sha256(f"{tty}\n{host}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SESSION_DIR, f"{_session_prefix(user)}{where}.json")
+
+
+def _mac(fields):
+    """用密码凭据签名会话内容：修改密码后旧会话全部失效，不知道凭据无法伪造会话"""
+    message = "\n".join(str(value) for value in fields).encode("utf-8")
+    return hmac.new(credential().encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def _fields(data):
+    return data["user"], data["tty"], data["host"], data["expires"], data["nonce"]
+
+
+def _private(path):
+    """会话文件必须属于当前用户且其他用户不可访问"""
+    if not hasattr(os, "getuid"):
+        return True
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def resume():
+    """当前用户、终端和主机上是否有未过期的会话；没有终端时（管道、cron、CI）总是重新验证"""
+    user, tty, host = _identity()
+    if tty is None:
+        return False
+    path = _session_path(user, tty, host)
+    try:
+        if not _private(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if (data["user"], data["tty"], data["host"]) != (user, tty, host) or data["expires"] <= time.time():
+            return False
+        return hmac.compare_digest(data["mac"], _mac(_fields(data)))
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def start():
+    """密码验证成功后保存会话，有效期为 CONFIG["session_ttl"] 秒（为 0 或没有终端时不保存）
+
+    没有终端的进程无法区分彼此，保存的会话会被同一用户的所有后台进程共用，因此不保存。
+    """
+    ttl = CONFIG.get("session_ttl", 0)
+    if not ttl:
+        return False
+    user, tty, host = _identity()
+    if tty is None:
+        return False
+    data = {"user": user, "tty": tty, "host": host, "expires": time.time() + ttl, "nonce": secrets.token_hex(16)}
+    data["mac"] = _mac(_fields(data))
+    path = _session_path(user, tty, host)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+    return True
+
+
+def end(all_terminals=False):
+    """删除当前终端（all_terminals 为 True 时为当前用户全部终端）上的会话，返回删除的会话数"""
+    user, tty, host = _identity()
+    if all_terminals:
+        prefix = _session_prefix(user)
+        try:
+            paths = [os.path.join(SESSION_DIR, name) for name in os.listdir(SESSION_DIR)
+                     if name.startswith(prefix) and name.endswith(".json")]
+        except OSError:
+            paths = []
+    elif tty is not None:
+        paths = [_session_path(user, tty, host)]
+    else:
+        paths = []
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
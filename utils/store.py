@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import sqlite3
+import threading
+
+from config import CONFIG
+from utils.catalog import catalog
+
+# 全文索引覆盖的字段
+INDEXED_FIELDS = ("name", "description", "usage", "author", "category")
+# trigram 分词器按三个字符切分，短于三个字符的关键词只能退回 LIKE 匹配
+TRIGRAM_MIN_LENGTH = 3
+
+
+class CatalogStore:
+    """基于 SQLite 的工具目录存储，使用 FTS5 trigram 分词器建立全文索引
+
+    trigram 分词不依赖空格切词，可以直接检索中文使用说明；SQLite 不支持 FTS5 或 trigram
+    时退回 LIKE 子串匹配。存储按目录版本同步，目录未变化时不会重建索引。
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.fts = self._create_schema()
+        self._synced_version = None
+        self._lock = threading.Lock()
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tools (
+                id INTEGER PRIMARY KEY,
+                category TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT,
+                usage TEXT,
+                author TEXT
+            );
+        """)
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS tools_fts USING fts5("
+                "name, description, usage, author, category, "
+                "content='tools', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            # 旧版 SQLite 没有 FTS5 或 trigram 分词器
+            return False
+        return True
+
+    @staticmethod
+    def _fingerprint(tools_data):
+        payload = json.dumps(
+            {category: [tool.to_dict() for tool in tools] for category, tools in tools_data.items()},
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def sync(self):
+        """目录版本变化时重建存储和索引"""
+        catalog.refresh()
+        with self._lock:
+            if self._synced_version == catalog.version:
+                return False
+            tools_data = catalog.tools()
+            version = catalog.version
+
+            fingerprint = self._fingerprint(tools_data)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row and row[0] == fingerprint:
+                # 文件存储中的内容与当前目录一致，无需重建
+                self._synced_version = version
+                return False
+
+            rows = []
+            for category, tools in tools_data.items():
+                for position, tool in enumerate(tools):
+                    rows.append((
+                        category, position, tool.name or "", tool.description, tool.usage, tool.author or ""
+                    ))
+
+            with self.conn:
+                self.conn.execute("DELETE FROM tools")
+                self.conn.executemany(
+                    "INSERT INTO tools (category, position, name, description, usage, author) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                if self.fts:
+                    self.conn.execute("INSERT INTO tools_fts(tools_fts) VALUES ('rebuild')")
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+
+            self._synced_version = version
+            return True
+
+    def search(self, terms, limit=20):
+        """按关键词检索工具，返回 [(分类, 工具)]，多个关键词之间为“与”关系"""
+        words = [word for word in terms.split() if word]
+        if not words:
+            return []
+        self.sync()
+
+        long_words = [w for w in words if self.fts and len(w) >= TRIGRAM_MIN_LENGTH]
+        short_words = [w for w in words if w not in long_words]
+
+        conditions = []
+        params = []
+        if long_words:
+            conditions.append("tools.id IN (SELECT rowid FROM tools_fts WHERE tools_fts MATCH ?)")
+            params.append(" AND ".join('"{}"'.format(w.replace('"', '""')) for w in long_words))
+        for word in short_words:
+            pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            like = " OR ".join(f"tools.{field} LIKE ? ESCAPE '\\'" for field in INDEXED_FIELDS)
+            conditions.append(f"({like})")
+            params.extend([pattern] * len(INDEXED_FIELDS))
+
+        # 工具名称命中的结果排在前面
+        order = "CASE WHEN tools.name LIKE ? THEN 0 ELSE 1 END, tools.name"
+        params.append(f"%{words[0]}%")
+        sql = (
+            f"SELECT category, position FROM tools WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {order} LIMIT ?"
+        )
+        params.append(limit)
+
+        with self._lock:
+            hits = self.conn.execute(sql, params).fetchall()
+
+        results = []
+        for category, position in hits:
+            tools = catalog.category_tools(category)
+            if position < len(tools):
+                results.append((category, tools[position]))
+        return results
+
+
+_store = None
+
+
+def get_store():
+    """返回进程级的目录存储，首次使用时创建"""
+    global _store
+    if _store is None:
+        _store = CatalogStore(CONFIG.get("catalog_db") or ":memory:")
+    return _store
+
+
+def search_tools(terms, limit=20):
+    """在工具目录中全文检索"""
+    return get_store().search(terms, limit)
@@ -9,8 +9,55 @@ import time
 from rich.console import Console
 from rich.text import Text
 
+from config import CONFIG
+from utils.profiler import PROFILE_ENV
+
 console = Console()
 
+# 各时序模式下动画延迟的倍率：cinematic 保留全部效果，fast 去掉逐字打字并缩短停顿，none 不播放任何动画
+TIMING_SCALE = {"cinematic": 1.0, "fast": 0.1, "none": 0.0}
+
+# 可以在任意输入提示中使用的命令（用于 Tab 补全）
+COMMANDS = ["clear", "cls", "exit", "quit", "help", "search ", "find ", "jobs", "fg ", "wait ", "kill ", "tail ", "doctor", "stats"]
+
+
+def timing_profile():
+    """当前的时序模式（cinematic / fast / none）"""
+    profile = CONFIG.get("timing_profile", "cinematic")
+    return profile if profile in TIMING_SCALE else "cinematic"
+
+
+def pause(seconds):
+    """按时序模式缩放的展示性停顿"""
+    seconds *= TIMING_SCALE[timing_profile()]
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+def run_stages(title, stages):
+    """依次执行 [(描述, 函数)]，进度条按实际完成的阶段推进，返回各阶段函数的返回值"""
+    if timing_profile() == "none":
+        return [func() for _, func in stages]
+
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+    results = []
+    with Progress(
+            SpinnerColumn("dots"),
+            TextColumn("[bold blue]{task.description}[/bold blue]"),
+            BarColumn(complete_style="green", finished_style="green"),
+            TextColumn("{task.completed}/{task.total}"),
+            TimeElapsedColumn(),
+            console=console
+    ) as progress:
+        task = progress.add_task(title, total=len(stages))
+        for label, func in stages:
+            progress.update(task, description=f"{title}: {label}")
+            results.append(func())
+            progress.advance(task)
+        progress.update(task, description=f"{title}: 完成")
+    return results
+
 
 class KaliTerminal:
     """模拟Kali Linux终端风格的交互界面"""
@@ -34,15 +81,59 @@ class KaliTerminal:
 
     def input(self, hidden=False):
         """获取用户输入，可选择是否隐藏输入内容"""
-        if hidden:
-            return getpass.getpass("")
-        else:
-            return input("")
+        if os.environ.get(PROFILE_ENV) == "1":
+            from utils.profiler import report_first_prompt
+
+            report_first_prompt()
+        from utils.screen import screen
+
+        screen.before_input()
+        text = ""
+        try:
+            if hidden:
+                return getpass.getpass("")
+            self._enable_completion()
+            text = input("")
+            return text
+        finally:
+            screen.after_input(text)
+
+    _completion_enabled = False
+
+    def _enable_completion(self):
+        """启用 Tab 补全（命令、分类和工具名称），没有 readline 时跳过"""
+        if KaliTerminal._completion_enabled:
+            return
+        KaliTerminal._completion_enabled = True
+        try:
+            import readline
+        except ImportError:
+            return
+        readline.set_completer_delims("")
+        readline.set_completer(self._complete)
+        readline.parse_and_bind("tab: complete")
+
+    def _complete(self, text, state):
+        """readline 补全回调，整行作为补全对象"""
+        if state == 0:
+            from utils.finder import get_index
+
+            head, _, rest = text.rpartition(" ")
+            if head:
+                self._matches = [f"{head} {name}" for name in get_index().complete(rest)]
+            else:
+                commands = [c for c in COMMANDS if c.startswith(text.lower())]
+                self._matches = commands + get_index().complete(text)
+        if state < len(self._matches):
+            return self._matches[state]
+        return None
 
     def execute_command(self, command):
         """模拟执行终端命令"""
         if command.lower() in ["clear", "cls"]:
-            os.system("cls" if os.name == "nt" else "clear")
+            from utils.screen import clear_screen
+
+            clear_screen()
             return True
 
         if command.lower() in ["exit", "quit"]:
@@ -52,8 +143,241 @@ class KaliTerminal:
             self._show_help()
             return True
 
+        if command.lower() == "search" or command.lower().startswith("search "):
+            return self._search(command[len("search"):].strip())
+
+        if command.lower() == "find" or command.lower().startswith("find "):
+            return self._find(command[len("find"):].strip())
+
+        words = command.split()
+        if words and words[0].lower() == "jobs":
+            self._show_jobs()
+            return True
+
+        if words and words[0].lower() in ("fg", "wait", "kill", "tail"):
+            self._control_job(words[0].lower(), words[1:])
+            return True
+
+        if command.lower() == "doctor":
+            self._doctor()
+            return True
+
+        if command.lower() == "stats":
+            self._stats()
+            return True
+
         return False
 
+    def _show_jobs(self):
+        """显示后台作业表"""
+        from rich.table import Table
+
+        from utils.history import format_rss
+        from utils.jobs import jobs
+
+        job_list = jobs.list()
+        if not job_list:
+            console.print("[dim]当前没有后台作业[/dim]")
+            return
+
+        table = Table(border_style="blue", padding=(0, 1))
+        table.add_column("编号", style="cyan", justify="center")
+        table.add_column("工具名称", style="green")
+        table.add_column("PID", style="magenta", justify="right")
+        table.add_column("状态", style="yellow")
+        table.add_column("启动时间", style="blue")
+        table.add_column("运行时长", justify="right")
+        table.add_column("退出码", justify="center")
+        table.add_column("CPU", justify="right")
+        table.add_column("峰值内存", justify="right")
+        for job in job_list:
+            usage = job.usage
+            table.add_row(
+                str(job.id), job.name, str(job.pid), job.state,
+                time.strftime("%H:%M:%S", time.localtime(job.started_at)),
+                f"{job.duration:.1f}s",
+                "" if job.exit_code is None else str(job.exit_code),
+                "" if usage is None else f"{usage.user_cpu + usage.sys_cpu:.2f}s",
+                "" if usage is None else format_rss(usage.max_rss_kb)
+            )
+        console.print(table)
+
+    def _doctor(self):
+        """重新检查全部工具的文件和运行时，列出有问题的工具"""
+        from rich.table import Table
+
+        from utils.catalog import catalog
+        from utils.health import NO_RUNTIME, health
+
+        started = time.monotonic()
+        health.scan(force=True)
+        problems = health.problems()
+        elapsed = time.monotonic() - started
+        total = sum(len(tools) for tools in catalog.tools().values())
+        # 未经编译直接加载时，缺少必需字段等无效条目已被跳过
+        for problem in catalog.skipped:
+            console.print(f"[bold yellow]⚠️ 已跳过无效的工具条目 {problem}[/bold yellow]")
+
+        if not problems:
+            console.print(f"[bold green]✅ 全部 {total} 个工具检查通过 ({elapsed:.2f}s)[/bold green]")
+            return
+
+        table = Table(border_style="red", padding=(0, 1))
+        table.add_column("分类", style="magenta")
+        table.add_column("工具名称", style="green")
+        table.add_column("状态", style="red")
+        table.add_column("详情", style="yellow")
+        for category, tool, tool_health in problems:
+            detail = f"未找到 {tool_health.runtime}" if tool_health.status == NO_RUNTIME else tool_health.path
+            table.add_row(category, tool.name, tool_health.status, detail)
+        console.print(table)
+        console.print(f"[bold yellow]⚠️ {len(problems)}/{total} 个工具存在问题 ({elapsed:.2f}s)[/bold yellow]")
+
+    def _stats(self):
+        """显示各阶段耗时的分位数，设置了 textfile 路径时同时写出"""
+        from rich.table import Table
+
+        from utils.metrics import PHASES, metrics
+
+        rows = metrics.snapshot()
+        session = time.strftime("%H:%M:%S", time.gmtime(metrics.session_seconds))
+        if not rows:
+            console.print(f"[dim]尚无耗时记录（会话时长 {session}）[/dim]")
+            return
+
+        def ms(seconds):
+            return f"{seconds * 1000:.1f}"
+
+        table = Table(title="各阶段耗时 (ms)", border_style="blue", padding=(0, 1))
+        table.add_column("阶段", style="green", no_wrap=True)
+        table.add_column("说明", style="dim")
+        table.add_column("次数", justify="right")
+        for column in ("平均", "p50", "p95", "p99", "最大"):
+            table.add_column(column, justify="right", style="cyan")
+        for phase, count, mean, p50, p95, p99, maximum in rows:
+            table.add_row(phase, PHASES.get(phase, ""), str(count), *map(ms, (mean, p50, p95, p99, maximum)))
+        console.print(table)
+        console.print(f"[dim]会话时长 {session}，分位数按直方图分桶估算[/dim]")
+        path = metrics.export(force=True)
+        if path:
+            console.print(f"[dim]已写出 {path}[/dim]")
+
+    def _control_job(self, action, args):
+        """fg/wait/kill <编号>"""
+        from utils.history import describe_run
+        from utils.jobs import RUNNING, jobs
+
+        if not args:
+            console.print(f"[bold yellow]用法: {action} <作业编号>[/bold yellow]")
+            return
+        job = jobs.get(args[0])
+        if job is None:
+            console.print(f"[bold red]作业 {args[0]} 不存在[/bold red]")
+            return
+
+        if action == "kill":
+            if job.state != RUNNING:
+                console.print(f"[dim]作业 [{job.id}] {job.name} 已结束[/dim]")
+                return
+            job.kill()
+        elif action == "tail":
+            if job.output is None:
+                console.print(f"[bold yellow]作业 [{job.id}] 没有捕获输出[/bold yellow]")
+                return
+            from utils.output import render_tail, show_live_output
+
+            if job.state != RUNNING:
+                console.print(render_tail(job))
+            else:
+                console.print(f"[bold green]查看作业 [{job.id}] {job.name} 的实时输出，Ctrl+C 返回[/bold green]")
+                if not show_live_output(job):
+                    console.print(f"[dim]作业 [{job.id}] 仍在后台运行[/dim]")
+                    return
+        elif action == "fg" and job.output is not None:
+            from utils.output import show_live_output
+
+            console.print(f"[bold green]作业 [{job.id}] {job.name} 转到前台，Ctrl+C 中断作业[/bold green]")
+            show_live_output(job, on_interrupt=job.interrupt)
+        elif action == "fg":
+            console.print(f"[bold green]作业 [{job.id}] {job.name} 转到前台，Ctrl+C 中断作业[/bold green]")
+            while True:
+                try:
+                    job.wait()
+                    break
+                except KeyboardInterrupt:
+                    job.interrupt()
+        else:
+            console.print(f"[bold green]等待作业 [{job.id}] {job.name} 结束，Ctrl+C 停止等待[/bold green]")
+            try:
+                job.wait()
+            except KeyboardInterrupt:
+                console.print(f"[dim]已停止等待，作业 [{job.id}] 仍在后台运行[/dim]")
+                return
+
+        console.print(f"[bold]作业 [{job.id}] {job.name}: {job.state}，退出码 {job.exit_code}，{describe_run(job)}[/bold]")
+
+    def _open_tool(self, category, tool=None):
+        """进入工具详情页（只给出分类时先进入工具列表），确认后启动工具"""
+        from utils.launcher import launch_tool
+        from utils.ui import display_tool_details, display_tools
+
+        if tool is None:
+            tool = display_tools(category)
+            if tool == "exit":
+                return "exit"
+            if isinstance(tool, str):
+                return True
+        else:
+            tool_result = display_tool_details(tool)
+            if tool_result == "exit":
+                return "exit"
+            if tool_result is not True:
+                return True
+
+        launch_tool(tool)
+        return True
+
+    def _find(self, query):
+        """交互式模糊查找工具和分类"""
+        from utils.finder import pick
+
+        selection = pick(query)
+        if selection is None:
+            return True
+        return self._open_tool(*selection)
+
+    def _search(self, terms):
+        """全文检索工具，并直接进入选中工具的详情页"""
+        from rich.table import Table
+
+        from utils.store import search_tools
+
+        if not terms:
+            console.print("[bold yellow]用法: search <关键词>[/bold yellow]")
+            return True
+
+        results = search_tools(terms)
+        if not results:
+            console.print(f"[bold red]未找到与 “{terms}” 相关的工具[/bold red]")
+            return True
+
+        table = Table(border_style="cyan", padding=(0, 1))
+        table.add_column("序号", style="cyan", justify="center", width=5)
+        table.add_column("分类", style="magenta")
+        table.add_column("工具名称", style="green")
+        table.add_column("描述", style="yellow")
+        for i, (category, tool) in enumerate(results, 1):
+            table.add_row(str(i), category, tool.name, tool.description)
+        console.print(table)
+        console.print(Text("❓ 输入序号查看工具详情，直接回车取消", style="bold yellow"))
+
+        self.prompt()
+        response = self.input().strip()
+        if not response.isdigit() or not 1 <= int(response) <= len(results):
+            return True
+
+        return self._open_tool(*results[int(response) - 1])
+
     def _show_help(self):
         """显示帮助信息"""
         help_text = """
@@ -61,7 +385,22 @@ class KaliTerminal:
   • clear/cls - 清屏
   • exit/quit - 退出程序
   • help      - 显示此帮助信息
+  • search    - 全文检索工具 (search <关键词>)
+  • find      - 模糊查找工具和分类，输入时实时过滤 (find [关键词])
+  • Tab       - 补全命令、分类和工具名称
+  • jobs      - 查看后台作业
+  • fg/wait/kill <编号> - 前台等待 / 等待 / 终止作业
+  • tail <编号> - 查看作业的实时输出
+  • doctor    - 检查全部工具的文件和运行时
+  • stats     - 显示各阶段耗时的 p50/p95/p99
   • 数字      - 选择相应的选项
+  • 0 / a-i   - 在分类菜单中进入最近常用 / 直接启动对应的最近常用工具（沿用上次的参数）
+  • 1,3,5-8   - 在工具列表中多选并批量启动（序号为当前页中的位置）
+  • 工具名称  - 在工具列表中按名称（或至少 3 个字符的唯一前缀）选择工具
+  • n/p/g <页码> - 工具列表翻页 / 跳转到指定页
+  • s name|type|version|none - 工具列表排序
+  • @工具集   - 批量启动 data/toolsets.json 中保存的工具集
+  • @@文件/@@网段 - 在参数提示中输入，按目标列表多次运行同一个工具（如 @@targets.txt、@@10.0.0.0/24）
         """
         console.print(help_text, style="bold cyan")
 
@@ -125,14 +464,22 @@ class KaliTerminal:
         console.print()
 
     def simulate_typing(self, text, delay=0.03):
-        """模拟打字效果"""
+        """模拟打字效果（仅 cinematic 模式逐字输出）"""
+        if timing_profile() != "cinematic":
+            console.print(text, highlight=False)
+            return
         for char in text:
             console.print(char, end="", highlight=False)
             time.sleep(delay)
         console.print()
 
     def simulate_command(self, command, output=None, error=False):
-        """模拟运行命令及其输出"""
+        """模拟运行命令及其输出（none 模式下错误信息以外的内容不显示）"""
+        if timing_profile() == "none":
+            if output and error:
+                console.print(output, style="bold red")
+            return
+
         self.prompt()
         self.simulate_typing(command)
 
@@ -142,4 +489,8 @@ class KaliTerminal:
             else:
                 console.print(output)
 
-        time.sleep(0.5)
+        pause(0.5)
+
+
+# 进程内共享的终端实例
+terminal = KaliTerminal()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+
+from config import SUPPORTED_EXTENSIONS
+
+# 项目根目录，工具配置中的相对路径以此为基准
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 菜单和启动器常用的字段，直接保存在记录中
+HOT_FIELDS = ("name", "type", "path", "version", "launch_method", "parameters", "author", "website")
+# 只在详情页等少数地方使用的长文本，按字节偏移按需读取
+TEXT_FIELDS = ("description", "usage")
+
+
+class TextStore:
+    """按 (偏移, 长度) 读取 UTF-8 文本的只读存储"""
+
+    def __init__(self, file, base=0):
+        self.file = file
+        self.base = base
+        self._lock = threading.Lock()
+
+    def read(self, offset, length):
+        if length == 0:
+            return ""
+        position = self.base + offset
+        if hasattr(os, "pread"):
+            data = os.pread(self.file.fileno(), length, position)
+        else:
+            with self._lock:
+                self.file.seek(position)
+                data = self.file.read(length)
+        return data.decode("utf-8")
+
+    def close(self):
+        self.file.close()
+
+    def __del__(self):
+        try:
+            self.file.close()
+        except Exception:
+            pass
+
+
+class TextSpool(TextStore):
+    """把长文本写入进程私有的临时文件，常驻内存中只保留偏移"""
+
+    def __init__(self):
+        import tempfile
+
+        super().__init__(tempfile.TemporaryFile())
+        self._size = 0
+
+    def append(self, text):
+        if not text:
+            return 0, 0
+        data = text.encode("utf-8")
+        with self._lock:
+            offset = self._size
+            self.file.seek(offset)
+            self.file.write(data)
+            self.file.flush()
+            self._size += len(data)
+        return offset, len(data)
+
+
+class Tool:
+    """紧凑的工具记录
+
+    常用字段保存在 __slots__ 中，description 和 usage 只记录在文本存储中的偏移，访问时才读取，
+    常驻内存与工具数量成正比，而与说明文字的总长度无关。为兼容旧代码，仍支持 tool["name"]
+    和 tool.get("version") 的字典式访问。
+    """
+
+    __slots__ = HOT_FIELDS + ("extra", "_text", "_desc_off", "_desc_len", "_usage_off", "_usage_len")
+
+    def __init__(self, name, type, path, version=None, launch_method=None, parameters=None,
+                 author=None, website=None, extra=None, text=None, description=(0, 0), usage=(0, 0)):
+        self.name = name
+        self.type = type
+        self.path = path
+        self.version = version
+        self.launch_method = launch_method
+        self.parameters = parameters
+        self.author = author
+        self.website = website
+        self.extra = extra
+        self._text = text
+        self._desc_off, self._desc_len = description
+        self._usage_off, self._usage_len = usage
+
+    @classmethod
+    def from_dict(cls, data, spool):
+        """从 tools.json 中的条目创建记录，长文本写入 spool"""
+        if not isinstance(data, dict):
+            raise ValueError(f"工具条目必须是对象: {data!r}")
+        extra = {key: value for key, value in data.items() if key not in HOT_FIELDS and key not in TEXT_FIELDS}
+        return cls(
+            *(data.get(field) for field in HOT_FIELDS),
+            extra=extra or None,
+            text=spool,
+            description=spool.append(data.get("description") or ""),
+            usage=spool.append(data.get("usage") or ""),
+        )
+
+    def to_record(self):
+        """返回用于写入快照的元组（长文本偏移由调用方提供的存储决定）"""
+        return tuple(getattr(self, field) for field in HOT_FIELDS) + (self.extra,)
+
+    @classmethod
+    def from_record(cls, record, text, description, usage):
+        *hot, extra = record
+        return cls(*hot, extra=extra, text=text, description=description, usage=usage)
+
+    @property
+    def description(self):
+        if self._text is None:
+            return ""
+        return self._text.read(self._desc_off, self._desc_len)
+
+    @property
+    def usage(self):
+        if self._text is None:
+            return ""
+        return self._text.read(self._usage_off, self._usage_len)
+
+    def get(self, key, default=None):
+        """字典式访问，字段不存在时返回 default"""
+        if key in HOT_FIELDS:
+            value = getattr(self, key)
+        elif key in TEXT_FIELDS:
+            value = getattr(self, key) or None
+        elif self.extra is not None:
+            value = self.extra.get(key)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def to_dict(self):
+        """还原为 tools.json 中的条目格式"""
+        data = {field: getattr(self, field) for field in HOT_FIELDS if getattr(self, field) is not None}
+        for field in TEXT_FIELDS:
+            value = getattr(self, field)
+            if value:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"Tool(name={self.name!r}, type={self.type!r}, path={self.path!r})"
+
+
+def get_launch_config(tool):
+    """返回工具类型对应的启动方式，不支持的类型返回空字典"""
+    if tool.type == "exe":
+        # 工具配置中的 "launch_method" 字段指定 exe 的启动方式
+        launch_method = tool.launch_method or "direct"
+        if launch_method == "direct":
+            return SUPPORTED_EXTENSIONS["exe"][0]
+        return SUPPORTED_EXTENSIONS["exe"][1]
+    return SUPPORTED_EXTENSIONS.get(tool.type, {})
+
+
+def resolve_path(tool):
+    """把工具配置中的路径解析为绝对路径（不改变进程的工作目录）"""
+    return os.path.normpath(os.path.join(PROJECT_ROOT, tool.path))
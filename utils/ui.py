@@ -1,66 +1,98 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
-import os
-import platform
+import re
 
-from rich.box import ROUNDED, DOUBLE
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.table import Table
+from config import CATEGORY_DESCRIPTIONS, CONFIG
+from utils.catalog import catalog, resolve_toolset
+from utils.health import MISSING, NO_RUNTIME, health
+from utils.history import describe_stats, history
+from utils.metrics import metrics
+from utils.render import screens
+from utils.screen import clear_screen
+from utils.terminal import console, terminal
 
-from config import CATEGORY_DESCRIPTIONS
-from utils.terminal import KaliTerminal
 
-console = Console()
-terminal = KaliTerminal()
-
-
-def clear_screen():
-    """清屏函数，兼容不同操作系统"""
-    if platform.system() == "Windows":
-        os.system("cls")
-    else:
-        os.system("clear")
+# 分类菜单顶部的“最近常用”伪分类，工具按启动历史中的 frecency 分数排序
+RECENT_CATEGORY = "最近常用"
+RECENT_INFO = {"desc": "按启动次数和最近使用时间排序的工具", "icon": "⭐", "color": "yellow"}
+# 分类菜单中直接启动最近常用工具的按键
+QUICK_KEYS = "abcdefghijklmnopqrstuvw"
+# 工具列表中按名称前缀选择工具的最短前缀，更短的输入只做精确匹配，单个字母不会误开工具
+MIN_NAME_PREFIX = 3
 
 
 def load_tools():
-    """加载工具配置数据"""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(base_dir, '..', 'data', 'tools.json')
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        # 如果文件不存在或格式错误，返回默认数据
-        return {
-            "信息收集": [
-                {"name": "Nmap", "description": "网络扫描工具", "path": "tools/nmap.exe", "type": "exe"},
-                {"name": "Whois查询", "description": "域名信息查询", "path": "tools/whois.py", "type": "py"},
-            ],
-            "漏洞扫描": [
-                {"name": "OpenVAS", "description": "开源漏洞扫描器", "path": "tools/openvas.bat", "type": "bat"},
-                {"name": "SQLMap", "description": "SQL注入检测工具", "path": "tools/sqlmap.py", "type": "py"},
-            ],
-            "漏洞利用": [
-                {"name": "Metasploit", "description": "渗透测试框架", "path": "tools/msf.bat", "type": "bat"},
-                {"name": "ExploitPack", "description": "漏洞利用集合", "path": "tools/exploit.jar", "type": "jar"},
-            ],
-            "抓包工具": [
-                {"name": "Wireshark", "description": "网络协议分析工具", "path": "tools/wireshark.exe", "type": "exe"},
-                {"name": "Burp Suite", "description": "Web应用安全测试", "path": "tools/burp.vbs", "type": "vbs"},
-            ],
-        }
+    """加载工具配置数据（由进程级目录缓存提供，文件未变化时不会重新解析）"""
+    return catalog.tools()
 
 
-def display_categories():
-    """显示工具分类并返回用户选择"""
-    tools_data = load_tools()  # 确保每次都重新加载工具数据
-    categories = list(tools_data.keys())
+def parse_selection(text, count):
+    """解析 "1,3,5-8" 形式的多选，返回从 1 开始的序号列表"""
+    indices = []
+    for part in text.replace("，", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = (int(value) for value in part.split("-", 1))
+                numbers = range(start, end + 1)
+            else:
+                start = end = int(part)
+                numbers = [start]
+        except ValueError:
+            raise ValueError(f"无效的序号: {part}")
+        if start > end:
+            raise ValueError(f"无效的范围: {part}")
+        for number in numbers:
+            if not 1 <= number <= count:
+                raise ValueError(f"序号超出范围: {number}")
+            if number not in indices:
+                indices.append(number)
+    if not indices:
+        raise ValueError("没有选择任何工具")
+    return indices
+
+
+def select_toolset(name):
+    """按名称载入保存的工具集，返回工具列表，失败时返回 None"""
+    resolved = resolve_toolset(name)
+    if resolved is None:
+        console.print(f"[bold red]工具集 {name} 不存在[/bold red]")
+        return None
+    tools, missing = resolved
+    if missing:
+        console.print(f"[bold yellow]⚠️ 工具集中以下工具未找到: {', '.join(missing)}[/bold yellow]")
+    if not tools:
+        return None
+    terminal.simulate_command(f"toolset {name}", f"已载入工具集 {name} ({len(tools)} 个工具)")
+    return tools
+
+
+def recent_tools(limit=None):
+    """最近常用的工具，按启动记录中的分类查找（分片模式下只解析用到的分类），已从目录中移除的工具跳过"""
+    tools = []
+    for name in history.ranked():
+        category = history.category(name)
+        if category is None:
+            # 没有记录分类的旧记录只完整查找一次
+            found = catalog.find(name)
+            history.remember_category(name, "" if found is None else found[0])
+        else:
+            found = catalog.find_in(category, name) if category else None
+        if found is None:
+            continue
+        tools.append(found[1])
+        if limit is not None and len(tools) >= limit:
+            break
+    return tools
 
-    terminal.print_banner("安全工具分类", "Security Tool Categories", "blue")
+
+def _category_table(categories, quick):
+    """分类菜单表格，quick 为可以用一个字母直接启动的最近常用工具"""
+    from rich.box import ROUNDED
+    from rich.table import Table
 
     # 不使用emoji创建表格，完全去除图标列
     table = Table(
@@ -75,6 +107,9 @@ def display_categories():
     table.add_column("分类名称", style="green")
     table.add_column("描述", style="yellow")
 
+    if quick:
+        table.add_row("0", RECENT_CATEGORY, RECENT_INFO["desc"], style="bold")
+
     for i, category in enumerate(categories, 1):
         category_info = CATEGORY_DESCRIPTIONS.get(category, {"desc": "无描述信息", "icon": "📁", "color": "white"})
         description = category_info["desc"]
@@ -83,9 +118,29 @@ def display_categories():
 
     # 添加退出选项，不使用emoji
     table.add_row(str(len(categories) + 1), "退出程序", "退出系统并返回命令行")
+    if not quick:
+        return [table]
+    shortcuts = "  ".join(f"[bold cyan]{key}[/bold cyan] {tool.name}" for key, tool in zip(QUICK_KEYS, quick))
+    return [table, f"[yellow]快速启动:[/yellow] {shortcuts}"]
+
+
+def display_categories():
+    """显示工具分类并返回用户选择"""
+    categories = catalog.categories()  # 分片模式下只读取 manifest
 
-    # 显示表格
-    console.print(table)
+    terminal.print_banner("安全工具分类", "Security Tool Categories", "blue")
+
+    if catalog.last_error is not None:
+        console.print(f"[bold yellow]⚠️ 工具配置文件加载失败，继续使用上一次有效的数据: {catalog.last_error}[/bold yellow]")
+    skipped = catalog.skipped
+    if skipped:
+        console.print(f"[bold yellow]⚠️ 已跳过 {len(skipped)} 个无效的工具条目（{skipped[0]}），输入 doctor 查看详情[/bold yellow]")
+
+    quick = recent_tools(min(CONFIG.get("quick_launch_size", 9), len(QUICK_KEYS)))
+
+    # 显示表格（目录、最近常用工具和终端宽度不变时直接输出缓存的渲染结果）
+    with metrics.timer("render_categories"):
+        screens.show(("categories", tuple(tool.name for tool in quick)), lambda: _category_table(categories, quick))
     console.print()
 
     while True:
@@ -97,8 +152,24 @@ def display_categories():
         if result == "":  # 如果输入为空，继续等待输入
             continue
 
+        if result.startswith("@"):
+            selected = select_toolset(result[1:].strip())
+            if selected:
+                return selected
+            continue
+
+        key = result.lower()
+        if quick and len(key) == 1 and key in QUICK_KEYS[:len(quick)]:
+            # 快速启动：跳过工具列表和详情页
+            tool = quick[QUICK_KEYS.index(key)]
+            terminal.simulate_command(f"run {tool.name}", f"快速启动 {tool.name}")
+            return tool
+
         try:
             choice = int(result)
+            if choice == 0 and quick:
+                terminal.simulate_command(f"cd categories/{RECENT_CATEGORY}", f"已进入 {RECENT_CATEGORY}")
+                return RECENT_CATEGORY
             if 1 <= choice <= len(categories):
                 category = categories[choice - 1]
                 terminal.simulate_command(f"cd categories/{category}", f"已进入 {category} 分类")
@@ -112,19 +183,64 @@ def display_categories():
             console.print("[bold red]请输入有效的数字[/bold red]")
 
 
-def display_tools(category):
-    """显示指定分类下的工具并返回用户选择"""
-    tools_data = load_tools()  # 确保每次都重新加载工具数据
-    tools = tools_data.get(category, [])
-
-    category_info = CATEGORY_DESCRIPTIONS.get(category, {"desc": "无描述信息", "icon": "📁", "color": "blue"})
-
-    # 不使用emoji在标题中
-    terminal.print_banner(
-        f"{category} 工具列表",
-        f"{category_info['desc']}",
-        category_info["color"]
-    )
+def _version_key(tool):
+    """版本号排序键：按数字分段比较，没有版本号的排在最后"""
+    parts = re.split(r"[.\-_ ]+", str(tool.version or ""))
+    return (tool.version is None, [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in parts])
+
+
+# 排序键: (说明, 取值函数)，None 表示保持目录中的顺序
+SORT_KEYS = {
+    "name": ("名称", lambda tool: (tool.name or "").lower()),
+    "type": ("类型", lambda tool: ((tool.type or "").lower(), (tool.name or "").lower())),
+    "version": ("版本", _version_key),
+}
+
+_sorted_cache = {}
+
+
+def sorted_tools(category, sort_key=None):
+    """返回按 sort_key 排序的分类工具列表，结果按目录版本缓存（最近常用工具随启动历史变化，不缓存）"""
+    if category == RECENT_CATEGORY:
+        tools = recent_tools()
+        return tools if sort_key is None else sorted(tools, key=SORT_KEYS[sort_key][1])
+    tools = catalog.category_tools(category)
+    if sort_key is None:
+        return tools
+    key = (category, sort_key)
+    cached = _sorted_cache.get(key)
+    if cached is None or cached[0] != catalog.version:
+        cached = _sorted_cache[key] = (catalog.version, sorted(tools, key=SORT_KEYS[sort_key][1]))
+    return cached[1]
+
+
+def page_size():
+    """每页显示的工具数，默认按终端高度计算，使整页不超出一屏"""
+    configured = CONFIG.get("page_size")
+    if configured:
+        return max(1, int(configured))
+    # 横幅、表头、表尾、翻页提示和输入提示约占 14 行
+    return max(5, console.height - 14)
+
+
+def find_in_category(tools, name):
+    """按名称在工具列表中查找：先精确匹配（不区分大小写），再找唯一的前缀匹配（至少 MIN_NAME_PREFIX 个字符）"""
+    name = name.lower()
+    prefix = len(name) >= MIN_NAME_PREFIX
+    prefixed = []
+    for tool in tools:
+        tool_name = (tool.name or "").lower()
+        if tool_name == name:
+            return tool
+        if prefix and tool_name.startswith(name):
+            prefixed.append(tool)
+    return prefixed[0] if len(prefixed) == 1 else None
+
+
+def _tool_table(page_tools, category_info, page, pages, total, sort_key):
+    """当前页的工具表格及缺失工具、运行时的提示，只为可见的行排版和检查状态"""
+    from rich.box import ROUNDED
+    from rich.table import Table
 
     # 创建无emoji的表格
     table = Table(
@@ -140,81 +256,184 @@ def display_tools(category):
     table.add_column("描述", style="yellow")
     table.add_column("版本", style="blue", width=8, justify="center")
 
-    for i, tool in enumerate(tools, 1):
-        version = tool.get("version", "未知")
-        tool_type = tool["type"]
-        # 使用文本替换emoji图标
-        table.add_row(str(i), tool_type.upper(), tool["name"], tool["description"], version)
+    missing = {}
+    broken = 0
+    for i, tool in enumerate(page_tools, 1):
+        # 使用文本替换emoji图标，文件缺失的工具和缺少运行时的类型标为红色
+        tool_health = health.check(tool)
+        tool_type = tool.type.upper()
+        tool_name = tool.name
+        if tool_health.status == NO_RUNTIME:
+            missing[tool_health.runtime] = tool_type
+            tool_type = f"[red]{tool_type}![/red]"
+        elif tool_health.status == MISSING:
+            broken += 1
+            tool_name = f"[red]✗ {tool_name}[/red]"
+        table.add_row(str(i), tool_type, tool_name, tool.description, tool.version or "未知")
 
     # 添加返回选项，不使用emoji
-    table.add_row(str(len(tools) + 1), "", "返回上级菜单", "返回工具分类选择", "")
+    table.add_row(str(len(page_tools) + 1), "", "返回上级菜单", "返回工具分类选择", "")
+
+    renderables = [table]
+    for runtime, tool_type in missing.items():
+        renderables.append(f"[red]! 未找到运行时 {runtime}，{tool_type} 类型的工具无法启动[/red]")
+    if broken:
+        renderables.append(f"[red]✗ 本页 {broken} 个工具的文件不存在，输入 doctor 查看详情[/red]")
+    if pages > 1 or sort_key:
+        order = SORT_KEYS[sort_key][0] if sort_key else "默认"
+        renderables.append(
+            f"[dim]第 {page + 1}/{pages} 页 · 共 {total} 个 · 排序: {order} · "
+            f"n/p 翻页 · g 页码 · s name|type|version[/dim]"
+        )
+    return renderables
 
-    # 显示表格
-    console.print(table)
-    console.print()
+
+def display_tools(category):
+    """显示指定分类下的工具并返回用户选择
+
+    工具很多时分页显示，只为当前页排版，渲染开销与终端高度成正比，与分类大小无关。
+    序号对应当前页中的位置，也可以直接输入工具名称（或至少 MIN_NAME_PREFIX 个字符的唯一名称前缀）。
+    翻页、排序和返回命令先于名称匹配，与命令同名的工具用序号选择。
+    """
+    if category == RECENT_CATEGORY:
+        category_info = RECENT_INFO
+    else:
+        category_info = CATEGORY_DESCRIPTIONS.get(category, {"desc": "无描述信息", "icon": "📁", "color": "blue"})
+    sort_key = None
+    page = 0
+
+    def current_page():
+        tools = sorted_tools(category, sort_key)  # 分片模式下只解析该分类的分片
+        size = page_size()
+        pages = max(1, (len(tools) + size - 1) // size)
+        return tools, size, pages
+
+    def show_table():
+        tools, size, pages = current_page()
+        page_tools = tools[page * size:(page + 1) * size]
+        # 不使用emoji在标题中
+        terminal.print_banner(
+            f"{category} 工具列表",
+            f"{category_info['desc']}",
+            category_info["color"]
+        )
+        # 工具状态来自健康检查（只检查当前页的工具），检查结果作废后缓存的表格随之失效
+        health.scan(page_tools)
+        with metrics.timer("render_tools"):
+            screens.show(
+                ("tools", category, health.generation, sort_key, page, size, tuple(tool.name for tool in page_tools)),
+                lambda: _tool_table(page_tools, category_info, page, pages, len(tools), sort_key)
+            )
+        console.print()
+        return page_tools
+
+    def redraw():
+        clear_screen()
+        return show_table()
+
+    page_tools = show_table()
 
     while True:
-        result = terminal.ask("请选择工具", default="")  # 将默认值设为空
+        result = terminal.ask("请选择工具", default="").strip()  # 将默认值设为空
+        command = result.lower()
+        words = command.split()
 
         if result == "exit":
             return "exit"
-        elif result.lower() == 'b':
+        elif command == 'b':
             terminal.simulate_command("cd ..", "返回上级目录")
             return "back"
 
         if result == "":  # 如果输入为空，继续等待输入
             continue
 
-        try:
-            choice = int(result)
-            if 1 <= choice <= len(tools):
-                selected_tool = tools[choice - 1]
-                terminal.simulate_command(f"info {selected_tool['name']}", f"查看 {selected_tool['name']} 详细信息")
-
-                # 展示工具的详细信息
-                tool_result = display_tool_details(selected_tool)
-                if tool_result == "back":
-                    # 如果用户在详情页选择返回，重新显示工具列表
-                    clear_screen()
-                    terminal.print_banner(
-                        f"{category} 工具列表",
-                        f"{category_info['desc']}",
-                        category_info["color"]
-                    )
-                    console.print(table)
-                    console.print()
+        # 翻页和排序
+        if command in ("n", "p") or (words[0] in ("g", "s") and len(words) <= 2):
+            tools, size, pages = current_page()
+            if command == "n":
+                page = min(page + 1, pages - 1)
+            elif command == "p":
+                page = max(page - 1, 0)
+            elif words[0] == "g":
+                if len(words) < 2 or not words[1].isdigit() or not 1 <= int(words[1]) <= pages:
+                    console.print(f"[bold red]请输入 1-{pages} 之间的页码，例如 g 2[/bold red]")
+                    continue
+                page = int(words[1]) - 1
+            else:
+                if len(words) < 2 or words[1] not in SORT_KEYS and words[1] != "none":
+                    console.print("[bold red]用法: s name|type|version|none[/bold red]")
                     continue
-                elif tool_result == "exit":
-                    return "exit"
+                sort_key = None if words[1] == "none" else words[1]
+                page = 0
+            page_tools = redraw()
+            continue
 
-                return selected_tool
-            elif choice == len(tools) + 1:
+        if result.startswith("@"):
+            selected = select_toolset(result[1:].strip())
+            if selected:
+                return selected
+            continue
+
+        selected_tool = None
+        if not result.isdigit():
+            # 按名称选择（名称中可能包含 "-"，先于多选解析）
+            selected_tool = find_in_category(sorted_tools(category, sort_key), result)
+
+        if selected_tool is None and ("," in result or "，" in result or "-" in result):
+            # 多选：1,3,5-8（当前页中的序号）
+            try:
+                indices = parse_selection(result, len(page_tools))
+            except ValueError as e:
+                console.print(f"[bold red]{e}[/bold red]")
+                continue
+            selected = [page_tools[i - 1] for i in indices]
+            names = ", ".join(tool.name for tool in selected)
+            terminal.simulate_command(f"select {result}", f"已选择 {len(selected)} 个工具: {names}")
+            return selected
+
+        if selected_tool is None:
+            if not result.isdigit():
+                console.print("[bold red]请输入有效的序号、工具名称或命令[/bold red]")
+                continue
+            choice = int(result)
+            if choice == len(page_tools) + 1:
                 terminal.simulate_command("cd ..", "返回上级目录")
                 return "back"
-            else:
+            if not 1 <= choice <= len(page_tools):
                 console.print("[bold red]无效的选择，请重试[/bold red]")
-        except ValueError:
-            if result.lower() == 'b':
-                terminal.simulate_command("cd ..", "返回上级目录")
-                return "back"
-            else:
-                console.print("[bold red]请输入有效的数字或命令[/bold red]")
+                continue
+            selected_tool = page_tools[choice - 1]
 
-def display_tool_details(tool):
-    """显示工具的详细信息"""
-    clear_screen()
+        terminal.simulate_command(f"info {selected_tool.name}", f"查看 {selected_tool.name} 详细信息")
 
-    # 收集工具详细信息，如果没有则显示默认值
-    name = tool["name"]
-    description = tool["description"]
-    tool_type = tool["type"]
-    version = tool.get("version", "未知")
-    author = tool.get("author", "未知")
-    website = tool.get("website", "无")
-    usage = tool.get("usage", "无详细使用说明")
+        # 展示工具的详细信息
+        tool_result = display_tool_details(selected_tool)
+        if tool_result == "back":
+            # 如果用户在详情页选择返回，重新显示工具列表
+            page_tools = redraw()
+            continue
+        elif tool_result == "exit":
+            return "exit"
 
-    # 显示工具信息标题，不使用emoji
-    terminal.print_banner(f"{name} v{version}", "工具详细信息", "cyan")
+        return selected_tool
+
+
+def _detail_screen(tool, stats):
+    """工具详情表格和使用说明，stats 为启动历史中最近若干次运行的统计"""
+    # Markdown 依赖 markdown-it 和 pygments，导入开销较大，只在第一次渲染详情页时导入
+    from rich.box import DOUBLE, ROUNDED
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+    from rich.table import Table
+
+    # 收集工具详细信息，如果没有则显示默认值
+    name = tool.name
+    description = tool.description
+    tool_type = tool.type
+    version = tool.version or "未知"
+    author = tool.author or "未知"
+    website = tool.website or "无"
+    usage = tool.usage or "无详细使用说明"
 
     # 创建详细信息表格，不使用emoji
     info_table = Table(
@@ -232,10 +451,9 @@ def display_tool_details(tool):
     info_table.add_row("类型", tool_type.upper())
     info_table.add_row("描述", description)
     info_table.add_row("开发者", author)
+    info_table.add_row("资源占用", describe_stats(stats))
     info_table.add_row("官方网站", website)
 
-    console.print(info_table)
-
     # 显示使用说明
     usage_panel = Panel(
         Markdown(f"## 使用说明\n\n{usage}"),
@@ -243,7 +461,21 @@ def display_tool_details(tool):
         border_style="green",
         box=ROUNDED
     )
-    console.print(usage_panel)
+    return [info_table, usage_panel]
+
+
+def display_tool_details(tool):
+    """显示工具的详细信息"""
+    from rich.panel import Panel
+
+    clear_screen()
+
+    # 显示工具信息标题，不使用emoji
+    terminal.print_banner(f"{tool.name} v{tool.version or '未知'}", "工具详细信息", "cyan")
+
+    # 统计随启动历史变化，作为缓存键的一部分
+    stats = history.stats(tool.name)
+    screens.show(("details", tool.name, tool.path, stats), lambda: _detail_screen(tool, stats))
 
     # 显示启动提示，不使用emoji
     console.print()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import array
+import atexit
+import hashlib
+import json
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+from config import CONFIG
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_SCRIPT = os.path.join(BASE_DIR, "utils", "warm_worker.py")
+# 每个 jar 的 JVM 类数据共享（CDS）归档，第二次启动起直接映射已解析的类
+JSA_DIR = os.path.join(BASE_DIR, ".cache", "jsa")
+# 旧版 JVM 不认识的选项会被忽略，不会导致启动失败
+JVM_FLAGS = ("-XX:+IgnoreUnrecognizedVMOptions", "-XX:+AutoCreateSharedArchive")
+
+WORKER_START_TIMEOUT = 10
+DEFAULT_PRELOAD = ("argparse", "json", "re", "socket", "ssl", "subprocess", "threading", "urllib.request")
+
+
+def enabled():
+    """预热池是否启用（需要 fork 和 Unix 套接字，Windows 上不可用）"""
+    return bool(CONFIG.get("warm_pool", False)) and hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+class WarmProcess:
+    """交给预热进程运行的工具，接口与 subprocess.Popen 中作业管理用到的部分一致"""
+
+    def __init__(self, conn, argv):
+        self.args = argv
+        self.returncode = None
+        # 监护进程回报的 (用户态 CPU 秒, 内核态 CPU 秒, ru_maxrss)，无法确定的峰值内存为 None
+        self.rusage = None
+        self.stdout = None
+        self.stderr = None
+        self._conn = conn
+        self._buffer = b""
+        self._lock = threading.Lock()
+        self.pid = int(self._read_message("pid")[0])
+
+    def _read_message(self, kind, deadline=None):
+        """读取一行 "<kind> 值 ..."，返回其中的值；超过 deadline（monotonic 时刻）仍未读到时抛出 TimeoutExpired"""
+        while b"\n" not in self._buffer:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([self._conn], [], [], remaining)[0]:
+                    raise subprocess.TimeoutExpired(self.args, None)
+            chunk = self._conn.recv(4096)
+            if not chunk:
+                break
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        line = line.decode("ascii", errors="replace").split()
+        if len(line) < 2 or line[0] != kind:
+            raise OSError(f"预热进程没有返回 {kind}")
+        return line[1:]
+
+    def wait(self, timeout=None):
+        """与 Popen.wait 一致：等待工具结束并返回退出码，超过 timeout 秒仍未结束时抛出 subprocess.TimeoutExpired"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # 回收线程可能正无限期地等待同一个连接，带超时的等待不能无限期地等锁
+        if not self._lock.acquire(timeout=-1 if timeout is None else max(0.0, timeout)):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        try:
+            if self.returncode is None:
+                try:
+                    code, *usage = self._read_message("exit", deadline)
+                except subprocess.TimeoutExpired:
+                    raise subprocess.TimeoutExpired(self.args, timeout) from None
+                except OSError:
+                    # 预热进程被终止时无法得知退出码
+                    code, usage = -signal.SIGKILL, ()
+                try:
+                    self.returncode = int(code)
+                    if len(usage) == 3:
+                        max_rss = None if usage[2] == "-" else int(usage[2])
+                        self.rusage = (float(usage[0]), float(usage[1]), max_rss)
+                except ValueError:
+                    self.returncode = -signal.SIGKILL
+                self._conn.close()
+        finally:
+            self._lock.release()
+        return self.returncode
+
+    def poll(self):
+        return self.returncode
+
+    def send_signal(self, sig):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class PythonPool:
+    """预先导入常用模块的 Python 工具进程（fork server），按解释器各启动一个"""
+
+    def __init__(self, interpreter, preload=DEFAULT_PRELOAD):
+        self.interpreter = interpreter
+        self.preload = list(preload)
+        self.proc = None
+        self._dir = None
+        self.socket_path = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动预热进程并等待其就绪，已在运行时直接返回"""
+        with self._lock:
+            if self.proc is not None and self.proc.poll() is None:
+                return
+            self._dir = tempfile.mkdtemp(prefix="portal-warm-")
+            self.socket_path = os.path.join(self._dir, "py.sock")
+            self.proc = subprocess.Popen(
+                [self.interpreter, WORKER_SCRIPT, self.socket_path, str(os.getpid()), *self.preload],
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, start_new_session=True
+            )
+            ready = threading.Timer(WORKER_START_TIMEOUT, self.proc.kill)
+            ready.start()
+            try:
+                line = self.proc.stdout.readline()
+            finally:
+                ready.cancel()
+            if line.strip() != b"ready":
+                self._stop()
+                raise OSError(f"预热进程启动失败: {self.interpreter}")
+
+    def _stop(self):
+        if self.proc is not None:
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc.wait()
+            self.proc.stdout.close()
+            self.proc = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+    def popen(self, argv, cwd=None, shell=False, stdin=None, stdout=None, stderr=None,
+              start_new_session=False, env=None, **_):
+        """按 subprocess.Popen 的参数启动工具，argv[0] 是解释器，argv[1] 是脚本"""
+        self.start()
+        opened = []
+
+        def target_fd(spec, default):
+            if spec == subprocess.DEVNULL:
+                fd = os.open(os.devnull, os.O_RDWR)
+                opened.append(fd)
+                return fd, None
+            if spec == subprocess.PIPE:
+                read_fd, write_fd = os.pipe()
+                opened.append(write_fd)
+                return write_fd, os.fdopen(read_fd, "rb")
+            return default, None
+
+        stdin_fd, _ = target_fd(stdin, 0)
+        stdout_fd, stdout_pipe = target_fd(stdout, 1)
+        stderr_fd, stderr_pipe = target_fd(stderr, 2)
+        request = json.dumps({
+            "argv": list(argv[1:]),
+            "cwd": cwd or os.getcwd(),
+            "env": dict(os.environ if env is None else env),
+            "new_session": start_new_session,
+        }).encode("utf-8")
+
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(self.socket_path)
+            fds = array.array("i", [stdin_fd, stdout_fd, stderr_fd])
+            header = len(request).to_bytes(4, "big")
+            conn.sendmsg([header + request], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds.tobytes())])
+            proc = WarmProcess(conn, argv)
+        except OSError:
+            conn.close()
+            for pipe in (stdout_pipe, stderr_pipe):
+                if pipe is not None:
+                    pipe.close()
+            raise
+        finally:
+            for fd in opened:
+                os.close(fd)
+        proc.stdout = stdout_pipe
+        proc.stderr = stderr_pipe
+        return proc
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def python_pool(interpreter):
+    """返回解释器对应的预热池，首次使用时创建"""
+    with _pools_lock:
+        pool = _pools.get(interpreter)
+        if pool is None:
+            pool = _pools[interpreter] = PythonPool(interpreter, CONFIG.get("warm_pool_preload", DEFAULT_PRELOAD))
+        return pool
+
+
+def _jvm_argv(argv, jar_path):
+    """在 java 命令后加入 CDS 归档参数，归档按 jar 的路径和修改时间区分"""
+    try:
+        os.makedirs(JSA_DIR, exist_ok=True)
+        stat = os.stat(jar_path)
+    except OSError:
+        return argv
+    key = hashlib.sha1(f"{jar_path}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")).hexdigest()[:16]
+    archive = os.path.join(JSA_DIR, f"{os.path.splitext(os.path.basename(jar_path))[0]}-{key}.jsa")
+    return [argv[0], JVM_FLAGS[0], f"-XX:SharedArchiveFile={archive}", *JVM_FLAGS[1:], *argv[1:]]
+
+
+def _pooled_popen(pool):
+    def popen(argv, **kwargs):
+        try:
+            return pool.popen(argv, **kwargs)
+        except OSError:
+            # 预热进程无法启动或已退出，退回普通启动
+            return subprocess.Popen(argv, **kwargs)
+    return popen
+
+
+def prepare(tool, argv, interpreter, detach):
+    """返回 (argv, popen)：py 工具交给预热进程，jar 工具加上 CDS 归档参数，其余原样返回 (argv, None)
+
+    预热进程只用于不占用终端的后台启动；前台运行的工具需要终端的控制权，仍然直接启动。
+    """
+    if not enabled() or interpreter is None:
+        return argv, None
+    if tool.type == "py" and detach:
+        return argv, _pooled_popen(python_pool(interpreter))
+    if tool.type == "jar" and len(argv) > 2 and argv[1] == "-jar":
+        return _jvm_argv(argv, argv[2]), None
+    return argv, None
+
+
+def start():
+    """提前启动 py 工具所用解释器的预热进程，失败时不影响门户运行"""
+    from utils.environment import get_environment
+
+    interpreter = get_environment()["runtimes"].get("python", {}).get("path")
+    if not enabled() or interpreter is None:
+        return False
+    try:
+        python_pool(interpreter).start()
+    except OSError:
+        return False
+    return True
+
+
+@atexit.register
+def close_all():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预热的 Python 工具进程（fork server）
+由 utils/warm.py 用工具所用的解释器启动，预先导入常用模块后在 Unix 套接字上等待启动请求。
+每个请求 fork 出一个监护进程，由它再 fork 出运行工具的进程并回报 PID 和退出码。
+只依赖标准库，不导入门户的任何模块。
+"""
+
+import array
+import json
+import os
+import resource
+import runpy
+import select
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+HEADER = struct.Struct("!I")
+MAX_FDS = 3
+
+
+def recv_request(conn):
+    """读取请求：4 字节长度 + JSON，附带 stdin/stdout/stderr 三个文件描述符"""
+    fds = array.array("i")
+    data, ancdata, _, _ = conn.recvmsg(65536, socket.CMSG_SPACE(MAX_FDS * fds.itemsize))
+    for level, kind, payload in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(payload[:len(payload) - (len(payload) % fds.itemsize)])
+    if len(data) < HEADER.size:
+        raise ValueError("请求不完整")
+    (length,) = HEADER.unpack_from(data)
+    body = data[HEADER.size:]
+    while len(body) < length:
+        chunk = conn.recv(length - len(body))
+        if not chunk:
+            raise ValueError("请求不完整")
+        body += chunk
+    return json.loads(body.decode("utf-8")), list(fds)
+
+
+def run_tool(request, fds):
+    """在 fork 出的子进程中运行工具脚本，不返回"""
+    try:
+        if request.get("new_session"):
+            os.setsid()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+        for fd in fds:
+            if fd > 2:
+                os.close(fd)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        script = request["argv"][0]
+        sys.argv = list(request["argv"])
+        sys.path[0] = os.path.dirname(os.path.abspath(script))
+        sys.stdin = open(0, "r", closefd=False)
+        # 与独立运行的解释器一致：输出到终端或设置了 PYTHONUNBUFFERED（门户捕获输出时）时按行刷新
+        line_buffered = os.isatty(1) or bool(os.environ.get("PYTHONUNBUFFERED"))
+        sys.stdout = open(1, "w", closefd=False, buffering=1 if line_buffered else -1)
+        sys.stderr = open(2, "w", closefd=False, buffering=1)
+    except BaseException:
+        traceback.print_exc()
+        os._exit(126)
+
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except KeyboardInterrupt:
+        # 与独立运行的解释器一致：打印回溯后以 SIGINT 结束
+        traceback.print_exc()
+        code = -signal.SIGINT
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    if code < 0:
+        signal.signal(-code, signal.SIG_DFL)
+        os.kill(os.getpid(), -code)
+    os._exit(code & 0xFF)
+
+
+def supervise(conn, request, fds):
+    """监护进程：启动工具，回报 PID，等待其退出后回报退出码和资源占用"""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    # 工具进程不经过 exec，ru_maxrss 包含继承的预热进程内存，不超过 fork 前的峰值时无法区分
+    inherited = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        run_tool(request, fds)
+    for fd in fds:
+        os.close(fd)
+    conn.sendall(f"pid {pid}\n".encode())
+    _, status, usage = os.wait4(pid, 0)
+    if os.WIFSIGNALED(status):
+        code = -os.WTERMSIG(status)
+    else:
+        code = os.WEXITSTATUS(status)
+    # 退出码之后附带工具的 CPU 时间和峰值内存（ru_maxrss 原样回报，无法确定时为 -）
+    max_rss = usage.ru_maxrss if usage.ru_maxrss > inherited else "-"
+    conn.sendall(f"exit {code} {usage.ru_utime:.6f} {usage.ru_stime:.6f} {max_rss}\n".encode())
+    os._exit(0)
+
+
+def serve(socket_path, parent_pid):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    # 监护进程由内核自动回收
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    while True:
+        readable, _, _ = select.select([server], [], [], 1.0)
+        if os.getppid() != parent_pid:
+            # 门户已经退出
+            break
+        if not readable:
+            continue
+        conn, _ = server.accept()
+        try:
+            request, fds = recv_request(conn)
+        except (OSError, ValueError):
+            conn.close()
+            continue
+        if os.fork() == 0:
+            server.close()
+            supervise(conn, request, fds)
+        conn.close()
+        for fd in fds:
+            os.close(fd)
+    server.close()
+
+
+def main():
+    socket_path, parent_pid, *preload = sys.argv[1:]
+    for module in preload:
+        try:
+            __import__(module)
+        except Exception:
+            pass
+    serve(socket_path, int(parent_pid))
+
+
+if __name__ == "__main__":
+    main()